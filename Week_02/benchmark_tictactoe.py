@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Tic Tac Toe
+
+Run from this directory:
+    python benchmark_tictactoe.py
+"""
+
+import os
+import random
+import tempfile
+import time
+
+import tictactoe_table
+from main import TicTacToe
+from mnk_game import MNKGame, DIRECTIONS
+from mnk_solver import Solver
+from tictactoe_table import LINES, best_move, build_table, encode, get_table, read_table, write_table
+
+
+def time_call(func, *args, repeat=3):
+    """Return (result, best wall-clock time) over several runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+class ListTicTacToe(TicTacToe):
+    """The original list-of-lists board, kept as a baseline for comparison"""
+
+    board = None  # A plain attribute instead of the masks property
+
+    def __init__(self):
+        super().__init__()
+        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+
+    def is_valid_move(self, position):
+        if position < 1 or position > 9:
+            return False
+        row = (position - 1) // 3
+        col = (position - 1) % 3
+        return self.board[row][col] == ' '
+
+    def make_move(self, position):
+        row = (position - 1) // 3
+        col = (position - 1) % 3
+        self.board[row][col] = self.current_player
+
+    def check_winner(self):
+        for row in self.board:
+            if row[0] == row[1] == row[2] != ' ':
+                return row[0]
+        for col in range(3):
+            if self.board[0][col] == self.board[1][col] == self.board[2][col] != ' ':
+                return self.board[0][col]
+        if self.board[0][0] == self.board[1][1] == self.board[2][2] != ' ':
+            return self.board[0][0]
+        if self.board[0][2] == self.board[1][1] == self.board[2][0] != ' ':
+            return self.board[0][2]
+        return None
+
+    def is_board_full(self):
+        for row in self.board:
+            for cell in row:
+                if cell == ' ':
+                    return False
+        return True
+
+    def reset_game(self):
+        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        self.current_player = 'X'
+
+
+def random_games(game_class, count, seed=0):
+    """Play random games through the TicTacToe API and return the number of X wins"""
+    rng = random.Random(seed)
+    game = game_class()
+    x_wins = 0
+    for _ in range(count):
+        game.reset_game()
+        while True:
+            game.make_move(rng.choice([p for p in range(1, 10) if game.is_valid_move(p)]))
+            winner = game.check_winner()
+            if winner or game.is_board_full():
+                x_wins += winner == 'X'
+                break
+            game.switch_player()
+    return x_wins
+
+
+def board_checks(game, count):
+    for _ in range(count):
+        game.is_valid_move(5)
+        game.check_winner()
+        game.is_board_full()
+
+
+def bench_board_checks(count=100_000):
+    """Time is_valid_move, check_winner and is_board_full on a mid-game board"""
+    print(f"\nBoard checks ({count:,} calls of each)")
+    rates = []
+    for game_class in (ListTicTacToe, TicTacToe):
+        game = game_class()
+        for position in (1, 2, 3, 5):  # X O X / . O . / . . .
+            game.make_move(position)
+            game.switch_player()
+        _, elapsed = time_call(board_checks, game, count)
+        rates.append(count / elapsed)
+    print(f"  list board         {rates[0]:>10,.0f} checks/s")
+    print(f"  bitmask board      {rates[1]:>10,.0f} checks/s")
+    print(f"  speedup            {rates[1] / rates[0]:>10.2f}x")
+
+
+def bench_random_games(count=20_000):
+    """Compare random-game simulation with the list and bitmask boards"""
+    print(f"\nRandom games ({count:,} games)")
+    list_wins, list_time = time_call(random_games, ListTicTacToe, count)
+    mask_wins, mask_time = time_call(random_games, TicTacToe, count)
+    assert list_wins == mask_wins
+    print(f"  list board         {count / list_time:>10,.0f} games/s")
+    print(f"  bitmask board      {count / mask_time:>10,.0f} games/s")
+    print(f"  speedup            {list_time / mask_time:>10.2f}x")
+
+
+def scan_winner(cells, m, n, k):
+    """Look for k in a row across the whole board, the approach TicTacToe started with"""
+    for row in range(m):
+        for col in range(n):
+            player = cells[row * n + col]
+            if player == ' ':
+                continue
+            for dr, dc in DIRECTIONS:
+                end_row, end_col = row + (k - 1) * dr, col + (k - 1) * dc
+                if 0 <= end_row < m and 0 <= end_col < n and all(
+                        cells[(row + i * dr) * n + col + i * dc] == player for i in range(1, k)):
+                    return player
+    return None
+
+
+def random_move_orders(size, count, seed=0):
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(count):
+        order = list(range(1, size + 1))
+        rng.shuffle(order)
+        orders.append(order)
+    return orders
+
+
+def apply_moves_scan(m, n, k, orders):
+    """Play each move order until someone wins, rescanning the board after every move"""
+    moves = 0
+    for order in orders:
+        cells = [' '] * (m * n)
+        player = 'X'
+        for position in order:
+            cells[position - 1] = player
+            moves += 1
+            if scan_winner(cells, m, n, k):
+                break
+            player = 'O' if player == 'X' else 'X'
+    return moves
+
+
+def apply_moves_indexed(game, orders):
+    """Play each move order until someone wins with MNKGame's window index"""
+    moves = 0
+    for order in orders:
+        game.reset_game()
+        for position in order:
+            game.make_move(position)
+            moves += 1
+            if game.check_winner():
+                break
+            game.switch_player()
+    return moves
+
+
+def undo_moves(game, order):
+    """Play a full move order ignoring wins, then take every move back"""
+    game.reset_game()
+    for position in order:
+        game.make_move(position)
+        game.switch_player()
+    while game.history:
+        game.undo_move()
+    return len(order)
+
+
+def bench_mnk(m=19, n=19, k=5, games=200, scan_games=5):
+    """Move-apply throughput on a large m,n,k board"""
+    print(f"\nm,n,k-game moves ({m}x{n}, {k} in a row, random games)")
+    orders = random_move_orders(m * n, games)
+    game = MNKGame(m, n, k)
+    scan_moves, scan_time = time_call(apply_moves_scan, m, n, k, orders[:scan_games], repeat=1)
+    indexed_moves, indexed_time = time_call(apply_moves_indexed, game, orders)
+    undone, undo_time = time_call(undo_moves, game, orders[0])
+    scan_rate = scan_moves / scan_time
+    indexed_rate = indexed_moves / indexed_time
+    print(f"  windows            {len(game.windows):>10,}")
+    print(f"  full-board scan    {scan_rate:>10,.0f} moves/s")
+    print(f"  window index       {indexed_rate:>10,.0f} moves/s")
+    print(f"  make + undo        {2 * undone / undo_time:>10,.0f} moves/s")
+    print(f"  speedup            {indexed_rate / scan_rate:>10,.0f}x")
+
+
+def solve(solver, m, n, k):
+    return solver.solve(MNKGame(m, n, k))
+
+
+def bench_solver(boards=((3, 3, 3), (4, 4, 4)), capped_size=2_000):
+    """Solve boards from empty with and without the symmetry-reduced cache"""
+    print("\nSolving from the empty board")
+    print(f"  {'board':<8}{'cache':<20}{'value':>6}{'nodes':>12}{'cached':>10}{'time':>10}")
+    for m, n, k in boards:
+        options = [("symmetric", {}), ("plain", {"symmetry": False}),
+                   (f"symmetric, {capped_size:,} max", {"cache_size": capped_size})]
+        if m * n <= 9:
+            options.append(("none", {"cache_size": 0}))
+        for label, kwargs in options:
+            solver = Solver(**kwargs)
+            value, elapsed = time_call(solve, solver, m, n, k, repeat=1)
+            print(f"  {f'{m},{n},{k}':<8}{label:<20}{value:>6}{solver.nodes:>12,}"
+                  f"{len(solver.cache):>10,}{elapsed:>9.2f}s")
+
+
+def search_move(board):
+    """Plain minimax from scratch, the baseline the table replaces"""
+    cells = [cell for row in board for cell in row]
+    player = 'X' if cells.count('X') == cells.count('O') else 'O'
+    other = 'O' if player == 'X' else 'X'
+
+    def minimax(to_move):
+        for a, b, c in LINES:
+            if cells[a] != ' ' and cells[a] == cells[b] == cells[c]:
+                return -1
+        if ' ' not in cells:
+            return 0
+        best = -2
+        for i in range(9):
+            if cells[i] == ' ':
+                cells[i] = to_move
+                best = max(best, -minimax(other if to_move == player else player))
+                cells[i] = ' '
+        return best
+
+    best_score, move = -2, None
+    for i in range(9):
+        if cells[i] == ' ':
+            cells[i] = player
+            score = -minimax(other)
+            cells[i] = ' '
+            if score > best_score:
+                best_score, move = score, i + 1
+    return move
+
+
+def random_positions(count, seed=0):
+    """Boards from random games that are not over yet"""
+    rng = random.Random(seed)
+    table = get_table()
+    positions = []
+    while len(positions) < count:
+        board = [[' '] * 3 for _ in range(3)]
+        player = 'X'
+        for _ in range(rng.randrange(9)):
+            if not table[encode(board)] & tictactoe_table.MOVES_MASK:
+                break
+            empty = [(r, c) for r in range(3) for c in range(3) if board[r][c] == ' ']
+            r, c = rng.choice(empty)
+            board[r][c] = player
+            player = 'O' if player == 'X' else 'X'
+        if table[encode(board)] & tictactoe_table.MOVES_MASK:
+            positions.append(board)
+    return positions
+
+
+def moves(find_move, positions):
+    for board in positions:
+        find_move(board)
+
+
+def bench_table_build():
+    """Time building the table and loading it from the cache file"""
+    print("\nPerfect-play table")
+    table, build_time = time_call(build_table)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "table.bin")
+        write_table(path, table)
+        size = os.path.getsize(path)
+        _, load_time = time_call(read_table, path)
+    print(f"  positions          {tictactoe_table.count_positions(table):>10,}")
+    print(f"  build              {build_time * 1000:>10.2f} ms")
+    print(f"  load from disk     {load_time * 1000:>10.2f} ms ({size:,} bytes)")
+
+
+def bench_best_move(count=1_000, search_count=20):
+    """Compare the table lookup against a minimax search per move"""
+    print(f"\nbest_move latency ({count:,} random positions)")
+    positions = random_positions(count)
+    get_table()
+    _, lookup_time = time_call(moves, best_move, positions)
+    _, search_time = time_call(moves, search_move, positions[:search_count], repeat=1)
+    lookup_us = lookup_time / count * 1e6
+    search_us = search_time / search_count * 1e6
+    print(f"  table lookup       {lookup_us:>10.2f} us/move")
+    print(f"  minimax search     {search_us:>10.0f} us/move")
+    print(f"  speedup            {search_us / lookup_us:>10,.0f}x")
+
+
+def main():
+    bench_table_build()
+    bench_best_move()
+    bench_board_checks()
+    bench_random_games()
+    bench_mnk()
+    bench_solver()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,38 @@
+from tictactoe_table import LINES, best_move_from_masks
+
+# Each player's marks are a 9-bit mask: bit i is position i + 1
+FULL_BOARD = (1 << 9) - 1
+LINE_MASKS = tuple(sum(1 << cell for cell in line) for line in LINES)
+# WINS[mask] is True if the mask holds three in a row
+WINS = tuple(any(mask & line == line for line in LINE_MASKS) for mask in range(1 << 9))
+
+
 class TicTacToe:
-    def __init__(self):
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+    size = 9  # Number of positions
+    
+    def __init__(self, computer=None):
+        self.masks = {'X': 0, 'O': 0}
         self.current_player = 'X'
+        self.computer = computer  # 'X' or 'O' for a perfect computer player, None for two humans
+    
+    @property
+    def board(self):
+        """The board as rows of 'X', 'O' and ' ', built from the masks"""
+        x, o = self.masks['X'], self.masks['O']
+        return [['X' if x >> cell & 1 else 'O' if o >> cell & 1 else ' '
+                 for cell in range(row * 3, row * 3 + 3)] for row in range(3)]
     
     def display_board(self):
         """Display the current state of the game board"""
+        board = self.board
         print("\n   |   |   ")
-        print(f" {self.board[0][0]} | {self.board[0][1]} | {self.board[0][2]} ")
+        print(f" {board[0][0]} | {board[0][1]} | {board[0][2]} ")
         print("___|___|___")
         print("   |   |   ")
-        print(f" {self.board[1][0]} | {self.board[1][1]} | {self.board[1][2]} ")
+        print(f" {board[1][0]} | {board[1][1]} | {board[1][2]} ")
         print("___|___|___")
         print("   |   |   ")
-        print(f" {self.board[2][0]} | {self.board[2][1]} | {self.board[2][2]} ")
+        print(f" {board[2][0]} | {board[2][1]} | {board[2][2]} ")
         print("   |   |   ")
         print()
     
@@ -34,45 +54,27 @@ class TicTacToe:
         """Check if the move is valid"""
         if position < 1 or position > 9:
             return False
-        
-        row = (position - 1) // 3
-        col = (position - 1) % 3
-        
-        return self.board[row][col] == ' '
+        return not (self.masks['X'] | self.masks['O']) >> (position - 1) & 1
     
     def make_move(self, position):
         """Make a move on the board"""
-        row = (position - 1) // 3
-        col = (position - 1) % 3
-        self.board[row][col] = self.current_player
+        self.masks[self.current_player] |= 1 << (position - 1)
     
     def check_winner(self):
         """Check if there's a winner"""
-
-        for row in self.board:
-            if row[0] == row[1] == row[2] != ' ':
-                return row[0]
-
-        for col in range(3):
-            if self.board[0][col] == self.board[1][col] == self.board[2][col] != ' ':
-                return self.board[0][col]
-        
-
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != ' ':
-            return self.board[0][0]
-        
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != ' ':
-            return self.board[0][2]
-        
+        if WINS[self.masks['X']]:
+            return 'X'
+        if WINS[self.masks['O']]:
+            return 'O'
         return None
     
     def is_board_full(self):
         """Check if the board is full (tie game)"""
-        for row in self.board:
-            for cell in row:
-                if cell == ' ':
-                    return False
-        return True
+        return self.masks['X'] | self.masks['O'] == FULL_BOARD
+    
+    def best_move(self):
+        """Return a perfect move (1-9) for the current player from the precomputed table"""
+        return best_move_from_masks(self.masks['X'], self.masks['O'])
     
     def switch_player(self):
         """Switch between X and O players"""
@@ -80,7 +82,7 @@ class TicTacToe:
     
     def reset_game(self):
         """Reset the game board for a new game"""
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        self.masks = {'X': 0, 'O': 0}
         self.current_player = 'X'
     
     def play(self):
@@ -95,10 +97,14 @@ class TicTacToe:
             print(f"Player {self.current_player}'s turn")
             
             try:
-                position = int(input("Enter position (1-9): "))
+                if self.current_player == self.computer:
+                    position = self.best_move()
+                    print(f"Computer plays {position}")
+                else:
+                    position = int(input(f"Enter position (1-{self.size}): "))
                 
                 if not self.is_valid_move(position):
-                    print("❌ Invalid move! Please choose an empty position (1-9).")
+                    print(f"❌ Invalid move! Please choose an empty position (1-{self.size}).")
                     continue
                 
                 self.make_move(position)
@@ -119,7 +125,7 @@ class TicTacToe:
                 self.switch_player()
                 
             except ValueError:
-                print("❌ Please enter a valid number between 1 and 9.")
+                print(f"❌ Please enter a valid number between 1 and {self.size}.")
             except KeyboardInterrupt:
                 print("\n👋 Thanks for playing! Goodbye!")
                 break
@@ -139,7 +145,8 @@ class TicTacToe:
 
 def main():
     """Main function to start the game"""
-    game = TicTacToe()
+    answer = input("Play against the computer? (y/n): ").lower().strip()
+    game = TicTacToe(computer='O' if answer in ['y', 'yes'] else None)
     game.play()
 
 
@@ -0,0 +1,197 @@
+"""
+m,n,k-games: Tic Tac Toe on an m x n board with k in a row to win.
+
+``MNKGame(3, 3, 3)`` is Tic Tac Toe and ``MNKGame(15, 15, 5)`` is Gomoku.
+It plays by the same rules and has the same interface as TicTacToe, with
+positions numbered 1 to m * n row by row.
+
+Nothing is rescanned after a move. The board is divided up front into
+windows: every run of k cells in a row, column or diagonal. Each window
+keeps a count of X and O stones, and each cell lists the windows through
+it, so a move only updates the (at most 4 * k) windows through the new
+stone:
+    - a player wins when one of their windows reaches k stones
+    - a window is live for a player while the opponent has no stone in
+      it; ``line_counts(player)`` is how many live windows hold 0..k of
+      that player's stones, a cheap evaluation for search
+    - a live window holding k - 1 stones is a threat, and its empty cell
+      is one of ``winning_moves(player)``
+``undo_move()`` takes the last move back, for searching (see mnk_solver.py).
+
+Run a game from this directory:
+    python mnk_game.py 15 15 5
+"""
+
+import sys
+
+from main import TicTacToe
+
+PLAYERS = {'X': 0, 'O': 1}
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+_solver = None
+
+
+class MNKGame(TicTacToe):
+    def __init__(self, m=3, n=3, k=3, computer=None):
+        if not 2 <= k <= max(m, n):
+            raise ValueError(f"k must be between 2 and {max(m, n)}")
+        self.m, self.n, self.k = m, n, k
+        self.size = m * n
+        self.computer = computer  # As in TicTacToe; the computer searches with mnk_solver
+        # Cells (0 to m * n - 1) of every window, and the windows through each cell
+        self.windows = []
+        self.cell_windows = [[] for _ in range(self.size)]
+        for dr, dc in DIRECTIONS:
+            for row in range(m):
+                for col in range(n):
+                    end_row, end_col = row + (k - 1) * dr, col + (k - 1) * dc
+                    if 0 <= end_row < m and 0 <= end_col < n:
+                        cells = tuple((row + i * dr) * n + col + i * dc for i in range(k))
+                        for cell in cells:
+                            self.cell_windows[cell].append(len(self.windows))
+                        self.windows.append(cells)
+        self.reset_game()
+
+    def reset_game(self):
+        """Reset the game board for a new game"""
+        self.cells = [' '] * self.size
+        self.current_player = 'X'
+        self.winner = None
+        self.history = []  # (cell, winner before the move)
+        count = len(self.windows)
+        self.counts = ([0] * count, [0] * count)
+        self.live = ([count] + [0] * self.k, [count] + [0] * self.k)
+        self.threats = (set(), set())
+
+    @property
+    def board(self):
+        """The board as rows of 'X', 'O' and ' '"""
+        return [self.cells[row * self.n:(row + 1) * self.n] for row in range(self.m)]
+
+    def _print_rows(self, rows):
+        width = max(3, len(str(self.size)) + 2)
+        separator = "|".join([" " * width] * self.n)
+        underline = "|".join(["_" * width] * self.n)
+        print(separator)
+        for i, row in enumerate(rows):
+            print("|".join(str(cell).center(width) for cell in row))
+            print(underline if i < len(rows) - 1 else separator)
+            if i < len(rows) - 1:
+                print(separator)
+
+    def display_board(self):
+        """Display the current state of the game board"""
+        print()
+        self._print_rows(self.board)
+        print()
+
+    def display_positions(self):
+        """Display the position numbers for reference"""
+        print("\nPosition numbers:")
+        self._print_rows([range(row * self.n + 1, (row + 1) * self.n + 1) for row in range(self.m)])
+        print()
+
+    def is_valid_move(self, position):
+        """Check if the move is valid"""
+        return 1 <= position <= self.size and self.cells[position - 1] == ' '
+
+    def make_move(self, position):
+        """Make a move on the board, updating the windows through it"""
+        cell = position - 1
+        player = self.current_player
+        self.cells[cell] = player
+        self.history.append((cell, self.winner))
+        p, q = PLAYERS[player], 1 - PLAYERS[player]
+        own_counts, other_counts = self.counts[p], self.counts[q]
+        own_live, other_live = self.live[p], self.live[q]
+        own_threats, other_threats = self.threats[p], self.threats[q]
+        k = self.k
+        for w in self.cell_windows[cell]:
+            own = own_counts[w]
+            own_counts[w] = own + 1
+            other = other_counts[w]
+            if own == 0:
+                # The window is no longer live for the opponent
+                other_live[other] -= 1
+                if other == k - 1:
+                    other_threats.discard(w)
+            if other:
+                continue  # Not live for this player either
+            own_live[own] -= 1
+            own_live[own + 1] += 1
+            if own + 1 == k - 1:
+                own_threats.add(w)
+            elif own + 1 == k:
+                own_threats.discard(w)
+                self.winner = player
+
+    def undo_move(self):
+        """Take back the last move"""
+        cell, self.winner = self.history.pop()
+        player = self.cells[cell]
+        self.cells[cell] = ' '
+        p, q = PLAYERS[player], 1 - PLAYERS[player]
+        own_counts, other_counts = self.counts[p], self.counts[q]
+        own_live, other_live = self.live[p], self.live[q]
+        own_threats, other_threats = self.threats[p], self.threats[q]
+        k = self.k
+        for w in self.cell_windows[cell]:
+            own = own_counts[w] - 1
+            own_counts[w] = own
+            other = other_counts[w]
+            if own == 0:
+                # Live for the opponent again
+                other_live[other] += 1
+                if other == k - 1:
+                    other_threats.add(w)
+            if other:
+                continue
+            own_live[own + 1] -= 1
+            own_live[own] += 1
+            if own + 1 == k - 1:
+                own_threats.discard(w)
+            elif own == k - 1:
+                own_threats.add(w)
+        self.current_player = player
+
+    def check_winner(self):
+        """Return the winner, found when their last move completed a window"""
+        return self.winner
+
+    def is_board_full(self):
+        """Check if the board is full (tie game)"""
+        return len(self.history) == self.size
+
+    def line_counts(self, player):
+        """Live windows of ``player`` by number of their stones (index 0 to k)"""
+        return list(self.live[PLAYERS[player]])
+
+    def winning_moves(self, player):
+        """Positions where ``player`` would complete k in a row"""
+        cells = self.cells
+        moves = set()
+        for w in self.threats[PLAYERS[player]]:
+            for cell in self.windows[w]:
+                if cells[cell] == ' ':
+                    moves.add(cell + 1)
+        return sorted(moves)
+
+    def best_move(self):
+        """Return a perfect move from a full search (practical on small boards only)"""
+        global _solver
+        if _solver is None:
+            from mnk_solver import Solver
+            _solver = Solver()
+        return _solver.best_move(self)[0]
+
+
+def main():
+    """Play an m,n,k-game: python mnk_game.py [m n k]"""
+    m, n, k = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (15, 15, 5)
+    game = MNKGame(m, n, k)
+    game.play()
+
+
+if __name__ == "__main__":
+    main()
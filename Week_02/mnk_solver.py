@@ -0,0 +1,238 @@
+"""
+Negamax solver for Tic Tac Toe and other m,n,k-games.
+
+Positions are cached by their canonical form. A board looks the same
+after any rotation or reflection that maps it onto itself: the 8
+symmetries of the square (the dihedral group), or 4 for a rectangular
+board. The canonical form is the smallest of those images. So a position
+and all its mirror images share one cache entry, and a subproblem met
+again in any orientation is answered from the cache.
+
+The cache is an LRU with a size cap. When it is full, the entry used
+least recently is dropped, so solving a large board never holds more than
+``cache_size`` positions in memory.
+
+Values are for the player to move: 1 win, 0 draw, -1 loss with perfect
+play. The search uses alpha-beta. A cached entry records whether its
+value is exact or only a bound, in the same way as the Connect Four
+transposition table.
+
+    from mnk_game import MNKGame
+    from mnk_solver import Solver
+
+    game = MNKGame(4, 4, 3)
+    Solver(cache_size=100_000).solve(game)  # 1: the first player wins
+"""
+
+from collections import OrderedDict
+from operator import itemgetter
+
+DEFAULT_CACHE_SIZE = 1_000_000
+
+# Cache entry flags
+EXACT, LOWER, UPPER = 0, 1, 2
+
+OTHER = {'X': 'O', 'O': 'X'}
+
+
+def symmetries(m, n):
+    """
+    Cell permutations of the board's symmetries, as tuples where entry i is
+    the cell that moves to cell i. Cells are numbered 0 to m * n - 1 row by row.
+    """
+    def cell(row, col):
+        return row * n + col
+
+    transforms = [
+        lambda r, c: cell(r, c),                  # identity
+        lambda r, c: cell(m - 1 - r, n - 1 - c),  # rotate 180 degrees
+        lambda r, c: cell(r, n - 1 - c),          # reflect left-right
+        lambda r, c: cell(m - 1 - r, c),          # reflect top-bottom
+    ]
+    if m == n:
+        transforms += [
+            lambda r, c: cell(c, r),                  # reflect in the main diagonal
+            lambda r, c: cell(n - 1 - c, m - 1 - r),  # reflect in the other diagonal
+            lambda r, c: cell(n - 1 - c, r),          # rotate 90 degrees
+            lambda r, c: cell(c, m - 1 - r),          # rotate 270 degrees
+        ]
+    return [tuple(transform(r, c) for r in range(m) for c in range(n)) for transform in transforms]
+
+
+def canonical(cells, m, n, getters=None):
+    """
+    Return the canonical form of a board of m * n cells ('X', 'O' or ' '):
+    the smallest of its images under the board's symmetries, as a tuple.
+
+    ``getters`` are itemgetters over symmetries(m, n), which callers that
+    canonicalize many positions can build once.
+    """
+    if getters is None:
+        getters = [itemgetter(*perm) for perm in symmetries(m, n)]
+    return min(getter(cells) for getter in getters)
+
+
+def canonical_board(board):
+    """Canonical form of a TicTacToe board (rows of 'X', 'O' and ' ')"""
+    return canonical([cell for row in board for cell in row], len(board), len(board[0]))
+
+
+class LRUCache:
+    """
+    Mapping from positions to search results holding at most ``max_size``
+    entries, dropping the least recently used one when full.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        """Remove all entries and reset the statistics"""
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Return the entry for a key, or None, marking it as recently used"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        if self.max_size <= 0:
+            return
+        entries = self.entries
+        entries[key] = entry
+        entries.move_to_end(key)
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+
+class Solver:
+    """
+    Alpha-beta negamax over an MNKGame, memoized by canonical position.
+
+    ``cache_size`` caps the number of cached positions (0 disables the
+    cache) and ``symmetry=False`` keys the cache by the board as it
+    stands, for comparison.
+    """
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, symmetry=True):
+        self.cache = LRUCache(cache_size)
+        self.symmetry = symmetry
+        self.nodes = 0
+        self._shape = None
+
+    def _prepare(self, game):
+        """Set up symmetries and move order for the game's board, clearing the cache if it changed"""
+        shape = (game.m, game.n, game.k)
+        if shape == self._shape:
+            return
+        self._shape = shape
+        self.cache.clear()
+        perms = symmetries(game.m, game.n) if self.symmetry else [tuple(range(game.size))]
+        self._getters = [itemgetter(*perm) for perm in perms]
+        # Centre cells first: they lie in the most windows
+        center_row, center_col = (game.m - 1) / 2, (game.n - 1) / 2
+        self._order = sorted(range(1, game.size + 1), key=lambda p: max(
+            abs((p - 1) // game.n - center_row), abs((p - 1) % game.n - center_col)))
+
+    def key(self, game):
+        """Cache key of a position: its canonical form"""
+        return min(getter(game.cells) for getter in self._getters)
+
+    def solve(self, game):
+        """Value of the position for the player to move: 1 win, 0 draw, -1 loss"""
+        self._prepare(game)
+        winner = game.check_winner()
+        if winner:
+            return 1 if winner == game.current_player else -1
+        return self.negamax(game, -1, 1)
+
+    def best_move(self, game):
+        """Return (position, value) of a best move for the player to move"""
+        self._prepare(game)
+        player = game.current_player
+        wins = game.winning_moves(player)
+        if wins:
+            return wins[0], 1
+        best_position, best_value = None, -2
+        alpha = -1
+        for position in self._moves(game, player):
+            game.make_move(position)
+            game.switch_player()
+            value = -self.negamax(game, -1, -alpha)
+            game.undo_move()
+            if value > best_value:
+                best_position, best_value = position, value
+                alpha = max(alpha, value)
+                if value == 1:
+                    break
+        return best_position, best_value
+
+    def _moves(self, game, player):
+        """Moves to search: a forced block if the opponent threatens to win, else every empty cell"""
+        blocks = game.winning_moves(OTHER[player])
+        if blocks:
+            return blocks
+        cells = game.cells
+        return [p for p in self._order if cells[p - 1] == ' ']
+
+    def negamax(self, game, alpha, beta):
+        """
+        Value of a position (with no winner yet) for the player to move,
+        searched within the window [alpha, beta].
+        """
+        self.nodes += 1
+        if game.is_board_full():
+            return 0
+        player = game.current_player
+        if game.winning_moves(player):
+            return 1
+        threats = game.winning_moves(OTHER[player])
+        if len(threats) > 1:
+            return -1  # Only one of them can be blocked
+
+        key = self.key(game)
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        original_alpha = alpha
+        best = -1
+        for position in threats or self._moves(game, player):
+            game.make_move(position)
+            game.switch_player()
+            value = -self.negamax(game, -beta, -alpha)
+            game.undo_move()
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.cache.put(key, (best, flag))
+        return best
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Test script for Tic Tac Toe and m,n,k-games
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+def printed(func):
+    """Return what a display method prints"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        func()
+    return output.getvalue()
+
+def minimax_values():
+    """Value for the player to move of every position reachable from the empty board, by plain minimax"""
+    lines = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+    values = {}
+    
+    def minimax(cells, player):
+        key = tuple(cells)
+        if key in values:
+            return values[key]
+        other = 'O' if player == 'X' else 'X'
+        if any(cells[a] != ' ' and cells[a] == cells[b] == cells[c] for a, b, c in lines):
+            best = -1  # The previous player just won
+        elif ' ' not in cells:
+            best = 0
+        else:
+            best = -1
+            for i in range(9):
+                if cells[i] == ' ':
+                    cells[i] = player
+                    best = max(best, -minimax(cells, other))
+                    cells[i] = ' '
+        values[key] = best
+        return best
+    
+    minimax([' '] * 9, 'X')
+    return values
+
+def test_table():
+    """Test the perfect-play table against plain minimax"""
+    print("Testing perfect-play table...")
+    
+    import tictactoe_table
+    from tictactoe_table import build_table, get_table, read_table, write_table, encode, lookup, POWERS
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "table.bin")
+        table = get_table(path)
+        write_table(path, table)
+        assert read_table(path) == table == build_table()
+    print("✓ The table is written and read back unchanged")
+    
+    values = minimax_values()
+    assert tictactoe_table.count_positions(table) == len(values) == 5478
+    for cells, value in values.items():
+        code = encode([cells[0:3], cells[3:6], cells[6:9]])
+        table_value, moves = lookup(code)
+        assert table_value == value
+        player = 1 if cells.count('X') == cells.count('O') else 2
+        for i in range(9):
+            if moves >> i & 1:
+                # Every best move is a move to a position worth -value for the opponent
+                assert cells[i] == ' '
+                assert -lookup(code + player * POWERS[i])[0] == value
+    print(f"✓ {len(values):,} positions match a plain minimax search")
+    
+    from benchmark_tictactoe import random_positions, search_move
+    for board in random_positions(50, seed=1):
+        move = search_move(board)
+        assert move is not None
+        assert tictactoe_table.best_move(board) in tictactoe_table.best_moves(board)
+        row, col = (move - 1) // 3, (move - 1) % 3
+        board[row][col] = 'X' if sum(r.count('X') for r in board) == sum(r.count('O') for r in board) else 'O'
+        value = -lookup(encode(board))[0]
+        board[row][col] = ' '
+        assert value == tictactoe_table.evaluate(board)
+    print("✓ The searched move and the table agree on the value")
+    
+    from main import TicTacToe
+    game = TicTacToe(computer='X')
+    while not (game.check_winner() or game.is_board_full()):
+        game.make_move(game.best_move())
+        game.switch_player()
+    assert game.check_winner() is None
+    print("✓ Perfect play against itself is a draw")
+    
+    print("✅ Perfect-play table test passed!")
+    return True
+
+def test_mask_board():
+    """Test the two-mask board against the original list board"""
+    print("\nTesting bitmask board...")
+    
+    from main import TicTacToe
+    from benchmark_tictactoe import ListTicTacToe
+    from tictactoe_table import get_table, _digits, best_move
+    
+    table = get_table()
+    game, original = TicTacToe(), ListTicTacToe()
+    positions = 0
+    for code, entry in enumerate(table):
+        if not entry:
+            continue
+        cells = [' XO'[digit] for digit in _digits(code)]
+        original.board = [cells[0:3], cells[3:6], cells[6:9]]
+        game.masks = {player: sum(1 << i for i, cell in enumerate(cells) if cell == player)
+                      for player in 'XO'}
+        assert game.board == original.board
+        assert game.check_winner() == original.check_winner()
+        assert game.is_board_full() == original.is_board_full()
+        for position in range(0, 11):
+            assert game.is_valid_move(position) == original.is_valid_move(position)
+        positions += 1
+    print(f"✓ check_winner, is_board_full and is_valid_move match in all {positions:,} positions")
+    
+    rng = random.Random(0)
+    for _ in range(200):
+        game.reset_game()
+        original.reset_game()
+        while True:
+            position = rng.choice([p for p in range(1, 10) if original.is_valid_move(p)])
+            game.make_move(position)
+            original.make_move(position)
+            assert printed(game.display_board) == printed(original.display_board)
+            if original.check_winner() or original.is_board_full():
+                break
+            game.switch_player()
+            original.switch_player()
+            assert game.best_move() == best_move(original.board)
+    print("✓ Random games display the same boards and pick table moves")
+    
+    print("✅ Bitmask board test passed!")
+    return True
+
+def recount(game):
+    """(counts, live, threats, winning moves) recomputed from the board"""
+    counts = tuple([sum(game.cells[cell] == player for cell in window) for window in game.windows]
+                   for player in 'XO')
+    live, threats, wins = [], [], []
+    for p, player in enumerate('XO'):
+        other = counts[1 - p]
+        live.append([sum(1 for w, own in enumerate(counts[p]) if not other[w] and own == stones)
+                     for stones in range(game.k + 1)])
+        threats.append({w for w, own in enumerate(counts[p]) if not other[w] and own == game.k - 1})
+        wins.append(sorted({cell + 1 for w in threats[p] for cell in game.windows[w]
+                            if game.cells[cell] == ' '}))
+    return counts, live, threats, wins
+
+def test_mnk_game():
+    """Test MNKGame's incremental window counts and undo against recomputation"""
+    print("\nTesting m,n,k-games...")
+    
+    from mnk_game import MNKGame
+    from benchmark_tictactoe import scan_winner, random_move_orders
+    
+    for m, n, k in ((3, 3, 3), (4, 5, 3), (6, 6, 4), (7, 5, 5), (5, 5, 2)):
+        game = MNKGame(m, n, k)
+        for order in random_move_orders(m * n, 5, seed=m * n + k):
+            game.reset_game()
+            snapshots = []
+            winner = None
+            for position in order:
+                snapshots.append((list(game.cells), game.winner, recount(game)))
+                assert game.is_valid_move(position)
+                game.make_move(position)
+                state = recount(game)
+                assert (list(game.counts[0]), list(game.counts[1])) == tuple(state[0])
+                assert [game.line_counts(player) for player in 'XO'] == state[1]
+                assert list(game.threats) == state[2]
+                assert [game.winning_moves(player) for player in 'XO'] == state[3]
+                if winner is None:
+                    # Up to the first win the incremental winner matches a full scan
+                    winner = scan_winner(game.cells, m, n, k)
+                    assert game.check_winner() == winner
+                game.switch_player()
+            assert game.is_board_full()
+            while game.history:
+                game.undo_move()
+                cells, winner, state = snapshots.pop()
+                assert game.cells == cells and game.winner == winner
+                assert (list(game.counts[0]), list(game.counts[1])) == tuple(state[0])
+                assert [game.line_counts(player) for player in 'XO'] == state[1]
+                assert list(game.threats) == state[2]
+            assert game.current_player == 'X'
+        print(f"✓ {m},{n},{k}: counts, threats and winners match a recount, before and after undo")
+    
+    from main import TicTacToe
+    game, original = MNKGame(), TicTacToe()
+    assert printed(game.display_positions) == printed(original.display_positions)
+    for position in (5, 1, 9):
+        game.make_move(position)
+        original.make_move(position)
+        game.switch_player()
+        original.switch_player()
+    assert printed(game.display_board) == printed(original.display_board)
+    print("✓ A 3x3 MNKGame looks like TicTacToe")
+    
+    print("✅ m,n,k-game test passed!")
+    return True
+
+def test_solver():
+    """Test the negamax solver against the perfect-play table"""
+    print("\nTesting solver...")
+    
+    from mnk_game import MNKGame
+    from mnk_solver import Solver, LRUCache, symmetries, canonical, canonical_board
+    from tictactoe_table import get_table, lookup, _digits, POWERS
+    
+    for m, n in ((3, 3), (4, 4), (3, 5)):
+        perms = symmetries(m, n)
+        assert len(set(perms)) == (8 if m == n else 4)
+        assert tuple(range(m * n)) in perms
+        for a in perms:
+            for b in perms:
+                assert tuple(a[i] for i in b) in perms
+    print("✓ Board symmetries form a group (8 for squares, 4 for rectangles)")
+    
+    board = [['X', ' ', ' '], [' ', 'O', ' '], [' ', ' ', ' ']]
+    turned = [[' ', ' ', 'X'], [' ', 'O', ' '], [' ', ' ', ' ']]
+    assert canonical_board(board) == canonical_board(turned)
+    assert canonical_board(board) == canonical([cell for row in board for cell in row], 3, 3)
+    print("✓ Mirror images share a canonical form")
+    
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.evictions == 1
+    print("✓ The LRU cache drops the least recently used entry")
+    
+    positions = []
+    for code, entry in enumerate(get_table()):
+        if not entry or not lookup(code)[1]:
+            continue  # Illegal, or the game is over
+        digits = _digits(code)
+        game = MNKGame()
+        xs = [i + 1 for i in range(9) if digits[i] == 1]
+        os_ = [i + 1 for i in range(9) if digits[i] == 2]
+        for i, position in enumerate(xs):
+            game.make_move(position)
+            game.switch_player()
+            if i < len(os_):
+                game.make_move(os_[i])
+                game.switch_player()
+        positions.append((code, game))
+    
+    for label, options in (("symmetric", {}), ("plain", {"symmetry": False}),
+                           ("50 entries", {"cache_size": 50}), ("no cache", {"cache_size": 0})):
+        solver = Solver(**options)
+        for code, game in positions:
+            value = lookup(code)[0]
+            assert solver.solve(game) == value
+            position, best_value = solver.best_move(game)
+            assert best_value == value
+            player = 1 if game.current_player == 'X' else 2
+            assert -lookup(code + player * POWERS[position - 1])[0] == value
+        assert len(solver.cache) <= options.get("cache_size", len(solver.cache))
+        print(f"✓ {label}: solve and best_move match the table in {len(positions):,} positions")
+    
+    game = MNKGame(computer='X')
+    while not (game.check_winner() or game.is_board_full()):
+        game.make_move(game.best_move())
+        game.switch_player()
+    assert game.check_winner() is None
+    print("✓ MNKGame.best_move plays itself to a draw")
+    
+    print("✅ Solver test passed!")
+    return True
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Tic Tac Toe Tests\n")
+    
+    tests_passed = 0
+    total_tests = 4
+    
+    if test_table():
+        tests_passed += 1
+    
+    if test_mask_board():
+        tests_passed += 1
+    
+    if test_mnk_game():
+        tests_passed += 1
+    
+    if test_solver():
+        tests_passed += 1
+    
+    print(f"\n📊 Test Results: {tests_passed}/{total_tests} tests passed")
+    
+    if tests_passed == total_tests:
+        print("🎉 All tests passed! Play with: python main.py")
+    else:
+        print("❌ Some tests failed. Please check the errors above.")
+    
+    return tests_passed == total_tests
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,213 @@
+"""
+Perfect-play table for Tic Tac Toe.
+
+Tic Tac Toe has only 5,478 legal positions, so every one of them is
+solved once with minimax and the results are kept in a lookup table. After
+that, picking a move is a single array read with no search.
+
+A position is encoded as a base-3 integer: cell ``i`` (position ``i + 1``)
+contributes ``digit * 3**i`` with 0 for empty, 1 for X and 2 for O. The
+table is an ``array('H')`` indexed by that code (3**9 entries), one entry
+per code:
+    bits 0-8   the best moves, as a bitmask of cells
+    bits 9-10  the minimax value + 1 for the player to move (0 loss,
+               1 draw, 2 win)
+    bit 11     set for legal positions (the other entries are 0)
+
+Among moves with the best value, the best moves are those that win
+soonest (or lose latest).
+
+The table is built on first use and cached next to this module in
+``tictactoe_table.bin``; later runs just read the file.
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"TTTB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBI")
+
+CELLS = 9
+SIZE = 3 ** CELLS
+EMPTY, X, O = 0, 1, 2
+SYMBOLS = {' ': EMPTY, 'X': X, 'O': O}
+
+LEGAL = 1 << 11
+VALUE_SHIFT = 9
+MOVES_MASK = (1 << CELLS) - 1
+
+# Cells (0-8) of the rows, columns and diagonals
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),
+    (0, 4, 8), (2, 4, 6),
+)
+
+POWERS = tuple(3 ** i for i in range(CELLS))
+# Base-3 code of the cells in a 9-bit mask, each counted as 1
+_MASK_CODES = tuple(sum(POWERS[i] for i in range(CELLS) if mask >> i & 1) for mask in range(1 << CELLS))
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe_table.bin")
+
+_table = None
+
+
+def encode(board):
+    """Return the base-3 code of a 3x3 board of 'X', 'O' and ' '"""
+    code = 0
+    for row in reversed(board):
+        for cell in reversed(row):
+            code = code * 3 + SYMBOLS[cell]
+    return code
+
+
+def encode_masks(x_mask, o_mask):
+    """Return the base-3 code of a board given as X and O bitmasks (bit i is position i + 1)"""
+    return _MASK_CODES[x_mask] + 2 * _MASK_CODES[o_mask]
+
+
+def _digits(code):
+    return [code // power % 3 for power in POWERS]
+
+
+def _winner(cells):
+    for a, b, c in LINES:
+        if cells[a] != EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return EMPTY
+
+
+def build_table():
+    """
+    Solve every position reachable from the empty board and return the table.
+
+    Scores used while solving are 10 - plies for a win by the player to
+    move, plies - 10 for a loss and 0 for a draw, so that quicker wins
+    score higher.
+    """
+    table = array('H', bytes(2 * SIZE))
+    scores = {}
+
+    def solve(code, plies):
+        if code in scores:
+            return scores[code]
+        cells = _digits(code)
+        player = X if plies % 2 == 0 else O
+        moves = 0
+        if _winner(cells) != EMPTY:
+            # The previous player just won
+            best = plies - 10
+        elif plies == CELLS:
+            best = 0
+        else:
+            best = None
+            for i in range(CELLS):
+                if cells[i] != EMPTY:
+                    continue
+                score = -solve(code + player * POWERS[i], plies + 1)
+                if best is None or score > best:
+                    best, moves = score, 1 << i
+                elif score == best:
+                    moves |= 1 << i
+        value = (best > 0) - (best < 0)
+        table[code] = LEGAL | (value + 1) << VALUE_SHIFT | moves
+        scores[code] = best
+        return best
+
+    solve(0, 0)
+    return table
+
+
+def write_table(path, table):
+    """Write a table file, through a temporary name so readers never see half a file"""
+    data = array('H', table)
+    if sys.byteorder != "little":
+        data.byteswap()
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(data)))
+        data.tofile(f)
+    os.replace(temp_path, path)
+
+
+def read_table(path):
+    """Read a table written by write_table()"""
+    with open(path, "rb") as f:
+        magic, version, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or count != SIZE:
+            raise ValueError(f"{path} is not a Tic Tac Toe table")
+        table = array('H')
+        table.fromfile(f, count)
+    if sys.byteorder != "little":
+        table.byteswap()
+    return table
+
+
+def get_table(path=DEFAULT_TABLE_PATH):
+    """Return the table, loading it from ``path`` or building and saving it the first time"""
+    global _table
+    if _table is None:
+        try:
+            _table = read_table(path)
+        except (OSError, ValueError, EOFError):
+            _table = build_table()
+            try:
+                write_table(path, _table)
+            except OSError:
+                pass  # Read-only location: keep the table in memory only
+    return _table
+
+
+def count_positions(table=None):
+    """Number of legal positions in the table (5,478)"""
+    table = get_table() if table is None else table
+    return sum(1 for entry in table if entry)
+
+
+def lookup(code):
+    """Return (value, best moves bitmask) for a position code, or None if it is not legal"""
+    entry = get_table()[code]
+    if not entry:
+        return None
+    return (entry >> VALUE_SHIFT & 3) - 1, entry & MOVES_MASK
+
+
+def evaluate(board):
+    """Minimax value for the player to move: 1 win, 0 draw, -1 loss"""
+    result = lookup(encode(board))
+    if result is None:
+        raise ValueError("not a legal Tic Tac Toe position")
+    return result[0]
+
+
+def best_moves(board):
+    """All best moves (positions 1-9) for the player to move"""
+    result = lookup(encode(board))
+    if result is None:
+        raise ValueError("not a legal Tic Tac Toe position")
+    moves = result[1]
+    return [i + 1 for i in range(CELLS) if moves >> i & 1]
+
+
+def best_move(board):
+    """A best move (position 1-9) for the player to move, or None if the game is over"""
+    return _best_move(encode(board))
+
+
+def best_move_from_masks(x_mask, o_mask):
+    """best_move() for a board given as X and O bitmasks"""
+    return _best_move(encode_masks(x_mask, o_mask))
+
+
+def _best_move(code):
+    entry = get_table()[code]
+    if not entry:
+        raise ValueError("not a legal Tic Tac Toe position")
+    moves = entry & MOVES_MASK
+    if not moves:
+        return None
+    return (moves & -moves).bit_length()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Snake game
+
+Run from this directory:
+    python benchmark_snake.py
+
+Without a screen (for example over SSH) the rendered benchmarks use SDL's
+dummy video driver.
+"""
+
+import os
+import random
+import sys
+import time
+
+if not os.environ.get("DISPLAY") and os.name != "nt":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from snake_game import (SnakeGame, SnakeGameAI, FreeCells, Direction, Point, BLOCK_SIZE, Color,
+                        render_text, get_score_renderer)
+
+
+def time_call(func, *args, repeat=3):
+    """Return (result, best wall-clock time) over several runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+class ListSnakeGameAI(SnakeGameAI):
+    """The original list-based snake body, kept as a baseline for comparison"""
+
+    def reset(self):
+        super().reset()
+        self.snake = list(self.snake)
+
+    def play_step(self, action):
+        self.frame_iteration += 1
+        self._move(self.direction)
+        self.snake.insert(0, self.head)
+        if self.is_collision() or self.frame_iteration > 100*len(self.snake):
+            return -10, True, self.score
+        if self.head == self.food:
+            self.score += 1
+            self._place_food()
+            return 10, False, self.score
+        self.snake.pop()
+        return 0, False, self.score
+
+    def is_collision(self, pt=None):
+        if pt is None:
+            pt = self.head
+        if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
+            return True
+        return pt in self.snake[1:]
+
+
+def loop_route(side):
+    """Return the cells and headings of a clockwise square loop with the given side in cells"""
+    route = []
+    for direction, dx, dy in ((Direction.RIGHT, 1, 0), (Direction.DOWN, 0, 1),
+                              (Direction.LEFT, -1, 0), (Direction.UP, 0, -1)):
+        for _ in range(side - 1):
+            x, y = route[-1][0] if route else (0, 0)
+            route.append(((x + dx, y + dy), direction))
+    return route
+
+
+def long_snake_game(game_class, length, **options):
+    """Create a game whose snake of the given length can circle a loop forever"""
+    side = length // 4 + 3
+    if issubclass(game_class, SnakeGameAI):
+        options.setdefault("render_mode", None)
+    game = game_class(w=(side + 2) * BLOCK_SIZE, h=(side + 2) * BLOCK_SIZE, **options)
+    route = loop_route(side)
+    cells = [Point(x * BLOCK_SIZE, y * BLOCK_SIZE) for (x, y), _ in route]
+    body = cells[length - 1::-1]  # Head first
+    game.snake = type(game.snake)(body)
+    game.occupied = set(body)
+    game.free_cells = FreeCells(pt for pt in game._all_cells() if pt not in game.occupied)
+    game.head = body[0]
+    game.food = Point((side + 1) * BLOCK_SIZE, (side + 1) * BLOCK_SIZE)
+    game.route = [direction for _, direction in route]
+    game.route_index = length - 1
+    return game
+
+
+def circle_steps(game, steps):
+    """Move a long_snake_game snake around its loop"""
+    route = game.route
+    for _ in range(steps):
+        game.route_index = (game.route_index + 1) % len(route)
+        game.direction = route[game.route_index]
+        game.frame_iteration = 0
+        _, game_over, _ = game.play_step(None)
+        assert not game_over
+
+
+def bench_snake_length(lengths=(10, 100, 1000), steps=20_000):
+    """Compare steps per second of the list and deque bodies for long snakes"""
+    print("\nSteps per second by snake length")
+    print(f"  {'length':>8}{'list':>14}{'deque + set':>14}{'speedup':>10}")
+    for length in lengths:
+        rates = []
+        for game_class in (ListSnakeGameAI, SnakeGameAI):
+            game = long_snake_game(game_class, length)
+            _, elapsed = time_call(circle_steps, game, steps)
+            rates.append(steps / elapsed)
+        print(f"  {length:>8,}{rates[0]:>14,.0f}{rates[1]:>14,.0f}{rates[1] / rates[0]:>9.1f}x")
+
+
+class FullRedrawSnakeGame(SnakeGame):
+    """The original renderer, redrawing the whole window every frame, kept as a baseline"""
+
+    def _update_ui(self):
+        self.display.fill(Color.BLACK)
+        for pt in self.snake:
+            pygame.draw.rect(self.display, Color.GREEN, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
+            pygame.draw.rect(self.display, Color.DARK_GREEN, pygame.Rect(pt.x+4, pt.y+4, 12, 12))
+        pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
+        text = self.font.render("Score: " + str(self.score), True, Color.WHITE)
+        self.display.blit(text, [0, 0])
+        pygame.display.flip()
+
+
+class FontPerFrameSnakeGameAI(SnakeGameAI):
+    """The original SnakeGameAI drawing, loading the font every frame, kept as a baseline"""
+
+    def _update_ui(self):
+        self.display.fill(Color.BLACK)
+        for pt in self.snake:
+            pygame.draw.rect(self.display, Color.BLUE, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
+            pygame.draw.rect(self.display, Color.DARK_GREEN, pygame.Rect(pt.x+4, pt.y+4, 12, 12))
+        pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
+        font = pygame.font.Font(None, 36)
+        text = font.render("Score: " + str(self.score), True, Color.WHITE)
+        self.display.blit(text, [0, 0])
+        pygame.display.flip()
+
+
+def game_over_text_uncached(score):
+    font_large = pygame.font.Font(None, 48)
+    font_small = pygame.font.Font(None, 24)
+    return (font_large.render("GAME OVER", True, Color.WHITE),
+            font_large.render(f"Final Score: {score}", True, Color.WHITE),
+            font_small.render("Press SPACE to restart or ESC to quit", True, Color.WHITE))
+
+
+def game_over_text_cached(score):
+    return (render_text("GAME OVER", 48),
+            get_score_renderer("Final Score: ", 48).render(score),
+            render_text("Press SPACE to restart or ESC to quit", 24))
+
+
+def draw_ui(game, frames):
+    for i in range(frames):
+        game.score = i % 50
+        game._update_ui()
+
+
+def repeat_calls(func, count):
+    for i in range(count):
+        func(i % 50)
+
+
+def bench_text(frames=1_000):
+    """Compare frame and text rendering times with and without the font and score caches"""
+    print("\nText rendering (SnakeGameAI window, scores 0-49)")
+    times = []
+    for game_class in (FontPerFrameSnakeGameAI, SnakeGameAI):
+        game = game_class()
+        _, elapsed = time_call(draw_ui, game, frames)
+        times.append(elapsed / frames)
+    print(f"  frame, font per frame   {times[0] * 1000:>8.3f}ms")
+    print(f"  frame, cached           {times[1] * 1000:>8.3f}ms  ({times[0] / times[1]:.1f}x)")
+    _, uncached = time_call(repeat_calls, game_over_text_uncached, frames)
+    _, cached = time_call(repeat_calls, game_over_text_cached, frames)
+    print(f"  game over text          {uncached / frames * 1000:>8.3f}ms")
+    print(f"  game over text, cached  {cached / frames * 1000:>8.3f}ms  ({uncached / cached:.0f}x)")
+
+
+class NoFrameLimit:
+    """Stand-in for pygame.time.Clock that never waits"""
+
+    def tick(self, framerate=0):
+        return 0
+
+
+def circle_frames(game, frames):
+    """Move a long_snake_game SnakeGame around its loop, drawing every frame"""
+    route = game.route
+    for _ in range(frames):
+        game.route_index = (game.route_index + 1) % len(route)
+        game.direction = route[game.route_index]
+        assert not game.play_step()
+
+
+def bench_rendering(lengths=(10, 100, 1000), frames=300):
+    """Compare frame times of full redraws and dirty rectangles for long snakes"""
+    print("\nFrame time by snake length (SnakeGame, no frame limit)")
+    print(f"  {'length':>8}{'full redraw':>14}{'dirty rects':>14}{'speedup':>10}")
+    for length in lengths:
+        times = []
+        for game_class in (FullRedrawSnakeGame, SnakeGame):
+            game = long_snake_game(game_class, length)
+            game.clock = NoFrameLimit()
+            game._update_ui()
+            _, elapsed = time_call(circle_frames, game, frames)
+            times.append(elapsed / frames)
+        print(f"  {length:>8,}{times[0] * 1000:>12.3f}ms{times[1] * 1000:>12.3f}ms{times[0] / times[1]:>9.1f}x")
+
+
+def rejection_place_food(game):
+    """The original _place_food: pick any cell and retry if it is on the snake"""
+    x = random.randint(0, (game.w-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
+    y = random.randint(0, (game.h-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
+    game.food = Point(x, y)
+    if game.food in game.snake:
+        rejection_place_food(game)
+
+
+def filled_game(fraction, side=100):
+    """Create a headless game on a side x side grid with the snake covering a fraction of the cells"""
+    game = SnakeGameAI(w=side * BLOCK_SIZE, h=side * BLOCK_SIZE, render_mode=None)
+    cells = game._all_cells()
+    random.Random(0).shuffle(cells)
+    body = cells[:int(len(cells) * fraction)]
+    game.snake = list(body)
+    game.occupied = set(body)
+    for pt in body:
+        if pt in game.free_cells:
+            game.free_cells.remove(pt)
+    return game
+
+
+def place_food_calls(place_food, game, count):
+    for _ in range(count):
+        place_food(game)
+
+
+def bench_food_placement(fractions=(0.5, 0.9, 0.99), count=200):
+    """Compare food placements per second by rejection sampling and from the free cells"""
+    print("\nFood placements per second on a 100x100 board")
+    print(f"  {'filled':>8}{'rejection':>14}{'free cells':>14}{'speedup':>10}")
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100_000)
+    try:
+        for fraction in fractions:
+            game = filled_game(fraction)
+            _, rejection_time = time_call(place_food_calls, rejection_place_food, game, count, repeat=1)
+            _, free_time = time_call(place_food_calls, SnakeGameAI._place_food, game, count * 100)
+            rejection_rate = count / rejection_time
+            free_rate = count * 100 / free_time
+            print(f"  {fraction:>8.0%}{rejection_rate:>14,.0f}{free_rate:>14,.0f}{free_rate / rejection_rate:>9,.0f}x")
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def run_steps(game, steps):
+    """Step a game, starting a new one whenever it ends"""
+    for _ in range(steps):
+        _, game_over, _ = game.play_step(None)
+        if game_over:
+            game.reset()
+
+
+def draw_frames(game, frames):
+    """Redraw the window without the frame limit"""
+    for _ in range(frames):
+        game._update_ui()
+
+
+def bench_render_modes(headless_steps=100_000, rendered_steps=30):
+    """Compare steps per second headless and with the window open"""
+    print("\nSteps per second by render mode")
+    headless = SnakeGameAI(render_mode=None)
+    _, headless_time = time_call(run_steps, headless, headless_steps)
+    headless_rate = headless_steps / headless_time
+
+    rendered = SnakeGameAI()
+    _, rendered_time = time_call(run_steps, rendered, rendered_steps, repeat=1)
+    rendered_rate = rendered_steps / rendered_time
+    _, draw_time = time_call(draw_frames, rendered, 1_000, repeat=1)
+    draw_rate = 1_000 / draw_time
+
+    print(f"  headless           {headless_rate:>12,.0f} steps/s")
+    print(f"  rendered           {rendered_rate:>12,.1f} steps/s (frame limited)")
+    print(f"  drawing only       {draw_rate:>12,.0f} frames/s")
+    print(f"  speedup            {headless_rate / rendered_rate:>12,.0f}x")
+
+
+def skip_steps(game, decisions, skip, seed=0):
+    """Make random relative decisions, each held for ``skip`` ticks with step_n"""
+    rng = random.Random(seed)
+    hold = [None] * (skip - 1)
+    ticks = 0
+    for _ in range(decisions):
+        _, game_over, _, n = game.step_n([rng.randrange(3), *hold])
+        ticks += n
+        if game_over:
+            game.reset()
+    return ticks
+
+
+def bench_frame_skip(decisions=50_000, skips=(1, 2, 4, 8)):
+    """Report ticks and decisions per second with step_n frame skipping"""
+    print(f"\nFrame skipping with step_n ({decisions:,} decisions)")
+    game = SnakeGameAI(render_mode=None, seed=0)
+    for skip in skips:
+        ticks, elapsed = time_call(skip_steps, game, decisions, skip, repeat=1)
+        print(f"  skip {skip:<3}{ticks / elapsed:>14,.0f} ticks/s{decisions / elapsed:>12,.0f} decisions/s")
+
+
+def vec_env_steps(env, steps, rng):
+    """Step every game of a SnakeVecEnv with random relative actions"""
+    for _ in range(steps):
+        env.step(rng.integers(0, 3, env.num_envs))
+
+
+def bench_vec_env(num_envs=1024, steps=500, single_steps=100_000):
+    """Compare steps per second of one headless game and of SnakeVecEnv"""
+    print(f"\nVectorized environment ({num_envs:,} games x {steps} steps)")
+    try:
+        import numpy as np
+        from snake_vec_env import SnakeVecEnv
+    except ImportError:
+        print("  skipped: numpy is not installed")
+        return
+    game = SnakeGameAI(render_mode=None)
+    _, single_time = time_call(run_steps, game, single_steps, repeat=1)
+    single_rate = single_steps / single_time
+    env = SnakeVecEnv(num_envs, seed=0)
+    _, vec_time = time_call(vec_env_steps, env, steps, np.random.default_rng(0), repeat=1)
+    vec_rate = num_envs * steps / vec_time
+    print(f"  SnakeGameAI        {single_rate:>12,.0f} steps/s")
+    print(f"  SnakeVecEnv        {vec_rate:>12,.0f} steps/s")
+    print(f"  speedup            {vec_rate / single_rate:>12.2f}x")
+
+
+def env_steps(env, steps, seed=0):
+    """Step a SnakeEnv with random actions, resetting after each game"""
+    rng = random.Random(seed)
+    env.reset(seed=seed)
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(rng.randrange(3))
+        if terminated or truncated:
+            env.reset()
+
+
+def bench_encoders(steps=50_000):
+    """Compare SnakeEnv steps per second with each observation encoder"""
+    print(f"\nSnakeEnv steps per second by observation ({steps:,} steps)")
+    try:
+        from snake_env import SnakeEnv, ENCODERS
+    except ImportError:
+        print("  skipped: numpy is not installed")
+        return
+    for observation in ENCODERS:
+        env = SnakeEnv(observation)
+        _, elapsed = time_call(env_steps, env, steps, repeat=1)
+        shape = "x".join(str(n) for n in env.observation_shape)
+        print(f"  {observation:<10}{shape:>10}{steps / elapsed:>12,.0f} steps/s")
+
+
+def bench_rollouts(worker_counts=(1, 2, 4), envs_per_worker=8, steps=64, batches=20):
+    """Compare steps per second of one SnakeEnv and of the rollout collector"""
+    print(f"\nRollout collection ({envs_per_worker} games per worker, {os.cpu_count()} CPUs)")
+    try:
+        from snake_rollout import RolloutCollector
+        from snake_env import SnakeEnv
+    except ImportError:
+        print("  skipped: numpy is not installed")
+        return
+    count = envs_per_worker * steps * batches
+    _, single_time = time_call(env_steps, SnakeEnv(), count, repeat=1)
+    print(f"  single process       {count / single_time:>12,.0f} steps/s")
+    for mode in ("lockstep", "async"):
+        for workers in worker_counts:
+            with RolloutCollector(workers, envs_per_worker, mode=mode, capacity=2 * steps) as collector:
+                collector.collect(steps)  # Warm up
+                start = time.perf_counter()
+                for _ in range(batches):
+                    collector.collect(steps)
+                elapsed = time.perf_counter() - start
+            rate = workers * envs_per_worker * steps * batches / elapsed
+            print(f"  {mode:<9}{workers:>2} workers  {rate:>12,.0f} steps/s")
+
+
+def bench_replays(games=1_000):
+    """Report replay size and re-simulation speed"""
+    from snake_replay import record_games, pack_actions, simulate
+    print(f"\nReplays ({games:,} games from a random policy)")
+    replays = record_games(games)
+    steps = sum(len(replay.actions) for replay in replays)
+    size = sum(8 + len(pack_actions(replay.actions)) for replay in replays)
+    game = SnakeGameAI(render_mode=None)
+    _, elapsed = time_call(lambda: [simulate(game, replay) for replay in replays], repeat=1)
+    print(f"  size               {size / games:>12,.0f} bytes/game ({size * 8 / steps:.2f} bits/step)")
+    print(f"  re-simulation      {games / elapsed:>12,.0f} games/s ({steps / elapsed:,.0f} steps/s)")
+
+
+def main():
+    bench_render_modes()
+    bench_frame_skip()
+    bench_snake_length()
+    bench_food_placement()
+    bench_rendering()
+    bench_text()
+    bench_encoders()
+    bench_rollouts()
+    bench_replays()
+    bench_vec_env()
+
+
+if __name__ == "__main__":
+    main()
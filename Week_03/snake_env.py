@@ -0,0 +1,201 @@
+"""
+Gymnasium-style Snake environment for training agents.
+
+``SnakeEnv`` wraps a SnakeGameAI with ``reset()`` and ``step(action)``
+returning observations, following the Gymnasium API without depending on
+it. Requires numpy.
+
+Actions are relative to the snake's heading: 0 keeps going straight, 1
+turns right and 2 turns left.
+
+Observations come from one of the encoders, each writing into a NumPy
+buffer allocated once (the same array is returned on every step):
+    'features'  the classic 11 values: danger straight/right/left, heading
+                left/right/up/down, food left/right/up/down
+    'grid'      (3, rows, cols) planes for the body, the head and the food,
+                updated only where the snake and food moved
+    'ego'       a (3, size, size) crop of the grid centred on the head and
+                turned so the snake heads up, with walls marked as body
+"""
+
+import numpy as np
+
+from snake_game import SnakeGameAI, Direction, BLOCK_SIZE, CLOCKWISE, HEADING, turn, next_point
+from snake_replay import Replay
+
+BODY, HEAD, FOOD = 0, 1, 2
+
+
+class FeatureEncoder:
+    """The 11-feature danger/heading/food vector"""
+
+    def __init__(self, game):
+        self.buffer = np.zeros(11, dtype=np.float32)
+
+    def reset(self, game):
+        return self.update(game)
+
+    def update(self, game):
+        head = game.head
+        direction = game.direction
+        heading = HEADING[direction]
+        food = game.food
+        self.buffer[:] = (
+            # Danger straight, right and left
+            game.is_collision(next_point(head, direction)),
+            game.is_collision(next_point(head, CLOCKWISE[(heading + 1) % 4])),
+            game.is_collision(next_point(head, CLOCKWISE[(heading - 1) % 4])),
+            # Heading
+            direction == Direction.LEFT,
+            direction == Direction.RIGHT,
+            direction == Direction.UP,
+            direction == Direction.DOWN,
+            # Food location
+            food is not None and food.x < head.x,
+            food is not None and food.x > head.x,
+            food is not None and food.y < head.y,
+            food is not None and food.y > head.y,
+        )
+        return self.buffer
+
+
+class GridEncoder:
+    """
+    Body, head and food planes of the whole board.
+
+    The planes are redrawn in full on reset; after that each step only
+    touches the new head, the old head, the dropped tail and the food.
+    """
+
+    def __init__(self, game, padding=0):
+        self.rows = (game.h - BLOCK_SIZE) // BLOCK_SIZE + 1
+        self.cols = (game.w - BLOCK_SIZE) // BLOCK_SIZE + 1
+        self.padding = padding
+        # Planes with a border of ``padding`` cells marked as body (walls)
+        self.planes = np.zeros((3, self.rows + 2 * padding, self.cols + 2 * padding), dtype=np.float32)
+        self.buffer = self.planes[:, padding:padding + self.rows, padding:padding + self.cols]
+        self._head = self._tail = self._food = None
+
+    def _cell(self, point):
+        return (int(point.y) // BLOCK_SIZE + self.padding, int(point.x) // BLOCK_SIZE + self.padding)
+
+    def reset(self, game):
+        planes = self.planes
+        planes[BODY] = 1
+        planes[HEAD:] = 0
+        self.buffer[BODY] = 0
+        for pt in game.snake:
+            planes[(BODY, *self._cell(pt))] = 1
+        self._head = self._cell(game.head)
+        self._tail = game.snake[-1]
+        planes[(HEAD, *self._head)] = 1
+        self._food = None
+        if game.food is not None:
+            self._food = self._cell(game.food)
+            planes[(FOOD, *self._food)] = 1
+        return self.buffer
+
+    def update(self, game):
+        planes = self.planes
+        head = self._cell(game.head)
+        planes[(HEAD, *self._head)] = 0
+        planes[(HEAD, *head)] = 1
+        planes[(BODY, *head)] = 1
+        self._head = head
+        if game.snake[-1] != self._tail:
+            planes[(BODY, *self._cell(self._tail))] = 0
+            self._tail = game.snake[-1]
+        food = None if game.food is None else self._cell(game.food)
+        if food != self._food:
+            if self._food is not None:
+                planes[(FOOD, *self._food)] = 0
+            if food is not None:
+                planes[(FOOD, *food)] = 1
+            self._food = food
+        return self.buffer
+
+
+class EgoEncoder(GridEncoder):
+    """A size x size crop of the grid around the head, turned so the snake heads up"""
+
+    # Quarter turns (counter-clockwise) that bring each heading to the top
+    _ROTATIONS = {Direction.UP: 0, Direction.RIGHT: 1, Direction.DOWN: 2, Direction.LEFT: 3}
+
+    def __init__(self, game, size=11):
+        if size % 2 == 0:
+            raise ValueError("size must be odd so the crop is centred on the head")
+        super().__init__(game, padding=size // 2)
+        self.size = size
+        self.view = np.zeros((3, size, size), dtype=np.float32)
+
+    def reset(self, game):
+        super().reset(game)
+        return self._crop(game)
+
+    def update(self, game):
+        super().update(game)
+        return self._crop(game)
+
+    def _crop(self, game):
+        row, col = self._head
+        r = self.padding
+        window = self.planes[:, row - r:row + r + 1, col - r:col + r + 1]
+        np.copyto(self.view, np.rot90(window, self._ROTATIONS[game.direction], axes=(1, 2)))
+        return self.view
+
+
+ENCODERS = {
+    'features': FeatureEncoder,
+    'grid': GridEncoder,
+    'ego': EgoEncoder,
+}
+
+
+class SnakeEnv:
+    """
+    Snake with Gymnasium's reset()/step() interface.
+
+    ``reset(seed=None)`` returns (observation, info) and ``step(action)``
+    returns (observation, reward, terminated, truncated, info). A game that
+    ends by a collision is terminated; one that runs into SnakeGameAI's
+    frame limit is truncated. On the final step the observation still shows
+    the board before the fatal move. ``info`` holds the score.
+
+    ``reset(seed)`` seeds the sequence of game seeds, so the games that
+    follow are the same every run. ``replay()`` returns the current game
+    as a Replay (its seed and the actions taken so far).
+
+    Extra keyword arguments are passed to the encoder, for example
+    ``SnakeEnv('ego', size=15)``.
+    """
+
+    num_actions = 3
+
+    def __init__(self, observation='features', w=640, h=480, render_mode=None, **encoder_options):
+        if observation not in ENCODERS:
+            raise ValueError(f"observation must be one of {sorted(ENCODERS)}, not {observation!r}")
+        self.game = SnakeGameAI(w, h, render_mode)
+        self.actions = bytearray()
+        self.encoder = ENCODERS[observation](self.game, **encoder_options)
+        self.observation = self.encoder.reset(self.game)
+        self.observation_shape = self.observation.shape
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.game.seeds.seed(seed)
+        self.game.reset()
+        self.actions.clear()
+        self.observation = self.encoder.reset(self.game)
+        return self.observation, {'score': 0}
+
+    def step(self, action):
+        game = self.game
+        collision = game.is_collision(next_point(game.head, turn(game.direction, action)))
+        reward, game_over, score = game.play_step(action)
+        self.actions.append(action)
+        if not game_over:
+            self.observation = self.encoder.update(game)
+        return self.observation, reward, game_over and collision, game_over and not collision, {'score': score}
+
+    def replay(self):
+        return Replay(self.game.seed, bytes(self.actions))
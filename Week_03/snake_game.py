@@ -1,11 +1,9 @@
 import pygame
 import sys
 import random
+from numbers import Integral
 from enum import Enum
-from collections import namedtuple
-
-# Initialize pygame
-pygame.init()
+from collections import namedtuple, deque
 
 # Define colors
 class Color:
@@ -27,93 +25,279 @@ class Direction(Enum):
 # Point class for coordinates
 Point = namedtuple('Point', 'x, y')
 
+class FreeCells:
+    """
+    The cells not covered by the snake, as an array plus an index map.
+
+    Adding, removing (by swapping the last cell into the gap) and picking a
+    random cell all take constant time, however full the board is.
+    """
+    
+    def __init__(self, cells):
+        self.cells = list(cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        
+    def __len__(self):
+        return len(self.cells)
+        
+    def __contains__(self, cell):
+        return cell in self.index
+        
+    def add(self, cell):
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+        
+    def remove(self, cell):
+        i = self.index.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+            
+    def choice(self, rng=random):
+        return self.cells[rng.randrange(len(self.cells))]
+
 # Game settings
 BLOCK_SIZE = 20
 SPEED = 15
 
+# Relative actions, and the headings in clockwise order they turn through
+STRAIGHT, TURN_RIGHT, TURN_LEFT = 0, 1, 2
+CLOCKWISE = (Direction.RIGHT, Direction.DOWN, Direction.LEFT, Direction.UP)
+HEADING = {direction: i for i, direction in enumerate(CLOCKWISE)}
+_TURNS = (0, 1, -1)
+
+def turn(direction, action):
+    """Return the heading after taking a relative action"""
+    return CLOCKWISE[(HEADING[direction] + _TURNS[action]) % 4]
+
+def opposite(direction):
+    """Return the heading facing the other way"""
+    return CLOCKWISE[(HEADING[direction] + 2) % 4]
+
+_STEPS = {
+    Direction.RIGHT: (BLOCK_SIZE, 0),
+    Direction.DOWN: (0, BLOCK_SIZE),
+    Direction.LEFT: (-BLOCK_SIZE, 0),
+    Direction.UP: (0, -BLOCK_SIZE),
+}
+
+def next_point(point, direction):
+    """Return the cell next to a point in a direction"""
+    dx, dy = _STEPS[direction]
+    return Point(point.x + dx, point.y + dy)
+
+# Fonts and pre-rendered text, created on first use (after pygame.init())
+# and shared by every game
+_fonts = {}
+_texts = {}
+_score_renderers = {}
+
+def get_font(size):
+    """Return the default font at a size, loading it only once"""
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+def render_text(text, size):
+    """Return fixed white text as a surface, rendering it only once"""
+    surface = _texts.get((text, size))
+    if surface is None:
+        surface = _texts[text, size] = get_font(size).render(text, True, Color.WHITE)
+    return surface
+
+def get_score_renderer(label, size):
+    """Return the shared ScoreRenderer for a label and font size"""
+    renderer = _score_renderers.get((label, size))
+    if renderer is None:
+        renderer = _score_renderers[label, size] = ScoreRenderer(label, size)
+    return renderer
+
+class ScoreRenderer:
+    """
+    Renders "<label><score>", once per score.
+
+    The whole string is rendered in one call so it keeps the font's
+    kerning (exactly what ``font.render`` gives), and the surface is
+    reused on every frame until the score changes.
+    """
+    
+    MAX_CACHED = 1000
+    
+    def __init__(self, label, size):
+        self.text = label
+        self.font = get_font(size)
+        self.cache = {}
+        
+    def render(self, score):
+        surface = self.cache.get(score)
+        if surface is None:
+            surface = self.font.render(f"{self.text}{score}", True, Color.WHITE)
+            if len(self.cache) >= self.MAX_CACHED:
+                self.cache.clear()
+            self.cache[score] = surface
+        return surface
+
+# 'human' opens a window and runs at SPEED frames per second;
+# None runs headless, without a window, event polling, drawing or frame limit
+RENDER_MODES = ('human', None)
+
 class SnakeGameAI:
     
-    def __init__(self, w=640, h=480):
+    def __init__(self, w=640, h=480, render_mode='human', seed=None):
+        if render_mode not in RENDER_MODES:
+            raise ValueError(f"render_mode must be one of {RENDER_MODES}, not {render_mode!r}")
         self.w = w
         self.h = h
-        # Initialize display
-        self.display = pygame.display.set_mode((self.w, self.h))
-        pygame.display.set_caption('Snake Game')
-        self.clock = pygame.time.Clock()
+        self._cells = None
+        # Every game gets its own seed, drawn from ``seeds``; ``rng`` places the food
+        self.seeds = random.Random(seed)
+        self.rng = random.Random()
+        self.fps = SPEED
+        self.render_mode = render_mode
+        self.display = None
+        self.clock = None
+        if render_mode == 'human':
+            # Initialize display
+            pygame.init()
+            self.display = pygame.display.set_mode((self.w, self.h))
+            pygame.display.set_caption('Snake Game')
+            self.clock = pygame.time.Clock()
         self.reset()
         
-    def reset(self):
-        # Initialize game state
+    def reset(self, seed=None):
+        # Initialize game state; the same seed always gives the same game
+        self.seed = self.seeds.getrandbits(32) if seed is None else seed
+        self.rng.seed(self.seed)
         self.direction = Direction.RIGHT
         
-        self.head = Point(self.w/2, self.h/2)
-        self.snake = [self.head,
-                      Point(self.head.x-BLOCK_SIZE, self.head.y),
-                      Point(self.head.x-(2*BLOCK_SIZE), self.head.y)]
+        # Start in the middle, on the grid so the free cells cover the whole snake
+        self.head = Point(self.w//2//BLOCK_SIZE*BLOCK_SIZE, self.h//2//BLOCK_SIZE*BLOCK_SIZE)
+        self.snake = deque([self.head,
+                            Point(self.head.x-BLOCK_SIZE, self.head.y),
+                            Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
+        # Cells covered by the snake and the free cells, kept in step with self.snake
+        self.occupied = set(self.snake)
+        self.free_cells = FreeCells(self._all_cells())
+        for pt in self.snake:
+            self.free_cells.remove(pt)
         
         self.score = 0
         self.food = None
         self._place_food()
         self.frame_iteration = 0
         
+    def _all_cells(self):
+        # Built once per board size and shared by every reset
+        if self._cells is None:
+            self._cells = [Point(x*BLOCK_SIZE, y*BLOCK_SIZE)
+                           for y in range((self.h-BLOCK_SIZE)//BLOCK_SIZE + 1)
+                           for x in range((self.w-BLOCK_SIZE)//BLOCK_SIZE + 1)]
+        return self._cells
+        
     def _place_food(self):
-        x = random.randint(0, (self.w-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        y = random.randint(0, (self.h-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        # Sample directly from the free cells; None once the snake fills the board
+        self.food = self.free_cells.choice(self.rng) if self.free_cells else None
         
     def play_step(self, action):
-        self.frame_iteration += 1
+        """
+        Advance the game one tick and return (reward, game_over, score).
+
+        The action steers the snake: STRAIGHT (0), TURN_RIGHT (1) or
+        TURN_LEFT (2) relative to its heading, a one-hot
+        [straight, right, left] list, or an absolute Direction (reversing
+        straight back into the body is ignored, as with the arrow keys).
+        None keeps the current heading. Any other integer raises ValueError.
+        """
         # 1. collect user input
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                quit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_LEFT and self.direction != Direction.RIGHT:
-                    self.direction = Direction.LEFT
-                elif event.key == pygame.K_RIGHT and self.direction != Direction.LEFT:
-                    self.direction = Direction.RIGHT
-                elif event.key == pygame.K_UP and self.direction != Direction.DOWN:
-                    self.direction = Direction.UP
-                elif event.key == pygame.K_DOWN and self.direction != Direction.UP:
-                    self.direction = Direction.DOWN
+        if self.render_mode == 'human':
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    quit()
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_LEFT and self.direction != Direction.RIGHT:
+                        self.direction = Direction.LEFT
+                    elif event.key == pygame.K_RIGHT and self.direction != Direction.LEFT:
+                        self.direction = Direction.RIGHT
+                    elif event.key == pygame.K_UP and self.direction != Direction.DOWN:
+                        self.direction = Direction.UP
+                    elif event.key == pygame.K_DOWN and self.direction != Direction.UP:
+                        self.direction = Direction.DOWN
+        if action is not None:
+            self._steer(action)
+        self.frame_iteration += 1
         
         # 2. move
         self._move(self.direction) # update the head
-        self.snake.insert(0, self.head)
+        collision = self.is_collision() # checked before the head joins the body
+        self.snake.appendleft(self.head)
+        self.occupied.add(self.head)
         
         # 3. check if game over
         reward = 0
         game_over = False
-        if self.is_collision() or self.frame_iteration > 100*len(self.snake):
+        if collision or self.frame_iteration > 100*len(self.snake):
             game_over = True
             reward = -10
             return reward, game_over, self.score
             
         # 4. place new food or just move
+        self.free_cells.remove(self.head)
         if self.head == self.food:
             self.score += 1
             reward = 10
             self._place_food()
         else:
-            self.snake.pop()
+            tail = self.snake.pop()
+            self.occupied.discard(tail)
+            self.free_cells.add(tail)
         
         # 5. update ui and clock
-        self._update_ui()
-        self.clock.tick(SPEED)
+        if self.render_mode == 'human':
+            self._update_ui()
+            self.clock.tick(self.fps)
         # 6. return game over and score
         return reward, game_over, self.score
     
+    def step_n(self, actions):
+        """
+        Play one tick per action and return (total reward, game_over, score, ticks).
+
+        Stops early if the game ends. For frame skipping, pass the decision
+        followed by None for the ticks that keep the heading, e.g.
+        ``step_n([action, None, None, None])``.
+        """
+        total = 0
+        ticks = 0
+        for action in actions:
+            reward, game_over, score = self.play_step(action)
+            total += reward
+            ticks += 1
+            if game_over:
+                return total, True, score, ticks
+        return total, False, self.score, ticks
+    
+    def _steer(self, action):
+        if isinstance(action, Direction):
+            if action != opposite(self.direction):
+                self.direction = action
+            return
+        if not isinstance(action, Integral):
+            action = list(action).index(1)  # One-hot [straight, right, left]
+        elif not 0 <= action <= 2:
+            raise ValueError(f"action must be STRAIGHT (0), TURN_RIGHT (1) or TURN_LEFT (2), not {action!r}")
+        self.direction = turn(self.direction, action)
+        
     def is_collision(self, pt=None):
         if pt is None:
             pt = self.head
         # hits boundary
         if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
             return True
-        # hits itself
-        if pt in self.snake[1:]:
+        # hits itself (any cell behind the head)
+        if pt in self.occupied and pt != self.snake[0]:
             return True
         
         return False
@@ -127,11 +311,11 @@ class SnakeGameAI:
             pygame.draw.rect(self.display, Color.DARK_GREEN, pygame.Rect(pt.x+4, pt.y+4, 12, 12))
             
         # Draw food
-        pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
+        if self.food is not None:
+            pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
         
         # Draw score
-        font = pygame.font.Font(None, 36)
-        text = font.render("Score: " + str(self.score), True, Color.WHITE)
+        text = get_score_renderer("Score: ", 36).render(self.score)
         self.display.blit(text, [0, 0])
         pygame.display.flip()
         
@@ -151,35 +335,56 @@ class SnakeGameAI:
 
 
 class SnakeGame:
-    def __init__(self, w=640, h=480):
+    def __init__(self, w=640, h=480, seed=None):
         self.w = w
         self.h = h
+        self._cells = None
+        # Every game gets its own seed, drawn from ``seeds``; ``rng`` places the food
+        self.seeds = random.Random(seed)
+        self.rng = random.Random()
         # Initialize display
+        pygame.init()
         self.display = pygame.display.set_mode((self.w, self.h))
         pygame.display.set_caption('Snake Game - Use Arrow Keys')
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 25)
+        self.font = get_font(25)
+        self.score_text = get_score_renderer("Score: ", 25)
+        self._overlay = None
         self.reset()
         
-    def reset(self):
-        # Initialize game state
+    def reset(self, seed=None):
+        # Initialize game state; the same seed always gives the same game
+        self.seed = self.seeds.getrandbits(32) if seed is None else seed
+        self.rng.seed(self.seed)
         self.direction = Direction.RIGHT
         
-        self.head = Point(self.w/2, self.h/2)
-        self.snake = [self.head,
-                      Point(self.head.x-BLOCK_SIZE, self.head.y),
-                      Point(self.head.x-(2*BLOCK_SIZE), self.head.y)]
+        # Start in the middle, on the grid so the free cells cover the whole snake
+        self.head = Point(self.w//2//BLOCK_SIZE*BLOCK_SIZE, self.h//2//BLOCK_SIZE*BLOCK_SIZE)
+        self.snake = deque([self.head,
+                            Point(self.head.x-BLOCK_SIZE, self.head.y),
+                            Point(self.head.x-(2*BLOCK_SIZE), self.head.y)])
+        # Cells covered by the snake and the free cells, kept in step with self.snake
+        self.occupied = set(self.snake)
+        self.free_cells = FreeCells(self._all_cells())
+        for pt in self.snake:
+            self.free_cells.remove(pt)
         
         self.score = 0
         self.food = None
         self._place_food()
+        self._full_redraw = True
+        
+    def _all_cells(self):
+        # Built once per board size and shared by every reset
+        if self._cells is None:
+            self._cells = [Point(x*BLOCK_SIZE, y*BLOCK_SIZE)
+                           for y in range((self.h-BLOCK_SIZE)//BLOCK_SIZE + 1)
+                           for x in range((self.w-BLOCK_SIZE)//BLOCK_SIZE + 1)]
+        return self._cells
         
     def _place_food(self):
-        x = random.randint(0, (self.w-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        y = random.randint(0, (self.h-BLOCK_SIZE )//BLOCK_SIZE )*BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        # Sample directly from the free cells; None once the snake fills the board
+        self.food = self.free_cells.choice(self.rng) if self.free_cells else None
         
     def play_step(self):
         # 1. collect user input
@@ -201,20 +406,25 @@ class SnakeGame:
         
         # 2. move
         self._move(self.direction) # update the head
-        self.snake.insert(0, self.head)
+        collision = self.is_collision() # checked before the head joins the body
+        self.snake.appendleft(self.head)
+        self.occupied.add(self.head)
         
         # 3. check if game over
         game_over = False
-        if self.is_collision():
+        if collision:
             game_over = True
             return game_over
             
         # 4. place new food or just move
+        self.free_cells.remove(self.head)
         if self.head == self.food:
             self.score += 1
             self._place_food()
         else:
-            self.snake.pop()
+            tail = self.snake.pop()
+            self.occupied.discard(tail)
+            self.free_cells.add(tail)
         
         # 5. update ui and clock
         self._update_ui()
@@ -228,27 +438,81 @@ class SnakeGame:
         # hits boundary
         if pt.x > self.w - BLOCK_SIZE or pt.x < 0 or pt.y > self.h - BLOCK_SIZE or pt.y < 0:
             return True
-        # hits itself
-        if pt in self.snake[1:]:
+        # hits itself (any cell behind the head)
+        if pt in self.occupied and pt != self.snake[0]:
             return True
         
         return False
         
     def _update_ui(self):
+        # After a reset (or the game over overlay) draw everything once;
+        # afterwards only the cells that changed are redrawn
+        if self._full_redraw:
+            self._redraw_all()
+            return
+        dirty = []
+        
+        # Vacated tail cell
+        if self._drawn_tail not in self.occupied:
+            dirty.append(self._draw_cell(self._drawn_tail))
+        # New food (the old food cell is now the head)
+        if self.food != self._drawn_food and self.food is not None:
+            dirty.append(self._draw_cell(self.food))
+        # New head
+        if self.head != self._drawn_head:
+            dirty.append(self._draw_cell(self.head))
+        self._drawn_head, self._drawn_tail, self._drawn_food = self.head, self.snake[-1], self.food
+        
+        # Score, redrawn when it changes or a changed cell lies under it
+        if self.score != self._drawn_score or any(r.colliderect(self._score_rect) for r in dirty):
+            dirty.append(self._draw_score())
+        
+        pygame.display.update(dirty)
+        
+    def _redraw_all(self):
         self.display.fill(Color.BLACK)
         
         # Draw snake
         for pt in self.snake:
-            pygame.draw.rect(self.display, Color.GREEN, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
-            pygame.draw.rect(self.display, Color.DARK_GREEN, pygame.Rect(pt.x+4, pt.y+4, 12, 12))
+            self._draw_segment(pt)
             
         # Draw food
-        pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
+        if self.food is not None:
+            pygame.draw.rect(self.display, Color.RED, pygame.Rect(self.food.x, self.food.y, BLOCK_SIZE, BLOCK_SIZE))
         
         # Draw score
-        text = self.font.render("Score: " + str(self.score), True, Color.WHITE)
-        self.display.blit(text, [0, 0])
+        self._score_rect = pygame.Rect(0, 0, 0, 0)
+        self._draw_score()
         pygame.display.flip()
+        self._drawn_head, self._drawn_tail, self._drawn_food = self.head, self.snake[-1], self.food
+        self._full_redraw = False
+        
+    def _draw_segment(self, pt):
+        pygame.draw.rect(self.display, Color.GREEN, pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE))
+        pygame.draw.rect(self.display, Color.DARK_GREEN, pygame.Rect(pt.x+4, pt.y+4, 12, 12))
+        
+    def _draw_cell(self, pt):
+        """Redraw one cell (snake, food or background) and return its rect"""
+        rect = pygame.Rect(pt.x, pt.y, BLOCK_SIZE, BLOCK_SIZE)
+        if pt in self.occupied:
+            self._draw_segment(pt)
+        elif pt == self.food:
+            pygame.draw.rect(self.display, Color.RED, rect)
+        else:
+            self.display.fill(Color.BLACK, rect)
+        return rect
+        
+    def _draw_score(self):
+        """Redraw the score over the cells beneath it and return the area that changed"""
+        text = self.score_text.render(self.score)
+        area = self._score_rect.union(text.get_rect())
+        for y in range(0, area.bottom, BLOCK_SIZE):
+            for x in range(0, area.right, BLOCK_SIZE):
+                self._draw_cell(Point(x, y))
+        self.display.blit(text, [0, 0])
+        self._score_rect = text.get_rect()
+        self._drawn_score = self.score
+        return area
         
     def _move(self, direction):
         x = self.head.x
@@ -266,18 +530,16 @@ class SnakeGame:
     
     def game_over_screen(self):
         # Fill screen with semi-transparent overlay
-        overlay = pygame.Surface((self.w, self.h))
-        overlay.set_alpha(128)
-        overlay.fill(Color.BLACK)
-        self.display.blit(overlay, (0, 0))
+        if self._overlay is None:
+            self._overlay = pygame.Surface((self.w, self.h))
+            self._overlay.set_alpha(128)
+            self._overlay.fill(Color.BLACK)
+        self.display.blit(self._overlay, (0, 0))
         
         # Game over text
-        font_large = pygame.font.Font(None, 48)
-        font_small = pygame.font.Font(None, 24)
-        
-        game_over_text = font_large.render("GAME OVER", True, Color.WHITE)
-        score_text = font_large.render(f"Final Score: {self.score}", True, Color.WHITE)
-        restart_text = font_small.render("Press SPACE to restart or ESC to quit", True, Color.WHITE)
+        game_over_text = render_text("GAME OVER", 48)
+        score_text = get_score_renderer("Final Score: ", 48).render(self.score)
+        restart_text = render_text("Press SPACE to restart or ESC to quit", 24)
         
         # Center the text
         game_over_rect = game_over_text.get_rect(center=(self.w//2, self.h//2 - 50))
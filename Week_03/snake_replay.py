@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Snake replays: record games compactly and play them back
+
+A game is decided by its seed (which places the food) and the actions
+taken, so a replay stores only those. Actions are the relative moves used
+by SnakeEnv (0 straight, 1 turn right, 2 turn left), packed four to a byte.
+
+File layout (little-endian):
+    header   magic b"SNKR", version, board width and height in cells
+    games    seed (uint32), steps (uint32), then ceil(steps / 4) bytes of
+             actions, 2 bits each, first action in the lowest bits
+
+Replays can be re-simulated headlessly at full speed, or any one of them
+shown in a window:
+    python snake_replay.py record games.snkr --games 1000
+    python snake_replay.py simulate games.snkr
+    python snake_replay.py play games.snkr --game 7 --fps 60
+"""
+
+import argparse
+import struct
+import time
+from collections import namedtuple
+
+from snake_game import SnakeGameAI, BLOCK_SIZE, SPEED, STRAIGHT, TURN_RIGHT, TURN_LEFT, turn, next_point
+
+MAGIC = b"SNKR"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBHH")
+GAME = struct.Struct("<II")
+
+# One recorded game: its seed and one action per step (as bytes)
+Replay = namedtuple('Replay', 'seed, actions')
+
+# The four actions stored in each possible byte
+_UNPACKED = [bytes((b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6 & 3)) for b in range(256)]
+
+
+def pack_actions(actions):
+    """Pack actions (each 0-3) four to a byte"""
+    actions = bytes(actions) + bytes(-len(actions) % 4)
+    return bytes(actions[i] | actions[i + 1] << 2 | actions[i + 2] << 4 | actions[i + 3] << 6
+                 for i in range(0, len(actions), 4))
+
+
+def unpack_actions(data, steps):
+    """Unpack ``steps`` actions from packed bytes"""
+    return b"".join([_UNPACKED[b] for b in data])[:steps]
+
+
+class ReplayWriter:
+    """Append replays to a file as games finish"""
+
+    def __init__(self, path, w=640, h=480):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, w // BLOCK_SIZE, h // BLOCK_SIZE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, replay):
+        self.file.write(GAME.pack(replay.seed, len(replay.actions)))
+        self.file.write(pack_actions(replay.actions))
+
+    def close(self):
+        self.file.close()
+
+
+def read_replays(path):
+    """Return (w, h, replays) from a replay file, with w and h in pixels"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, cols, rows = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a Snake replay file")
+    replays = []
+    offset = HEADER.size
+    while offset < len(data):
+        seed, steps = GAME.unpack_from(data, offset)
+        offset += GAME.size
+        size = (steps + 3) // 4
+        replays.append(Replay(seed, unpack_actions(data[offset:offset + size], steps)))
+        offset += size
+    return cols * BLOCK_SIZE, rows * BLOCK_SIZE, replays
+
+
+def simulate(game, replay):
+    """Play a replay on a game and return its final score"""
+    game.reset(seed=replay.seed)
+    for action in replay.actions:
+        _, game_over, score = game.play_step(action)
+        if game_over:
+            break
+    return game.score
+
+
+def record_games(count, seed=0, w=640, h=480):
+    """
+    Play games with a random policy that avoids immediate collisions and
+    return their replays
+    """
+    game = SnakeGameAI(w, h, render_mode=None, seed=seed)
+    policy = game.seeds
+    replays = []
+    for _ in range(count):
+        game.reset()
+        actions = bytearray()
+        game_over = False
+        while not game_over:
+            safe = [a for a in (STRAIGHT, TURN_RIGHT, TURN_LEFT)
+                    if not game.is_collision(next_point(game.head, turn(game.direction, a)))]
+            action = policy.choice(safe) if safe else STRAIGHT
+            actions.append(action)
+            _, game_over, _ = game.play_step(action)
+        replays.append(Replay(game.seed, bytes(actions)))
+    return replays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record, re-simulate and watch Snake replays")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="record games played by a random policy")
+    record.add_argument("path")
+    record.add_argument("--games", type=int, default=1000)
+    record.add_argument("--seed", type=int, default=0)
+    simulate_parser = commands.add_parser("simulate", help="re-simulate every game headlessly")
+    simulate_parser.add_argument("path")
+    play = commands.add_parser("play", help="watch one game in a window")
+    play.add_argument("path")
+    play.add_argument("--game", type=int, default=0, help="index of the game to show")
+    play.add_argument("--fps", type=int, default=SPEED * 4, help="playback speed in steps per second")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        replays = record_games(args.games, args.seed)
+        with ReplayWriter(args.path) as writer:
+            for replay in replays:
+                writer.write(replay)
+        steps = sum(len(replay.actions) for replay in replays)
+        print(f"Recorded {len(replays):,} games ({steps:,} steps) to {args.path}")
+    elif args.command == "simulate":
+        w, h, replays = read_replays(args.path)
+        game = SnakeGameAI(w, h, render_mode=None)
+        start = time.perf_counter()
+        scores = [simulate(game, replay) for replay in replays]
+        elapsed = time.perf_counter() - start
+        steps = sum(len(replay.actions) for replay in replays)
+        print(f"Re-simulated {len(replays):,} games ({steps:,} steps) in {elapsed:.2f}s: "
+              f"{len(replays) / elapsed:,.0f} games/s, {steps / elapsed:,.0f} steps/s")
+        print(f"Mean score {sum(scores) / len(scores):.2f}, best {max(scores)} (game {scores.index(max(scores))})")
+    else:
+        w, h, replays = read_replays(args.path)
+        game = SnakeGameAI(w, h)
+        game.fps = args.fps
+        print(f"Game {args.game}: score {simulate(game, replays[args.game])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Multiprocess rollout collection for Snake.
+
+``RolloutCollector`` runs headless SnakeEnv games in worker processes. The
+observations, actions, rewards and done flags live in ring buffers in
+``multiprocessing.shared_memory``: workers write straight into them and the
+trainer reads them as NumPy arrays, so nothing is pickled per step.
+Requires numpy.
+
+Ring slot ``t % capacity`` holds, for every game, the observation before
+step ``t``, the action taken and the reward and done flag that followed.
+A finished game is reset by its worker, so the next slot's observation is
+the first of a new game.
+
+Two modes:
+    'lockstep'  the trainer picks the actions: ``step(actions)`` hands them
+                to every worker and returns once all games have moved (or
+                raises RuntimeError if a worker dies or times out)
+    'async'     each worker picks actions with ``policy`` and keeps
+                stepping on its own; ``collect(steps)`` waits until every
+                worker has written the requested steps. Workers pause when
+                they are a full ring ahead of the trainer.
+"""
+
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from snake_env import SnakeEnv
+
+DEFAULT_CAPACITY = 256
+# Seconds the trainer waits for the workers to finish a lockstep step, or to stop
+DEFAULT_TIMEOUT = 60.0
+_POLL_INTERVAL = 0.0005
+# How often a waiting trainer checks that the workers are still alive
+_LIVENESS_INTERVAL = 0.1
+
+
+def random_policy(observations, rng):
+    """Pick a random relative action for each observation"""
+    return rng.integers(0, SnakeEnv.num_actions, len(observations))
+
+
+class _RingBuffers:
+    """Shared memory blocks for the ring buffers, viewed as NumPy arrays"""
+
+    def __init__(self, capacity, num_envs, obs_shape, names=None):
+        layout = {
+            'observations': ((capacity, num_envs, *obs_shape), np.float32),
+            'actions': ((capacity, num_envs), np.int8),
+            'rewards': ((capacity, num_envs), np.float32),
+            'dones': ((capacity, num_envs), np.bool_),
+        }
+        self.owner = names is None
+        self.blocks = {}
+        self.arrays = {}
+        for key, (shape, dtype) in layout.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if self.owner:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[key])
+            self.blocks[key] = block
+            self.arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    @property
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+
+
+def _worker(index, envs, names, capacity, num_envs, obs_shape, observation, env_options,
+            mode, policy, seed, counters, consumed, go, done, stop):
+    """Step games ``envs`` (a slice of the game columns) and write them into the ring"""
+    rings = _RingBuffers(capacity, num_envs, obs_shape, names)
+    obs, actions = rings.arrays['observations'], rings.arrays['actions']
+    rewards, dones = rings.arrays['rewards'], rings.arrays['dones']
+    rng = np.random.default_rng(seed + index)
+    try:
+        games = [SnakeEnv(observation, **env_options) for _ in range(envs.start, envs.stop)]
+        for j, env in enumerate(games):
+            obs[0, envs.start + j] = env.reset(seed=seed + index * len(games) + j)[0]
+        if mode == 'lockstep':
+            done.release()  # Initial observations written
+        while True:
+            t = counters[index]
+            slot, next_slot = t % capacity, (t + 1) % capacity
+            if mode == 'lockstep':
+                go.acquire()  # Actions written
+                if stop.is_set():
+                    break
+            else:
+                while t - consumed.value >= capacity - 1:
+                    if stop.is_set():
+                        return
+                    time.sleep(_POLL_INTERVAL)
+                if stop.is_set():
+                    break
+                actions[slot, envs] = policy(obs[slot, envs], rng)
+            for j, env in enumerate(games):
+                k = envs.start + j
+                observation_, reward, terminated, truncated, _ = env.step(actions[slot, k])
+                if terminated or truncated:
+                    observation_, _ = env.reset()
+                obs[next_slot, k] = observation_
+                rewards[slot, k] = reward
+                dones[slot, k] = terminated or truncated
+            counters[index] = t + 1
+            if mode == 'lockstep':
+                done.release()  # Results written
+    finally:
+        del obs, actions, rewards, dones
+        rings.close()
+
+
+class RolloutCollector:
+    """
+    Snake games spread over worker processes, with shared-memory ring buffers.
+
+    ``num_workers * envs_per_worker`` games run in total. Extra keyword
+    arguments are passed to every SnakeEnv (for example ``size=15`` for
+    the 'ego' observation). Call ``close()`` (or use ``with``) to stop the
+    workers and free the shared memory.
+
+    Lockstep workers are driven by a pair of semaphores each, which the
+    trainer waits on with a timeout while checking the workers are alive,
+    so a worker that dies (or hangs for ``timeout`` seconds) makes
+    ``step()`` raise RuntimeError instead of blocking forever.
+    """
+
+    def __init__(self, num_workers=2, envs_per_worker=8, observation='features',
+                 mode='lockstep', capacity=DEFAULT_CAPACITY, policy=random_policy,
+                 seed=0, timeout=DEFAULT_TIMEOUT, **env_options):
+        if mode not in ('lockstep', 'async'):
+            raise ValueError(f"mode must be 'lockstep' or 'async', not {mode!r}")
+        self.num_workers = num_workers
+        self.num_envs = num_workers * envs_per_worker
+        self.mode = mode
+        self.capacity = capacity
+        self.policy = policy
+        self.timeout = timeout
+        self.obs_shape = SnakeEnv(observation, **env_options).observation_shape
+        self.rings = _RingBuffers(capacity, self.num_envs, self.obs_shape)
+        self.observations = self.rings.arrays['observations']
+        self.actions = self.rings.arrays['actions']
+        self.rewards = self.rings.arrays['rewards']
+        self.dones = self.rings.arrays['dones']
+
+        self._counters = mp.RawArray('q', num_workers)
+        self._consumed = mp.RawValue('q', 0)
+        self._go = [mp.Semaphore(0) for _ in range(num_workers)]
+        self._done = [mp.Semaphore(0) for _ in range(num_workers)]
+        self._stop = mp.Event()
+        self._t = 0
+        self._workers = []
+        for i in range(num_workers):
+            envs = slice(i * envs_per_worker, (i + 1) * envs_per_worker)
+            process = mp.Process(target=_worker, daemon=True, args=(
+                i, envs, self.rings.names, capacity, self.num_envs, self.obs_shape,
+                observation, env_options, mode, policy, seed,
+                self._counters, self._consumed, self._go[i], self._done[i], self._stop))
+            process.start()
+            self._workers.append(process)
+        if mode == 'lockstep':
+            self._wait_for_workers()  # Initial observations written
+
+    def _wait_for_workers(self):
+        """Wait until every lockstep worker has signalled done, raising RuntimeError if one cannot"""
+        deadline = time.monotonic() + self.timeout
+        for i, done in enumerate(self._done):
+            while not done.acquire(timeout=_LIVENESS_INTERVAL):
+                process = self._workers[i]
+                if not process.is_alive():
+                    raise RuntimeError(f"rollout worker {i} stopped (exit code {process.exitcode})")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"rollout worker {i} did not respond within {self.timeout}s")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def steps(self):
+        """Steps taken by the slowest worker"""
+        return min(self._counters)
+
+    def current_observations(self):
+        """(num_envs, *obs_shape) view of the observations the next lockstep step acts on"""
+        return self.observations[self._t % self.capacity]
+
+    def step(self, actions):
+        """
+        Lockstep mode: play one action in every game.
+
+        Returns views of (observations, rewards, dones) in the ring, valid
+        until the ring wraps around.
+        """
+        if self.mode != 'lockstep':
+            raise RuntimeError("step() is only available in lockstep mode")
+        slot = self._t % self.capacity
+        self.actions[slot] = actions
+        for go in self._go:
+            go.release()
+        self._wait_for_workers()
+        self._t += 1
+        self._consumed.value = self._t
+        return self.observations[self._t % self.capacity], self.rewards[slot], self.dones[slot]
+
+    def collect(self, steps):
+        """
+        Return the next ``steps`` steps of every game as a dict of arrays.
+
+        'observations' has steps + 1 entries (the last one is the
+        observation after the final step); 'actions', 'rewards' and 'dones'
+        have ``steps``. In lockstep mode the actions come from ``policy``,
+        called in this process.
+        """
+        if steps >= self.capacity:
+            raise ValueError(f"steps must be less than the ring capacity ({self.capacity})")
+        start = self._t
+        if self.mode == 'lockstep':
+            rng = np.random.default_rng(start)
+            for _ in range(steps):
+                self.step(self.policy(self.current_observations(), rng))
+        else:
+            while self.steps < start + steps:
+                if not all(process.is_alive() for process in self._workers):
+                    raise RuntimeError("a rollout worker has stopped")
+                time.sleep(_POLL_INTERVAL)
+        slots = np.arange(start, start + steps + 1) % self.capacity
+        batch = {
+            'observations': self.observations[slots],
+            'actions': self.actions[slots[:-1]],
+            'rewards': self.rewards[slots[:-1]],
+            'dones': self.dones[slots[:-1]],
+        }
+        self._t = start + steps
+        self._consumed.value = self._t
+        return batch
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        if not self._workers:
+            return
+        self._stop.set()
+        for go in self._go:
+            go.release()
+        deadline = time.monotonic() + self.timeout
+        for process in self._workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._workers = []
+        del self.observations, self.actions, self.rewards, self.dones
+        self.rings.close()
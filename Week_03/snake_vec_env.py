@@ -0,0 +1,139 @@
+"""
+Vectorized Snake environment for training agents.
+
+``SnakeVecEnv`` runs N games of SnakeGameAI at once in NumPy arrays: an
+occupancy grid per game and each snake's body as a ring buffer of cell
+indices, so a step costs a handful of array operations whatever N is.
+Requires numpy.
+
+The rules follow SnakeGameAI: the snake starts with three cells in the
+middle of the board heading right, hitting a wall or its own body (the
+tail included) ends the game, eating food grows the snake by one, and a
+game also ends once ``frame_iteration > 100 * len(snake)``. Eating gives a
+reward of +10 and a game over -10.
+
+Actions are relative to the current heading: 0 keeps going straight, 1
+turns right and 2 turns left.
+"""
+
+import numpy as np
+
+from snake_game import BLOCK_SIZE
+
+STRAIGHT, TURN_RIGHT, TURN_LEFT = 0, 1, 2
+
+# Headings in clockwise order: right, down, left, up
+DX = np.array([1, 0, -1, 0])
+DY = np.array([0, 1, 0, -1])
+_TURNS = np.array([0, 1, -1])
+
+START_LENGTH = 3
+FOOD_REWARD = 10
+GAME_OVER_REWARD = -10
+
+
+class SnakeVecEnv:
+    """
+    N Snake games stepped together.
+
+    ``step(actions)`` moves every snake and returns (rewards, dones,
+    scores), like ``SnakeGameAI.play_step`` does for one game; ``scores``
+    holds each game's score at the end of the step, so finished games
+    report their final score. Finished games are reset automatically.
+
+    State is kept in flat cell indices (``y * width + x``):
+        grid       (N, height * width) bool occupancy of the snakes
+        body       (N, height * width) ring buffer of body cells
+        head_ptr   (N,) position of the head in ``body``
+        length     (N,) snake lengths
+        food       (N,) food cells
+    """
+
+    def __init__(self, num_envs, w=640, h=480, seed=None):
+        self.num_envs = num_envs
+        self.width = w // BLOCK_SIZE
+        self.height = h // BLOCK_SIZE
+        cells = self.width * self.height
+        self.rng = np.random.default_rng(seed)
+
+        self.grid = np.zeros((num_envs, cells), dtype=bool)
+        self.body = np.zeros((num_envs, cells), dtype=np.int32)
+        self.head_ptr = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.frame_iteration = np.zeros(num_envs, dtype=np.int64)
+        self._envs = np.arange(num_envs)
+        self.reset()
+
+    @property
+    def head(self):
+        """(N,) flat cell index of every snake's head"""
+        return self.body[self._envs, self.head_ptr]
+
+    def reset(self, mask=None):
+        """Start new games (all of them, or those selected by a bool mask)"""
+        envs = self._envs if mask is None else self._envs[mask]
+        if len(envs) == 0:
+            return
+        x, y = self.width // 2, self.height // 2
+        start = y * self.width + x - np.arange(START_LENGTH - 1, -1, -1)  # Tail first
+        self.grid[envs] = False
+        self.grid[envs[:, None], start] = True
+        self.body[envs, :START_LENGTH] = start
+        self.head_ptr[envs] = START_LENGTH - 1
+        self.length[envs] = START_LENGTH
+        self.direction[envs] = 0
+        self.score[envs] = 0
+        self.frame_iteration[envs] = 0
+        self._place_food(envs)
+
+    def _place_food(self, envs):
+        """Put food on a uniformly random free cell in each of the given games"""
+        if len(envs) == 0:
+            return
+        choice = self.rng.random((len(envs), self.grid.shape[1]))
+        choice[self.grid[envs]] = -1.0
+        self.food[envs] = choice.argmax(axis=1)
+
+    def step(self, actions):
+        envs = self._envs
+        cells = self.grid.shape[1]
+        self.frame_iteration += 1
+        self.direction = (self.direction + _TURNS[np.asarray(actions)]) % 4
+
+        # 1. move the heads
+        head = self.head
+        x = head % self.width + DX[self.direction]
+        y = head // self.width + DY[self.direction]
+        outside = (x < 0) | (x >= self.width) | (y < 0) | (y >= self.height)
+        new_head = np.where(outside, 0, y * self.width + x)
+
+        # 2. check for game over; the tail has not moved yet, so it counts
+        hit = outside | self.grid[envs, new_head]
+        dones = hit | (self.frame_iteration > 100 * (self.length + 1))
+        alive = envs[~dones]
+
+        # 3. push the new heads and eat or drop the tails
+        ate = np.zeros(self.num_envs, dtype=bool)
+        ate[alive] = new_head[alive] == self.food[alive]
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % cells
+        self.body[alive, self.head_ptr[alive]] = new_head[alive]
+        self.grid[alive, new_head[alive]] = True
+
+        moved = envs[~dones & ~ate]
+        tail = self.body[moved, (self.head_ptr[moved] - self.length[moved]) % cells]
+        self.grid[moved, tail] = False
+
+        eaters = envs[ate]
+        self.length[eaters] += 1
+        self.score[eaters] += 1
+        self._place_food(eaters)
+
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        rewards[ate] = FOOD_REWARD
+        rewards[dones] = GAME_OVER_REWARD
+        scores = self.score.copy()
+        self.reset(dones)
+        return rewards, dones, scores
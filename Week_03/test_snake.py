@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Test script for the Snake game
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+if not os.environ.get("DISPLAY") and os.name != "nt":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+def test_imports():
+    """Test if all required modules can be imported"""
+    print("Testing imports...")
+    
+    try:
+        import pygame
+        print("✓ pygame imported successfully")
+    
+        from snake_game import SnakeGame, SnakeGameAI
+        print("✓ Snake game imported successfully")
+    
+        print("\n✅ All imports successful!")
+        return True
+    
+    except ImportError as e:
+        print(f"❌ Import error: {e}")
+        return False
+
+def turn_randomly(game, rng):
+    """Point the snake in a random direction other than straight back"""
+    from snake_game import Direction
+    reverse = {Direction.LEFT: Direction.RIGHT, Direction.RIGHT: Direction.LEFT,
+               Direction.UP: Direction.DOWN, Direction.DOWN: Direction.UP}
+    if rng.random() < 0.3:
+        game.direction = rng.choice([d for d in Direction if d != reverse[game.direction]])
+
+def check_invariants(game):
+    """The snake must be a chain of adjacent cells on the board, matching the occupied set and free cells"""
+    from snake_game import BLOCK_SIZE
+    assert game.occupied == set(game.snake)
+    assert len(game.occupied) == len(game.snake)
+    assert len(game.free_cells) + len(game.occupied) == len(game._all_cells())
+    assert not any(pt in game.free_cells for pt in game.snake)
+    assert game.food is None or game.food in game.free_cells
+    assert game.head == game.snake[0]
+    assert len(game.snake) == 3 + game.score
+    for a, b in zip(list(game.snake), list(game.snake)[1:]):
+        assert abs(a.x - b.x) + abs(a.y - b.y) == BLOCK_SIZE
+    for pt in game.snake:
+        assert 0 <= pt.x <= game.w - BLOCK_SIZE and 0 <= pt.y <= game.h - BLOCK_SIZE
+    assert game.food not in game.snake
+
+def test_headless_game():
+    """Test that a headless game runs without a window"""
+    print("\nTesting headless game...")
+    
+    from snake_game import SnakeGameAI
+    
+    try:
+        SnakeGameAI(render_mode='rgb_array')
+        assert False, "an unknown render mode must raise"
+    except ValueError:
+        pass
+    print("✓ Unknown render modes are rejected")
+    
+    game = SnakeGameAI(render_mode=None)
+    assert game.display is None and game.clock is None
+    rng = random.Random(0)
+    games = 0
+    for _ in range(5_000):
+        turn_randomly(game, rng)
+        reward, game_over, score = game.play_step(None)
+        assert reward in (-10, 0, 10) and score == game.score
+        if game_over:
+            games += 1
+            game.reset()
+        check_invariants(game)
+    assert games > 0
+    print(f"✓ {games} headless games played without a display")
+    
+    for pt in list(game.snake)[1:]:
+        assert game.is_collision(pt)
+    assert not game.is_collision(game.head)
+    print("✓ Every body cell but the head is a collision")
+    
+    game = SnakeGameAI(w=100, h=100, render_mode=None)
+    for pt in list(game.free_cells.cells)[:-1]:
+        game.free_cells.remove(pt)
+    last = game.free_cells.cells[0]
+    game._place_food()
+    assert game.food == last
+    game.free_cells.remove(last)
+    game._place_food()
+    assert game.food is None
+    print("✓ Food goes to the last free cell, and to none on a full board")
+    
+    print("✅ Headless game test passed!")
+    return True
+
+def test_vec_env():
+    """Test SnakeVecEnv against SnakeGameAI with the same food"""
+    print("\nTesting vectorized environment...")
+    
+    try:
+        import numpy as np
+        from snake_vec_env import SnakeVecEnv
+    except ImportError:
+        print("⚠ numpy not installed, skipping vectorized environment test")
+        return True
+    from snake_game import SnakeGameAI, Point, BLOCK_SIZE
+    
+    env = SnakeVecEnv(1, seed=0)
+    game = SnakeGameAI(render_mode=None)
+    
+    def sync_food():
+        # The two place food with different generators, so copy the vector env's
+        food = int(env.food[0])
+        game.food = Point(food % env.width * BLOCK_SIZE, food // env.width * BLOCK_SIZE)
+    
+    sync_food()
+    rng = random.Random(1)
+    games = 0
+    for _ in range(5_000):
+        action = rng.choice([0, 0, 0, 1, 2])
+        reward, game_over, score = game.play_step(action)
+        rewards, dones, scores = env.step(np.array([action]))
+        assert (reward, game_over, score) == (rewards[0], dones[0], scores[0])
+        if game_over:
+            games += 1
+            game.reset()
+            sync_food()
+            continue
+        if reward == 10:
+            sync_food()
+        cells = {int(c) for c in np.flatnonzero(env.grid[0])}
+        assert cells == {int(pt.y // BLOCK_SIZE * env.width + pt.x // BLOCK_SIZE) for pt in game.snake}
+    assert games > 0
+    print(f"✓ Rewards, game overs, scores and bodies match SnakeGameAI over {games} games")
+    
+    env = SnakeVecEnv(64, seed=5)
+    rng = np.random.default_rng(5)
+    for _ in range(500):
+        env.step(rng.integers(0, 3, 64))
+        assert np.array_equal(env.grid.sum(axis=1), env.length)
+        assert env.grid[np.arange(64), env.food].sum() == 0
+    print("✓ Occupancy grids match snake lengths with 64 games")
+    
+    print("✅ Vectorized environment test passed!")
+    return True
+
+def test_free_cells():
+    """Test the swap-remove free cell index"""
+    print("\nTesting free cells...")
+    
+    from snake_game import FreeCells
+    
+    rng = random.Random(0)
+    cells = FreeCells(range(100))
+    expected = set(range(100))
+    for _ in range(10_000):
+        cell = rng.randrange(100)
+        if cell in expected:
+            cells.remove(cell)
+            expected.discard(cell)
+        else:
+            cells.add(cell)
+            expected.add(cell)
+        assert len(cells) == len(expected) and set(cells.cells) == expected
+        assert all(cells.cells[i] == cell for cell, i in cells.index.items())
+    print("✓ Random adds and removes keep the array and index in step")
+    
+    cells = FreeCells([7])
+    assert cells.choice() == 7 and 7 in cells and 8 not in cells
+    print("✓ choice() picks from the free cells")
+    
+    print("✅ Free cells test passed!")
+    return True
+
+def test_env_encoders():
+    """Test SnakeEnv and its incrementally updated observations"""
+    print("\nTesting SnakeEnv encoders...")
+    
+    try:
+        import numpy as np
+        from snake_env import SnakeEnv, ENCODERS
+    except ImportError:
+        print("⚠ numpy not installed, skipping SnakeEnv test")
+        return True
+    
+    for observation in ENCODERS:
+        env = SnakeEnv(observation)
+        obs, info = env.reset(seed=1)
+        buffer = obs
+        rng = random.Random(0)
+        episodes = 0
+        for _ in range(2_000):
+            obs, reward, terminated, truncated, info = env.step(rng.choice([0, 0, 0, 1, 2]))
+            assert obs is buffer
+            assert not (terminated and truncated)
+            if terminated or truncated:
+                episodes += 1
+                obs, _ = env.reset()
+            else:
+                fresh = ENCODERS[observation](env.game).reset(env.game)
+                assert np.array_equal(fresh, obs)
+        assert episodes > 0
+        print(f"✓ '{observation}' observations {obs.shape} match a fresh encoding")
+    
+    env = SnakeEnv('features')
+    env.reset(seed=2)
+    # Heading right with no danger next to the start
+    assert env.observation[:7].tolist() == [0, 0, 0, 0, 1, 0, 0]
+    print("✓ Feature vector at the start of a game")
+    
+    for observation, options in (('pixels', {}), ('ego', {'size': 10})):
+        try:
+            SnakeEnv(observation, **options)
+            assert False, "bad observation options must raise"
+        except ValueError:
+            pass
+    print("✓ Unknown observations and even ego sizes are rejected")
+    
+    print("✅ SnakeEnv test passed!")
+    return True
+
+def test_rollouts():
+    """Test the multiprocess rollout collector"""
+    print("\nTesting rollout collector...")
+    
+    try:
+        import numpy as np
+        from snake_env import SnakeEnv
+        from snake_rollout import RolloutCollector
+    except ImportError:
+        print("⚠ numpy not installed, skipping rollout test")
+        return True
+    
+    with RolloutCollector(2, 2, capacity=16, seed=3) as collector:
+        obs, rewards, dones = collector.step(np.zeros(4, dtype=int))
+        assert obs.shape == (4, 11) and rewards.shape == (4,) and dones.shape == (4,)
+        batch = collector.collect(8)
+        assert batch['observations'].shape == (9, 4, 11)
+        assert batch['actions'].shape == batch['rewards'].shape == batch['dones'].shape == (8, 4)
+        observations = np.concatenate([collector.observations[:1], batch['observations']])
+        actions = np.concatenate([np.zeros((1, 4), dtype=np.int8), batch['actions']])
+        rewards = np.concatenate([rewards[None], batch['rewards']])
+        dones = np.concatenate([dones[None], batch['dones']])
+    print("✓ Lockstep steps and batches have the expected shapes")
+    
+    # Replay each worker's games in this process: the same seeds and actions give the same steps
+    for worker in range(2):
+        games = [SnakeEnv() for _ in range(2)]
+        for j, env in enumerate(games):
+            assert np.array_equal(env.reset(seed=3 + worker * 2 + j)[0], observations[0, worker * 2 + j])
+        for t in range(9):
+            for j, env in enumerate(games):
+                k = worker * 2 + j
+                obs, reward, terminated, truncated, _ = env.step(int(actions[t, k]))
+                if terminated or truncated:
+                    obs, _ = env.reset()
+                assert np.array_equal(obs, observations[t + 1, k])
+                assert reward == rewards[t, k] and (terminated or truncated) == dones[t, k]
+    print("✓ Workers step the same games as SnakeEnv in this process")
+    
+    with RolloutCollector(2, 2, mode='async', capacity=16) as collector:
+        batch = collector.collect(8)
+        assert batch['observations'].shape == (9, 4, 11)
+    print("✓ Async workers fill the ring")
+    
+    collector = RolloutCollector(2, 2, capacity=16, timeout=10)
+    try:
+        collector._workers[0].kill()
+        collector.step(np.zeros(4, dtype=int))
+        assert False, "a dead worker must raise"
+    except RuntimeError:
+        pass
+    finally:
+        collector.close()
+    print("✓ A dead worker raises instead of hanging")
+    
+    print("✅ Rollout test passed!")
+    return True
+
+def test_training():
+    """Test the replay memory and a short, deterministic DQN run"""
+    print("\nTesting DQN training...")
+    
+    try:
+        import numpy as np
+        from train_snake import ReplayMemory, DQNAgent, train_snake
+    except ImportError:
+        print("⚠ numpy not installed, skipping training test")
+        return True
+    
+    memory = ReplayMemory(3, (2,))
+    for i in range(5):
+        memory.add(np.full(2, i), i % 3, float(i), np.full(2, i + 1), i == 4)
+    assert len(memory) == 3 and sorted(memory.data['reward']) == [2.0, 3.0, 4.0]
+    batch = memory.sample(10, np.random.default_rng(0))
+    assert np.array_equal(batch['next_obs'], batch['obs'] + 1)
+    print("✓ Replay memory overwrites the oldest transitions")
+    
+    runs = [train_snake(steps=1_500, warmup=200, checkpoint=None, verbose=False)
+            for _ in range(2)]
+    assert runs[0][1] == runs[1][1]
+    assert all(np.array_equal(a, b) for a, b in zip(runs[0][0].q.params, runs[1][0].q.params))
+    print("✓ Training with the same seed gives the same network")
+    
+    agent = runs[0][0]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "snake_dqn.npz")
+        agent.save(path)
+        restored = DQNAgent(11, 3, seed=1)
+        restored.load(path)
+    assert restored.steps == agent.steps == 1_500
+    for a, b in zip(agent.q.params + agent.optimizer.m, restored.q.params + restored.optimizer.m):
+        assert np.array_equal(a, b)
+    print("✓ Checkpoints restore the networks and optimizer")
+    
+    print("✅ Training test passed!")
+    return True
+
+def test_dirty_rects():
+    """Test that redrawing only the changed cells gives the same frame as a full redraw"""
+    print("\nTesting dirty-rectangle drawing...")
+    
+    import pygame
+    from snake_game import SnakeGame, Direction, Point, BLOCK_SIZE
+    
+    class NoClock:
+        def tick(self, fps):
+            pass
+    
+    steps = {Direction.RIGHT: (BLOCK_SIZE, 0), Direction.LEFT: (-BLOCK_SIZE, 0),
+             Direction.UP: (0, -BLOCK_SIZE), Direction.DOWN: (0, BLOCK_SIZE)}
+    game = SnakeGame()
+    game.clock = NoClock()
+    game._update_ui()
+    rng = random.Random(0)
+    frames = games = best = 0
+    for _ in range(3_000):
+        # Head for the food, with some random turns, avoiding collisions
+        safe = [d for d, (dx, dy) in steps.items()
+                if not game.is_collision(Point(game.head.x + dx, game.head.y + dy))]
+        if safe and game.food is not None:
+            if rng.random() < 0.1:
+                game.direction = rng.choice(safe)
+            else:
+                game.direction = min(safe, key=lambda d: abs(game.head.x + steps[d][0] - game.food.x)
+                                     + abs(game.head.y + steps[d][1] - game.food.y))
+        if game.play_step():
+            games += 1
+            game.reset()
+            game._update_ui()
+            continue
+        drawn = pygame.image.tostring(game.display, 'RGB')
+        game._full_redraw = True
+        game._update_ui()
+        assert pygame.image.tostring(game.display, 'RGB') == drawn
+        frames += 1
+        best = max(best, game.score)
+    assert best > 0
+    print(f"✓ {frames:,} frames over {games + 1} games match a full redraw (best score {best})")
+    
+    print("✅ Dirty-rectangle drawing test passed!")
+    return True
+
+def test_text_caches():
+    """Test the font, text and score surface caches"""
+    print("\nTesting text caches...")
+    
+    import pygame
+    from snake_game import Color, get_font, render_text, get_score_renderer, ScoreRenderer
+    
+    pygame.init()
+    assert get_font(25) is get_font(25) and get_font(25) is not get_font(40)
+    assert render_text("Game Over!", 40) is render_text("Game Over!", 40)
+    print("✓ Fonts and fixed text are loaded and rendered once")
+    
+    renderer = get_score_renderer("Score: ", 25)
+    assert get_score_renderer("Score: ", 25) is renderer
+    assert renderer.render(12) is renderer.render(12)
+    assert renderer.render(12).get_width() < renderer.render(123).get_width()
+    for score in range(ScoreRenderer.MAX_CACHED + 10):
+        renderer.render(score)
+        assert len(renderer.cache) <= ScoreRenderer.MAX_CACHED
+    print("✓ Score surfaces are reused and the cache stays bounded")
+    
+    font = get_font(25)
+    for score in range(200):
+        expected = font.render(f"Score: {score}", True, Color.WHITE)
+        surface = renderer.render(score)
+        assert surface.get_size() == expected.get_size()
+        assert pygame.image.tostring(surface, 'RGBA') == pygame.image.tostring(expected, 'RGBA')
+    print("✓ Score surfaces match font.render pixel for pixel")
+    
+    print("✅ Text cache test passed!")
+    return True
+
+def test_replays():
+    """Test seeded games and packing, saving and re-simulating replays"""
+    print("\nTesting replays...")
+    
+    from snake_game import SnakeGameAI
+    from snake_replay import (Replay, ReplayWriter, read_replays, pack_actions,
+                              unpack_actions, record_games, simulate)
+    
+    a = SnakeGameAI(render_mode=None, seed=4)
+    b = SnakeGameAI(render_mode=None, seed=4)
+    rng = random.Random(4)
+    for _ in range(2_000):
+        turn_randomly(a, rng)
+        b.direction = a.direction
+        result = a.play_step(None)
+        assert result == b.play_step(None) and a.food == b.food
+        if result[1]:
+            a.reset()
+            b.reset()
+            assert a.seed == b.seed
+    print("✓ Games with the same seed are identical")
+    
+    rng = random.Random(0)
+    for steps in (0, 1, 3, 4, 5, 1001):
+        actions = bytes(rng.randrange(3) for _ in range(steps))
+        assert unpack_actions(pack_actions(actions), steps) == actions
+        assert len(pack_actions(actions)) == (steps + 3) // 4
+    print("✓ Actions pack four to a byte and unpack unchanged")
+    
+    replays = record_games(20, seed=3)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.snkr")
+        with ReplayWriter(path) as writer:
+            for replay in replays:
+                writer.write(replay)
+        w, h, loaded = read_replays(path)
+    assert (w, h) == (640, 480) and loaded == replays
+    print("✓ Replay files round-trip")
+    
+    game = SnakeGameAI(render_mode=None)
+    for replay in replays:
+        game.reset(seed=replay.seed)
+        for i, action in enumerate(replay.actions):
+            _, game_over, score = game.play_step(action)
+            assert game_over == (i == len(replay.actions) - 1)
+        assert simulate(game, replay) == score
+    print("✓ Re-simulated games end on their last recorded move")
+    
+    try:
+        from snake_env import SnakeEnv
+    except ImportError:
+        print("⚠ numpy not installed, skipping SnakeEnv replays")
+    else:
+        env = SnakeEnv()
+        env.reset(seed=4)
+        rng = random.Random(4)
+        while True:
+            _, _, terminated, truncated, info = env.step(rng.choice([0, 0, 0, 1, 2]))
+            if terminated or truncated:
+                break
+        replay = env.replay()
+        assert isinstance(replay, Replay)
+        assert simulate(SnakeGameAI(render_mode=None), replay) == info['score']
+        print("✓ SnakeEnv episodes replay to the same score")
+    
+    print("✅ Replay test passed!")
+    return True
+
+def test_actions():
+    """Test relative, one-hot and absolute actions and step_n"""
+    print("\nTesting actions...")
+    
+    from snake_game import SnakeGameAI, Direction, BLOCK_SIZE, TURN_RIGHT, TURN_LEFT, STRAIGHT
+    
+    game = SnakeGameAI(render_mode=None, seed=2)
+    assert game.direction == Direction.RIGHT
+    game.play_step(TURN_RIGHT)
+    assert game.direction == Direction.DOWN
+    game.play_step([0, 0, 1])
+    assert game.direction == Direction.RIGHT
+    game.play_step(None)
+    assert game.direction == Direction.RIGHT
+    game.play_step(Direction.LEFT)  # Reversing is ignored
+    assert game.direction == Direction.RIGHT
+    game.play_step(Direction.UP)
+    assert game.direction == Direction.UP
+    game.play_step(TURN_LEFT)
+    assert game.direction == Direction.LEFT
+    print("✓ Relative, one-hot and absolute actions steer the snake")
+    
+    head, frame = game.head, game.frame_iteration
+    for action in (-1, 3):
+        try:
+            game.play_step(action)
+            assert False, "out-of-range actions must raise"
+        except ValueError:
+            pass
+    assert game.head == head and game.frame_iteration == frame
+    print("✓ Out-of-range actions raise ValueError")
+    
+    game.reset(seed=3)
+    head = game.head
+    total, game_over, score, ticks = game.step_n([STRAIGHT, None, None, None])
+    assert (total, game_over, score, ticks) == (0, False, 0, 4)
+    assert game.head == (head.x + 4 * BLOCK_SIZE, head.y)
+    total, game_over, score, ticks = game.step_n([STRAIGHT] * 100)
+    assert game_over and ticks < 100 and total == 10 * score - 10
+    print("✓ step_n advances several ticks and stops at game over")
+    
+    print("✅ Actions test passed!")
+    return True
+
+def main():
+    """Run all tests"""
+    print("🧪 Running Snake Game Tests\n")
+    
+    tests_passed = 0
+    total_tests = 11
+    
+    if test_imports():
+        tests_passed += 1
+    
+    if test_headless_game():
+        tests_passed += 1
+    
+    if test_vec_env():
+        tests_passed += 1
+    
+    if test_free_cells():
+        tests_passed += 1
+    
+    if test_env_encoders():
+        tests_passed += 1
+    
+    if test_rollouts():
+        tests_passed += 1
+    
+    if test_training():
+        tests_passed += 1
+    
+    if test_dirty_rects():
+        tests_passed += 1
+    
+    if test_text_caches():
+        tests_passed += 1
+    
+    if test_replays():
+        tests_passed += 1
+    
+    if test_actions():
+        tests_passed += 1
+    
+    print(f"\n📊 Test Results: {tests_passed}/{total_tests} tests passed")
+    
+    if tests_passed == total_tests:
+        print("🎉 All tests passed! Run the game with: python snake_game.py")
+    else:
+        print("❌ Some tests failed. Please check the errors above.")
+    
+    return tests_passed == total_tests
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
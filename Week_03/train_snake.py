@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Train a DQN agent to play Snake
+
+Runs headless on the CPU with NumPy only: the Q-network is a small
+two-layer perceptron trained with Adam on batches drawn from a circular
+replay memory, and actions are picked epsilon-greedily. Observations are
+SnakeEnv's 11 features. A fresh run is deterministic for a given --seed.
+
+    python train_snake.py --steps 100000 --checkpoint snake_dqn.npz
+
+Progress (episodes, scores, loss and steps per second) is printed every
+--log-every steps and the network is saved every --checkpoint-every steps.
+--resume restores the networks and the optimizer only: the replay memory,
+the random number generators and the game in progress start afresh, so a
+resumed run does not reproduce an uninterrupted one.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from snake_env import SnakeEnv
+
+DEFAULT_CHECKPOINT = "snake_dqn.npz"
+
+
+class ReplayMemory:
+    """
+    Circular replay memory in one NumPy structured array.
+
+    Transitions are written field by field into preallocated rows and
+    sampled as a structured array, so no Python object is kept per
+    transition.
+    """
+
+    def __init__(self, capacity, obs_shape):
+        self.dtype = np.dtype([
+            ('obs', np.float32, obs_shape),
+            ('action', np.int8),
+            ('reward', np.float32),
+            ('next_obs', np.float32, obs_shape),
+            ('done', np.bool_),
+        ])
+        self.data = np.zeros(capacity, dtype=self.dtype)
+        self.capacity = capacity
+        self.position = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, obs, action, reward, next_obs, done):
+        i = self.position
+        row = self.data[i:i + 1]
+        row['obs'] = obs
+        row['action'] = action
+        row['reward'] = reward
+        row['next_obs'] = next_obs
+        row['done'] = done
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def sample(self, batch_size, rng):
+        return self.data[rng.integers(0, self.size, batch_size)]
+
+
+class QNetwork:
+    """Two-layer perceptron (ReLU hidden layer) giving one Q-value per action"""
+
+    def __init__(self, inputs, hidden, outputs, rng):
+        self.params = [
+            rng.normal(0, np.sqrt(2 / inputs), (inputs, hidden)).astype(np.float32),
+            np.zeros(hidden, dtype=np.float32),
+            rng.normal(0, np.sqrt(2 / hidden), (hidden, outputs)).astype(np.float32),
+            np.zeros(outputs, dtype=np.float32),
+        ]
+
+    def __call__(self, x):
+        w1, b1, w2, b2 = self.params
+        return np.maximum(x @ w1 + b1, 0) @ w2 + b2
+
+    def gradients(self, x, grad_q):
+        """Forward x and backpropagate dLoss/dQ, returning the parameter gradients"""
+        w1, b1, w2, b2 = self.params
+        hidden = np.maximum(x @ w1 + b1, 0)
+        grad_hidden = (grad_q @ w2.T) * (hidden > 0)
+        return [x.T @ grad_hidden, grad_hidden.sum(axis=0), hidden.T @ grad_q, grad_q.sum(axis=0)]
+
+    def copy_from(self, other):
+        for mine, theirs in zip(self.params, other.params):
+            np.copyto(mine, theirs)
+
+
+class Adam:
+    def __init__(self, params, lr=1e-3, beta1=0.9, beta2=0.999, eps=1e-8):
+        self.params = params
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.m = [np.zeros_like(p) for p in params]
+        self.v = [np.zeros_like(p) for p in params]
+        self.t = 0
+
+    def step(self, grads):
+        self.t += 1
+        scale = self.lr * np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for p, g, m, v in zip(self.params, grads, self.m, self.v):
+            m *= self.beta1
+            m += (1 - self.beta1) * g
+            v *= self.beta2
+            v += (1 - self.beta2) * g * g
+            p -= scale * m / (np.sqrt(v) + self.eps)
+
+
+class DQNAgent:
+    """Epsilon-greedy agent with a Q-network and a target network"""
+
+    def __init__(self, obs_size, num_actions, hidden=256, lr=1e-3, gamma=0.9,
+                 epsilon_start=1.0, epsilon_end=0.01, epsilon_decay_steps=20_000, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.num_actions = num_actions
+        self.gamma = gamma
+        self.epsilon_start = epsilon_start
+        self.epsilon_end = epsilon_end
+        self.epsilon_decay_steps = epsilon_decay_steps
+        self.q = QNetwork(obs_size, hidden, num_actions, self.rng)
+        self.target = QNetwork(obs_size, hidden, num_actions, self.rng)
+        self.target.copy_from(self.q)
+        self.optimizer = Adam(self.q.params, lr)
+        self.steps = 0
+
+    @property
+    def epsilon(self):
+        fraction = min(1.0, self.steps / self.epsilon_decay_steps)
+        return self.epsilon_start + fraction * (self.epsilon_end - self.epsilon_start)
+
+    def act(self, obs, explore=True):
+        """Pick an action for one observation"""
+        if explore and self.rng.random() < self.epsilon:
+            return int(self.rng.integers(self.num_actions))
+        return int(self.q(obs[None])[0].argmax())
+
+    def update(self, batch):
+        """One Q-learning step on a batch of transitions, returning the Huber loss"""
+        obs, actions = batch['obs'], batch['action'].astype(np.int64)
+        rows = np.arange(len(batch))
+        next_q = self.target(batch['next_obs']).max(axis=1)
+        targets = batch['reward'] + self.gamma * next_q * ~batch['done']
+        errors = self.q(obs)[rows, actions] - targets
+        # Huber loss: squared error up to 1, linear beyond
+        grad_q = np.zeros((len(batch), self.num_actions), dtype=np.float32)
+        grad_q[rows, actions] = np.clip(errors, -1.0, 1.0) / len(batch)
+        self.optimizer.step(self.q.gradients(obs, grad_q))
+        abs_errors = np.abs(errors)
+        return float(np.mean(np.where(abs_errors < 1, 0.5 * errors ** 2, abs_errors - 0.5)))
+
+    def sync_target(self):
+        self.target.copy_from(self.q)
+
+    def save(self, path):
+        """Write the networks and optimizer state to an .npz file"""
+        arrays = {'steps': np.array(self.steps), 'adam_t': np.array(self.optimizer.t)}
+        for name, params in (('q', self.q.params), ('target', self.target.params),
+                             ('adam_m', self.optimizer.m), ('adam_v', self.optimizer.v)):
+            for i, p in enumerate(params):
+                arrays[f'{name}{i}'] = p
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Restore a checkpoint written by save()"""
+        with np.load(path) as data:
+            for name, params in (('q', self.q.params), ('target', self.target.params),
+                                 ('adam_m', self.optimizer.m), ('adam_v', self.optimizer.v)):
+                for i, p in enumerate(params):
+                    np.copyto(p, data[f'{name}{i}'])
+            self.steps = int(data['steps'])
+            self.optimizer.t = int(data['adam_t'])
+
+
+def train_snake(steps=100_000, seed=0, batch_size=64, memory_size=100_000, warmup=1_000,
+                target_every=1_000, log_every=5_000, checkpoint=DEFAULT_CHECKPOINT,
+                checkpoint_every=25_000, resume=False, verbose=True, **agent_options):
+    """Train a DQN agent on headless Snake and return (agent, episode scores)"""
+    env = SnakeEnv('features')
+    obs, _ = env.reset(seed=seed)
+    agent = DQNAgent(obs.size, env.num_actions, seed=seed, **agent_options)
+    if resume and checkpoint and os.path.exists(checkpoint):
+        agent.load(checkpoint)
+        if verbose:
+            print(f"Resumed from {checkpoint} at step {agent.steps:,}")
+    memory = ReplayMemory(memory_size, obs.shape)
+    state = np.empty_like(obs)
+
+    scores = []
+    losses = []
+    start = log_start = time.perf_counter()
+    log_step = agent.steps
+    end = agent.steps + steps
+    while agent.steps < end:
+        np.copyto(state, obs)
+        action = agent.act(state)
+        obs, reward, terminated, truncated, info = env.step(action)
+        if not truncated:
+            # On the final step SnakeEnv returns the board before the move,
+            # which is fine for a terminal transition (it is never
+            # bootstrapped from) but would be the wrong next state for one
+            # cut off by the frame limit, so those are not stored
+            memory.add(state, action, reward, obs, terminated)
+        agent.steps += 1
+
+        if terminated or truncated:
+            scores.append(info['score'])
+            obs, _ = env.reset()
+        if len(memory) >= warmup:
+            losses.append(agent.update(memory.sample(batch_size, agent.rng)))
+        if agent.steps % target_every == 0:
+            agent.sync_target()
+
+        if verbose and agent.steps % log_every == 0:
+            now = time.perf_counter()
+            recent = scores[-100:] or [0]
+            loss = np.mean(losses) if losses else float('nan')
+            print(f"step {agent.steps:>8,}  episodes {len(scores):>6,}  "
+                  f"mean score {np.mean(recent):5.2f}  best {max(recent):>3}  "
+                  f"epsilon {agent.epsilon:.3f}  loss {loss:.4f}  "
+                  f"{(agent.steps - log_step) / (now - log_start):,.0f} steps/s")
+            losses.clear()
+            log_start, log_step = now, agent.steps
+        if checkpoint and agent.steps % checkpoint_every == 0:
+            agent.save(checkpoint)
+
+    if checkpoint:
+        agent.save(checkpoint)
+    if verbose:
+        elapsed = time.perf_counter() - start
+        print(f"Trained {steps:,} steps in {elapsed:.1f}s ({steps / elapsed:,.0f} steps/s)")
+    return agent, scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a DQN agent to play Snake (headless, CPU only)")
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--memory-size", type=int, default=100_000)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--log-every", type=int, default=5_000)
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="file the network is saved to")
+    parser.add_argument("--checkpoint-every", type=int, default=25_000)
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the checkpoint if it exists")
+    args = parser.parse_args()
+
+    train_snake(args.steps, args.seed, args.batch_size, args.memory_size,
+                log_every=args.log_every, checkpoint=args.checkpoint,
+                checkpoint_every=args.checkpoint_every, resume=args.resume,
+                lr=args.lr, gamma=args.gamma)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the Connect Four engine
+
+Run from this directory:
+    python benchmark_connect_four.py
+"""
+
+import os
+import random
+import tempfile
+import time
+
+from build_opening_book import build_book
+from connect_four_ai import Solver
+from connect_four_book import OpeningBook, write_book
+from connect_four_engine import Position, ROWS, COLS
+
+# Standard solver test positions as (1-based column moves, exact score),
+# from end-game to middle-game
+TEST_POSITIONS = [
+    ("15114672246536174221144455557762", 1),
+    ("45266477462772516446335671342552", -1),
+    ("156235277357531261361127453221", -1),
+    ("5627755447746566316257421712", -2),
+    ("31336426126777463613317715", -2),
+    ("33371652111176622221665767", 6),
+    ("271363332265266112534731", 0),
+    ("3145266276677341371271", 3),
+    ("21631142752111545425", 5),
+    ("616456277513244465", 2),
+    ("373311351561545177", 3),
+    ("2175251117567563", 8),
+]
+
+
+class ListBoard:
+    """The original list-of-lists board, kept as a baseline for comparison"""
+
+    def __init__(self):
+        self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+
+    def drop_piece(self, row, col, piece):
+        self.board[row][col] = piece
+
+    def is_valid_location(self, col):
+        return self.board[ROWS-1][col] == 0
+
+    def get_next_open_row(self, col):
+        for r in range(ROWS):
+            if self.board[r][col] == 0:
+                return r
+
+    def is_board_full(self):
+        for col in range(COLS):
+            if self.is_valid_location(col):
+                return False
+        return True
+
+    def winning_move(self, piece):
+        board = self.board
+        for c in range(COLS-3):
+            for r in range(ROWS):
+                if (board[r][c] == piece and board[r][c+1] == piece and
+                        board[r][c+2] == piece and board[r][c+3] == piece):
+                    return True
+        for c in range(COLS):
+            for r in range(ROWS-3):
+                if (board[r][c] == piece and board[r+1][c] == piece and
+                        board[r+2][c] == piece and board[r+3][c] == piece):
+                    return True
+        for c in range(COLS-3):
+            for r in range(ROWS-3):
+                if (board[r][c] == piece and board[r+1][c+1] == piece and
+                        board[r+2][c+2] == piece and board[r+3][c+3] == piece):
+                    return True
+        for c in range(COLS-3):
+            for r in range(3, ROWS):
+                if (board[r][c] == piece and board[r-1][c+1] == piece and
+                        board[r-2][c+2] == piece and board[r-3][c+3] == piece):
+                    return True
+        return False
+
+
+def random_columns(count, seed=0):
+    """Pre-generate a stream of column choices so both boards see the same input"""
+    rng = random.Random(seed)
+    return [rng.randrange(COLS) for _ in range(count)]
+
+
+def play_games(board_factory, columns):
+    """Fill boards with random moves, returning the number of moves made"""
+    moves = 0
+    board = board_factory()
+    piece = 1
+    for col in columns:
+        if not board.is_valid_location(col):
+            continue
+        row = board.get_next_open_row(col)
+        board.drop_piece(row, col, piece)
+        moves += 1
+        if board.is_board_full():
+            board = board_factory()
+            piece = 1
+        else:
+            piece = 3 - piece
+    return moves
+
+
+def random_games(count, seed=0):
+    """Generate column sequences of complete random games (until a win or tie)"""
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        position = Position()
+        moves = []
+        while True:
+            col = rng.choice([c for c in range(COLS) if position.is_valid_location(c)])
+            row = position.get_next_open_row(col)
+            position.drop_piece(row, col, position.current_player)
+            moves.append(col)
+            if position.winning_move_at(row, col) or position.is_board_full():
+                break
+        games.append(moves)
+    return games
+
+
+def replay_full_scan(games):
+    """Replay games checking for a win with the full-board window scan"""
+    wins = 0
+    for moves in games:
+        board = ListBoard()
+        piece = 1
+        for col in moves:
+            board.drop_piece(board.get_next_open_row(col), col, piece)
+            if board.winning_move(piece):
+                wins += 1
+            piece = 3 - piece
+    return wins
+
+
+def replay_last_move(games):
+    """Replay games checking for a win only through the last piece"""
+    wins = 0
+    for moves in games:
+        position = Position()
+        piece = 1
+        for col in moves:
+            row = position.get_next_open_row(col)
+            position.drop_piece(row, col, piece)
+            if position.winning_move_at(row, col):
+                wins += 1
+            piece = 3 - piece
+    return wins
+
+
+def time_call(func, *args, repeat=3):
+    """Return (result, best wall-clock time) over several runs"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return result, best
+
+
+def bench_moves(count=200_000):
+    """Compare moves per second of the list board and the bitboard engine"""
+    print(f"Move throughput ({count:,} random column choices)")
+    columns = random_columns(count)
+    results = {}
+    for name, factory in (("list-of-lists", ListBoard), ("bitboard", Position)):
+        moves, elapsed = time_call(play_games, factory, columns)
+        results[name] = moves / elapsed
+        print(f"  {name:<14} {moves / elapsed:>12,.0f} moves/s")
+    print(f"  speedup        {results['bitboard'] / results['list-of-lists']:>12.2f}x")
+
+
+def bench_win_checks(count=2_000):
+    """Compare full-board win scans with last-move win detection"""
+    games = random_games(count)
+    total = sum(len(moves) for moves in games)
+    print(f"\nMoves with a win check ({count:,} random games, {total:,} moves)")
+    results = {}
+    for name, replay in (("full scan", replay_full_scan), ("last move", replay_last_move)):
+        _, elapsed = time_call(replay, games)
+        results[name] = total / elapsed
+        print(f"  {name:<14} {total / elapsed:>12,.0f} moves/s")
+    print(f"  speedup        {results['last move'] / results['full scan']:>12.2f}x")
+
+
+def bench_solver(positions=TEST_POSITIONS):
+    """Solve the standard test positions, reporting nodes per second and time"""
+    print(f"\nSolver ({len(positions)} test positions)")
+    print(f"  {'moves':<34}{'score':>6}{'nodes':>10}{'time':>10}{'nodes/s':>12}")
+    total_nodes = 0
+    total_time = 0.0
+    for moves, expected in positions:
+        solver = Solver()
+        position = Position.from_moves(moves)
+        start = time.perf_counter()
+        score = solver.solve(position)
+        elapsed = time.perf_counter() - start
+        assert score == expected, f"{moves}: expected {expected}, got {score}"
+        total_nodes += solver.nodes
+        total_time += elapsed
+        print(f"  {moves:<34}{score:>6}{solver.nodes:>10,}{elapsed:>9.3f}s"
+              f"{solver.nodes / elapsed:>12,.0f}")
+    print(f"  {'total':<34}{'':>6}{total_nodes:>10,}{total_time:>9.3f}s"
+          f"{total_nodes / total_time:>12,.0f}")
+
+
+def bench_time_budget(budgets=(0.05, 0.2, 1.0), positions=("", "4444", "4453445")):
+    """Run time-budgeted searches, reporting the depth reached and nodes searched"""
+    print("\nTime-budgeted search")
+    print(f"  {'moves':<10}{'budget':>8}{'move':>6}{'depth':>7}{'nodes':>10}{'time':>10}")
+    for moves in positions:
+        for budget in budgets:
+            result = Solver().search(Position.from_moves(moves), time_budget=budget)
+            print(f"  {moves or '(empty)':<10}{budget:>7.2f}s{result.move + 1:>6}{result.depth:>7}"
+                  f"{result.nodes:>10,}{result.elapsed:>9.3f}s")
+
+
+def bench_parallel(worker_counts=(1, 2, 4, 8), positions=("", "4453"), depth=10):
+    """Compare fixed-depth search time with different numbers of worker processes"""
+    print(f"\nParallel search (depth {depth}, {os.cpu_count()} CPUs available)")
+    print(f"  {'workers':<10}{'nodes':>10}{'time':>10}{'nodes/s':>12}{'speedup':>10}")
+    baseline = None
+    for workers in worker_counts:
+        nodes = 0
+        elapsed = 0.0
+        for moves in positions:
+            with Solver(workers=workers) as solver:
+                # Start the worker processes before timing
+                solver.search(Position.from_moves(moves), depth=1)
+                solver.table.clear()
+                result = solver.search(Position.from_moves(moves), depth=depth)
+            nodes += result.nodes
+            elapsed += result.elapsed
+        if baseline is None:
+            baseline = elapsed
+        print(f"  {workers:<10}{nodes:>10,}{elapsed:>9.3f}s{nodes / elapsed:>12,.0f}"
+              f"{baseline / elapsed:>9.2f}x")
+
+
+def bench_book(max_ply=3, depth=6, lookups=10_000):
+    """Compare opening book lookups with searching the same positions"""
+    print(f"\nOpening book (ply {max_ply}, depth {depth})")
+    start = time.perf_counter()
+    entries = build_book(max_ply, depth, verbose=False)
+    print(f"  built {len(entries):,} positions in {time.perf_counter() - start:.2f}s")
+    positions = [Position.from_moves(moves) for moves in ("", "4", "44", "453")]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        write_book(path, entries, max_ply, depth)
+        book = OpeningBook(path)
+        start = time.perf_counter()
+        for i in range(lookups):
+            book.lookup(positions[i % len(positions)])
+        lookup_time = (time.perf_counter() - start) / lookups
+        book.close()
+    solver = Solver()
+    start = time.perf_counter()
+    for position in positions:
+        solver.search(position, depth=depth)
+    search_time = (time.perf_counter() - start) / len(positions)
+    print(f"  book lookup    {lookup_time * 1e6:>10.1f} us/move")
+    print(f"  search         {search_time * 1e6:>10.1f} us/move")
+
+
+def python_playouts(position, count, rng):
+    """Play random games one at a time in pure Python, returning the number won by the player to move"""
+    wins = 0
+    player = position.current_player
+    for _ in range(count):
+        game = position.copy()
+        while not game.is_board_full():
+            col = rng.choice([c for c in range(COLS) if game.can_play(c)])
+            row = game.get_next_open_row(col)
+            piece = game.current_player
+            game.drop_piece(row, col, piece)
+            if game.winning_move_at(row, col):
+                wins += piece == player
+                break
+    return wins
+
+
+def bench_playouts(count=20_000):
+    """Compare random playouts per second in pure Python and batched with NumPy"""
+    print(f"\nRandom playouts ({count:,} games from the empty board)")
+    try:
+        import numpy as np
+        from connect_four_mcts import batch_playouts
+    except ImportError:
+        print("  skipped: numpy is not installed")
+        return
+    position = Position()
+    _, python_time = time_call(python_playouts, position, count // 10, random.Random(0), repeat=1)
+    python_rate = count // 10 / python_time
+    _, numpy_time = time_call(batch_playouts, position, count, np.random.default_rng(0), repeat=1)
+    numpy_rate = count / numpy_time
+    print(f"  pure Python    {python_rate:>12,.0f} playouts/s")
+    print(f"  NumPy batch    {numpy_rate:>12,.0f} playouts/s")
+    print(f"  speedup        {numpy_rate / python_rate:>12.2f}x")
+
+
+def python_env_steps(steps, seed=0):
+    """Play random moves one Position at a time, starting a new game after each finished one"""
+    rng = random.Random(seed)
+    position = Position()
+    for _ in range(steps):
+        col = rng.choice([c for c in range(COLS) if position.can_play(c)])
+        if position.is_winning_move(col) or position.moves == ROWS * COLS - 1:
+            position.reset()
+        else:
+            position.play(col)
+
+
+def vec_env_steps(env, steps, rng):
+    """Play random valid moves in every game of a ConnectFourVecEnv"""
+    for _ in range(steps):
+        choice = rng.random((env.num_envs, COLS))
+        choice[~env.valid_actions()] = -1.0
+        env.step(choice.argmax(axis=1))
+
+
+def bench_vec_env(num_envs=1024, steps=200):
+    """Compare environment steps per second one game at a time and with ConnectFourVecEnv"""
+    print(f"\nEnvironment steps ({num_envs:,} games x {steps} steps)")
+    try:
+        import numpy as np
+        from connect_four_vec_env import ConnectFourVecEnv
+    except ImportError:
+        print("  skipped: numpy is not installed")
+        return
+    count = num_envs * steps
+    _, python_time = time_call(python_env_steps, count // 10, repeat=1)
+    python_rate = count // 10 / python_time
+    env = ConnectFourVecEnv(num_envs)
+    _, vec_time = time_call(vec_env_steps, env, steps, np.random.default_rng(0), repeat=1)
+    vec_rate = count / vec_time
+    print(f"  Position loop  {python_rate:>12,.0f} steps/s")
+    print(f"  vectorized     {vec_rate:>12,.0f} steps/s")
+    print(f"  speedup        {vec_rate / python_rate:>12.2f}x")
+
+
+def main():
+    bench_moves()
+    bench_win_checks()
+    bench_solver()
+    bench_time_budget()
+    bench_parallel()
+    bench_book()
+    bench_playouts()
+    bench_vec_env()
+
+
+if __name__ == "__main__":
+    main()
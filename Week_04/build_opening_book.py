@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Build the Connect Four opening book
+
+Searches every position with up to --ply stones and stores the best move
+and score of each in a compact book file that the computer player looks
+up before searching:
+    python build_opening_book.py --ply 4 --depth 10
+"""
+
+import argparse
+import time
+
+from connect_four_ai import Solver
+from connect_four_book import DEFAULT_BOOK_PATH, write_book
+from connect_four_engine import Position, COLS, mirror_column
+
+
+def book_positions(max_ply):
+    """
+    Return every position with at most max_ply stones that is not already won,
+    keeping only one of each position and its mirror image
+    """
+    positions = [Position()]
+    seen = {positions[0].canonical_hash()}
+    frontier = positions
+    for _ in range(max_ply):
+        next_frontier = []
+        for position in frontier:
+            for col in range(COLS):
+                if not position.can_play(col) or position.is_winning_move(col):
+                    continue
+                child = position.copy()
+                child.play(col)
+                key = child.canonical_hash()
+                if key not in seen:
+                    seen.add(key)
+                    next_frontier.append(child)
+        positions.extend(next_frontier)
+        frontier = next_frontier
+    return positions
+
+
+def build_book(max_ply, depth, workers=1, verbose=True):
+    """Search the book positions and return their (canonical hash, score, move) entries"""
+    positions = book_positions(max_ply)
+    entries = []
+    start = time.perf_counter()
+    with Solver(workers=workers) as solver:
+        for i, position in enumerate(positions, 1):
+            result = solver.search(position, depth=depth)
+            move = result.move
+            if position.is_mirrored():
+                move = mirror_column(move)
+            entries.append((position.canonical_hash(), result.score, move))
+            if verbose and (i % 100 == 0 or i == len(positions)):
+                print(f"  {i:,}/{len(positions):,} positions ({time.perf_counter() - start:.1f}s)")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Connect Four opening book")
+    parser.add_argument("--ply", type=int, default=4,
+                        help="include every position with up to this many stones")
+    parser.add_argument("--depth", type=int, default=10,
+                        help="search depth used for each position")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes used by the search")
+    parser.add_argument("--output", default=DEFAULT_BOOK_PATH,
+                        help="book file to write")
+    args = parser.parse_args()
+
+    print(f"Building opening book (ply {args.ply}, depth {args.depth})")
+    entries = build_book(args.ply, args.depth, args.workers)
+    write_book(args.output, entries, args.ply, args.depth)
+    print(f"Wrote {len(entries):,} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
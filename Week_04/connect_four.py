@@ -1,13 +1,15 @@
 import pygame
 import sys
 import math
+import argparse
+
+from connect_four_ai import search
+from connect_four_engine import Position, ROWS, COLS
 
 # Initialize Pygame
 pygame.init()
 
 # Constants
-ROWS = 6
-COLS = 7
 CELL_SIZE = 100
 RADIUS = int(CELL_SIZE/2 - 5)
 
@@ -23,11 +25,15 @@ WIDTH = COLS * CELL_SIZE
 HEIGHT = (ROWS + 1) * CELL_SIZE
 
 class ConnectFour:
-    def __init__(self):
-        self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+    def __init__(self, ai_player=None, ai_depth=None, ai_time=None):
+        self.position = Position()
         self.current_player = 1  # 1 for Player 1 (Red), 2 for Player 2 (Yellow)
         self.game_over = False
         self.winner = None
+        self.ai_player = ai_player  # None, 1 or 2
+        self.ai_depth = ai_depth
+        self.ai_time = ai_time  # Seconds per move, or None for a fixed depth
+        self.last_search = None
         
         # Initialize Pygame screen
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -37,22 +43,25 @@ class ConnectFour:
         # Font for displaying text
         self.font = pygame.font.Font(None, 36)
         
+    @property
+    def board(self):
+        """Read-only ROWS x COLS view of the board (0 = empty)"""
+        return self.position.to_rows(0)
+        
     def drop_piece(self, row, col, piece):
         """Drop a piece into the board"""
-        self.board[row][col] = piece
+        self.position.drop_piece(row, col, piece)
         
     def is_valid_location(self, col):
         """Check if a column is valid for placing a piece"""
-        return self.board[ROWS-1][col] == 0
+        return self.position.is_valid_location(col)
         
     def get_next_open_row(self, col):
         """Get the next available row in a column"""
-        for r in range(ROWS):
-            if self.board[r][col] == 0:
-                return r
+        return self.position.get_next_open_row(col)
                 
     def winning_move(self, piece):
-        """Check if the current move results in a win"""
+        """Check if the current move results in a win (full-board scan)"""
         # Check horizontal locations
         for c in range(COLS-3):
             for r in range(ROWS):
@@ -91,15 +100,17 @@ class ConnectFour:
                     
         return False
         
+    def winning_move_at(self, row, col):
+        """Check if the piece just dropped at (row, col) wins the game"""
+        return self.position.winning_move_at(row, col)
+        
     def is_board_full(self):
         """Check if the board is full (tie game)"""
-        for col in range(COLS):
-            if self.is_valid_location(col):
-                return False
-        return True
+        return self.position.is_board_full()
         
     def draw_board(self):
         """Draw the game board"""
+        board = self.board
         for c in range(COLS):
             for r in range(ROWS):
                 pygame.draw.rect(self.screen, BLUE, 
@@ -110,11 +121,11 @@ class ConnectFour:
                 
         for c in range(COLS):
             for r in range(ROWS):
-                if self.board[r][c] == 1:
+                if board[r][c] == 1:
                     pygame.draw.circle(self.screen, RED, 
                                      (int(c*CELL_SIZE+CELL_SIZE/2), 
                                       HEIGHT-int(r*CELL_SIZE+CELL_SIZE/2)), RADIUS)
-                elif self.board[r][c] == 2:
+                elif board[r][c] == 2:
                     pygame.draw.circle(self.screen, YELLOW, 
                                      (int(c*CELL_SIZE+CELL_SIZE/2), 
                                       HEIGHT-int(r*CELL_SIZE+CELL_SIZE/2)), RADIUS)
@@ -154,9 +165,30 @@ class ConnectFour:
         restart_rect = restart_surface.get_rect(center=(WIDTH//2, CELL_SIZE//2 + 40))
         self.screen.blit(restart_surface, restart_rect)
         
+    def play_move(self, col):
+        """Drop the current player's piece in a column and update the game state"""
+        row = self.get_next_open_row(col)
+        self.drop_piece(row, col, self.current_player)
+        
+        # Check for win
+        if self.winning_move_at(row, col):
+            self.game_over = True
+            self.winner = self.current_player
+        elif self.is_board_full():
+            self.game_over = True
+            self.winner = None  # Tie game
+        else:
+            # Switch players
+            self.current_player = 2 if self.current_player == 1 else 1
+            
+    def get_ai_move(self):
+        """Choose a column for the computer player"""
+        self.last_search = search(self.position, self.ai_depth, self.ai_time)
+        return self.last_search.move
+        
     def reset_game(self):
         """Reset the game to initial state"""
-        self.board = [[0 for _ in range(COLS)] for _ in range(ROWS)]
+        self.position.reset()
         self.current_player = 1
         self.game_over = False
         self.winner = None
@@ -176,25 +208,18 @@ class ConnectFour:
                     elif event.key == pygame.K_q:
                         running = False
                         
-                if event.type == pygame.MOUSEBUTTONDOWN and not self.game_over:
+                if (event.type == pygame.MOUSEBUTTONDOWN and not self.game_over
+                        and self.current_player != self.ai_player):
                     mouse_x = event.pos[0]
                     col = int(math.floor(mouse_x / CELL_SIZE))
                     
                     if 0 <= col < COLS and self.is_valid_location(col):
-                        row = self.get_next_open_row(col)
-                        self.drop_piece(row, col, self.current_player)
+                        self.play_move(col)
                         
-                        # Check for win
-                        if self.winning_move(self.current_player):
-                            self.game_over = True
-                            self.winner = self.current_player
-                        elif self.is_board_full():
-                            self.game_over = True
-                            self.winner = None  # Tie game
-                        else:
-                            # Switch players
-                            self.current_player = 2 if self.current_player == 1 else 1
-                            
+            # Let the computer move
+            if not self.game_over and self.current_player == self.ai_player:
+                self.play_move(self.get_ai_move())
+                
             # Clear screen
             self.screen.fill(BLACK)
             
@@ -217,5 +242,13 @@ class ConnectFour:
         sys.exit()
 
 if __name__ == "__main__":
-    game = ConnectFour()
+    parser = argparse.ArgumentParser(description="Play Connect Four with pygame")
+    parser.add_argument("--ai", type=int, choices=(1, 2),
+                        help="let the computer play as Player 1 or Player 2")
+    parser.add_argument("--depth", type=int,
+                        help="maximum search depth of the computer player")
+    parser.add_argument("--time", type=float,
+                        help="seconds the computer player may think per move")
+    args = parser.parse_args()
+    game = ConnectFour(ai_player=args.ai, ai_depth=args.depth, ai_time=args.time)
     game.run()
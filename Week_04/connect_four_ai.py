@@ -0,0 +1,546 @@
+"""
+Alpha-beta negamax solver for Connect Four.
+
+Scores are always from the point of view of the player to move. ``solve``
+returns the exact game-theoretic score using the usual convention: 0 for a
+draw, a positive score if the player to move can force a win (the sooner
+the win, the higher the score) and a negative score if they will lose.
+"""
+
+import ctypes
+import multiprocessing
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from connect_four_book import OpeningBook
+from connect_four_engine import (
+    COLS, CELLS, BOARD_MASK, BOTTOM_MASK, HASH_BITS, HASH_MASK,
+    winning_cells, column_mask, mirror_column,
+)
+
+# Every search score at or beyond WIN_SCORE is a forced win; heuristic
+# evaluations always stay strictly between -WIN_SCORE and WIN_SCORE.
+WIN_SCORE = 1000
+INFINITY = 10 * WIN_SCORE
+
+# Search columns from the center outwards
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+# Prime number of slots (~1M) so that keys spread evenly
+DEFAULT_TABLE_SIZE = 1048573
+
+DEFAULT_DEPTH = 8
+
+# Transposition table entry types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+CENTER_MASK = column_mask(COLS // 2)
+
+# move: best column, score: search value for the player to move, depth: last
+# completed iteration, pv: expected line of play starting with move
+SearchResult = namedtuple('SearchResult', 'move, score, depth, nodes, elapsed, pv')
+
+
+def popcount(bitboard):
+    """Number of set bits in a bitboard"""
+    return bin(bitboard).count('1')
+
+
+def evaluate(position):
+    """Heuristic score of a position for the player to move"""
+    mask = position.mask
+    current = position.bitboards[position.moves & 1]
+    opponent = position.bitboards[(position.moves & 1) ^ 1]
+    threats = popcount(winning_cells(current, mask)) - popcount(winning_cells(opponent, mask))
+    center = popcount(current & CENTER_MASK) - popcount(opponent & CENTER_MASK)
+    return 4 * threats + center
+
+
+def to_game_score(value):
+    """Convert a search value into the exact game score (see module docstring)"""
+    if value >= WIN_SCORE:
+        return value - WIN_SCORE
+    if value <= -WIN_SCORE:
+        return value + WIN_SCORE
+    return 0
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results with depth-preferred replacement.
+
+    Each slot holds the full position key, so a probe never returns the
+    entry of another position that maps to the same slot. Keys are
+    canonical hashes (see Solver.probe), so a position and its mirror image
+    share one entry.
+    """
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        self.size = size
+        self.clear()
+
+    def clear(self):
+        """Remove all entries"""
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.values = [0] * self.size
+        self.flags = [EXACT] * self.size
+        self.moves = [None] * self.size
+
+    def probe(self, key):
+        """Return (depth, value, flag, move) for a key, or None if not stored"""
+        i = key % self.size
+        if self.keys[i] != key:
+            return None
+        return self.depths[i], self.values[i], self.flags[i], self.moves[i]
+
+    def store(self, key, depth, value, flag, move):
+        """Store a result unless it would replace a deeper search of another position"""
+        i = key % self.size
+        if self.keys[i] is not None and self.keys[i] != key and self.depths[i] > depth:
+            return
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.values[i] = value
+        self.flags[i] = flag
+        self.moves[i] = move
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in shared memory that several processes use at once.
+
+    Each slot is two 64-bit integers: the packed entry and the key XORed
+    with it. Writes are not locked; a slot torn by two processes writing at
+    the same time simply fails the key check on the next probe.
+    """
+
+    NO_MOVE = 15
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE, array=None):
+        self.size = size
+        if array is None:
+            array = multiprocessing.RawArray('q', 2 * size)
+        self.array = array
+        self.slots = memoryview(array).cast('B').cast('q')
+
+    def clear(self):
+        """Remove all entries"""
+        ctypes.memset(self.array, 0, ctypes.sizeof(self.array))
+
+    def probe(self, key):
+        """Return (depth, value, flag, move) for a key, or None if not stored"""
+        i = 2 * (key % self.size)
+        data = self.slots[i]
+        # Keys are offset by one so that an all-zero slot never matches
+        if self.slots[i + 1] ^ data != key + 1:
+            return None
+        move = data >> 26
+        return ((data >> 16) & 0xFF, (data & 0xFFFF) - 0x8000, (data >> 24) & 0x3,
+                None if move == self.NO_MOVE else move)
+
+    def store(self, key, depth, value, flag, move):
+        """Store a result unless it would replace a deeper search of another position"""
+        i = 2 * (key % self.size)
+        old = self.slots[i]
+        old_key = self.slots[i + 1] ^ old
+        if old_key and old_key != key + 1 and (old >> 16) & 0xFF > depth:
+            return
+        data = ((value + 0x8000) | depth << 16 | flag << 24
+                | (self.NO_MOVE if move is None else move) << 26)
+        self.slots[i] = data
+        self.slots[i + 1] = (key + 1) ^ data
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline of a time-budgeted search passes"""
+
+
+class Solver:
+    # Check the clock once every this many nodes (must be a power of two)
+    CLOCK_INTERVAL = 256
+
+    def __init__(self, table_size=DEFAULT_TABLE_SIZE, workers=1, table=None, book=None):
+        """
+        With ``workers`` > 1, searches split the root moves over a pool of
+        processes that share one transposition table; call close() (or use
+        the solver as a context manager) to shut the pool down.
+
+        ``book`` is an optional OpeningBook that is looked up before searching.
+        """
+        self.workers = workers
+        self.book = book
+        if table is None:
+            if workers > 1:
+                table = SharedTranspositionTable(table_size)
+            else:
+                table = TranspositionTable(table_size)
+        self.table = table
+        self.nodes = 0
+        self.deadline = None
+        self._executor = None
+
+    def close(self):
+        """Shut down the worker processes, if any"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def solve(self, position):
+        """Return the exact score of a position (see module docstring)"""
+        self.nodes = 0
+        self.deadline = None
+        value = self.negamax(position.copy(), CELLS - position.moves, -INFINITY, INFINITY)
+        return to_game_score(value)
+
+    def search(self, position, depth=None, time_budget=None):
+        """
+        Iterative-deepening search returning a SearchResult.
+
+        Searches depth 1, 2, ... up to ``depth`` (or to the end of the game),
+        trying the previous iteration's principal variation first. With a
+        ``time_budget`` in seconds, the search stops when it runs out and
+        returns the best move found so far; ``depth`` in the result is the
+        last depth that was searched completely. Without either limit the
+        search goes to DEFAULT_DEPTH. Positions found in the opening book
+        are answered from it without searching (with ``nodes`` = 0) unless
+        a ``depth`` deeper than the book's is asked for. A time budget
+        alone uses the book: its moves come from a deeper search than a
+        move's budget reaches in the opening.
+        """
+        start = time.perf_counter()
+        if self.book is not None and (depth is None or self.book.depth >= depth):
+            entry = self.book.lookup(position)
+            if entry is not None:
+                move, score = entry
+                return SearchResult(move, score, self.book.depth, 0,
+                                    time.perf_counter() - start, (move,))
+
+        if depth is None:
+            depth = CELLS if time_budget is not None else DEFAULT_DEPTH
+        depth = max(1, min(depth, CELLS - position.moves))
+        self.nodes = 0
+        self.deadline = None
+
+        result = None
+        pv = ()
+        for current_depth in range(1, depth + 1):
+            # Depth 1 always completes so there is a move to return
+            if time_budget is not None and current_depth > 1:
+                self.deadline = start + time_budget
+            self._root_best = None
+            try:
+                if self.workers > 1:
+                    move, score = self._search_root_parallel(position.copy(), current_depth, pv)
+                else:
+                    move, score = self._search_root(position.copy(), current_depth, pv)
+            except SearchTimeout:
+                if self._root_best is not None:
+                    # At least one root move was searched completely at this
+                    # depth, so the best of them is at least as good as the
+                    # previous iteration's move
+                    move, score = self._root_best
+                    result = result._replace(move=move, score=score)
+                break
+            pv = self.principal_variation(position, current_depth)
+            result = SearchResult(move, score, current_depth, 0, 0.0, pv)
+            if abs(score) >= WIN_SCORE:
+                # A forced result does not change with more depth
+                break
+
+        self.deadline = None
+        return result._replace(nodes=self.nodes, elapsed=time.perf_counter() - start)
+
+    def best_move(self, position, depth=None, time_budget=None):
+        """Return the best column found within a depth and/or time budget"""
+        return self.search(position, depth, time_budget).move
+
+    def principal_variation(self, position, depth):
+        """Follow the best moves stored in the transposition table from a position"""
+        position = position.copy()
+        pv = []
+        while len(pv) < depth:
+            col = self._tt_move(position)
+            if col is None or not position.can_play(col):
+                break
+            pv.append(col)
+            if position.is_winning_move(col):
+                break
+            position.play(col)
+        return tuple(pv)
+
+    def _search_root(self, position, depth, pv=()):
+        """Return (move, value) for the best move at the root"""
+        # Take an immediate win without searching
+        for col in MOVE_ORDER:
+            if position.can_play(col) and position.is_winning_move(col):
+                self.nodes += 1
+                return col, WIN_SCORE + (CELLS + 1 - position.moves) // 2
+
+        first = pv[0] if pv else self._tt_move(position)
+        alpha = -INFINITY
+        best_move = None
+        for col in self._ordered_moves(position, first):
+            position.play(col)
+            value = -self.negamax(position, depth - 1, -INFINITY, -alpha,
+                                  pv[1:] if pv and col == pv[0] else ())
+            position.undo(col)
+            if best_move is None or value > alpha:
+                alpha = value
+                best_move = col
+                self._root_best = (best_move, alpha)
+        if best_move is None:
+            # Every move loses at once; still return a legal column
+            best_move = next(col for col in MOVE_ORDER if position.can_play(col))
+            alpha = -(WIN_SCORE + (CELLS - position.moves) // 2)
+        self.store(position, depth, alpha, EXACT, best_move)
+        return best_move, alpha
+
+    def _search_root_parallel(self, position, depth, pv=()):
+        """
+        Return (move, value) for the best move at the root, searching the
+        root moves in the worker processes.
+
+        The first (principal variation) move is searched alone to get a
+        bound; the remaining moves are then searched in parallel against it.
+        """
+        for col in MOVE_ORDER:
+            if position.can_play(col) and position.is_winning_move(col):
+                self.nodes += 1
+                return col, WIN_SCORE + (CELLS + 1 - position.moves) // 2
+
+        ordered = self._ordered_moves(position, pv[0] if pv else self._tt_move(position))
+        if not ordered:
+            best_move = next(col for col in MOVE_ORDER if position.can_play(col))
+            return best_move, -(WIN_SCORE + (CELLS - position.moves) // 2)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker,
+                initargs=(self.table.array, self.table.size))
+
+        time_left = None
+        if self.deadline is not None:
+            time_left = self.deadline - time.perf_counter()
+
+        first = ordered[0]
+        first_pv = pv[1:] if pv and first == pv[0] else ()
+        _, value, nodes = self._executor.submit(
+            _search_root_move, position, first, depth, -INFINITY, first_pv, time_left).result()
+        self.nodes += nodes
+        if value is None:
+            raise SearchTimeout
+        best_move, alpha = first, value
+        self._root_best = (best_move, alpha)
+
+        if self.deadline is not None:
+            time_left = self.deadline - time.perf_counter()
+        futures = [self._executor.submit(_search_root_move, position, col, depth, alpha, (), time_left)
+                   for col in ordered[1:]]
+        timed_out = False
+        # Look at the results in move order so ties are broken the same way
+        # as in the sequential search
+        for future in futures:
+            col, value, nodes = future.result()
+            self.nodes += nodes
+            if value is None:
+                timed_out = True
+            elif value > alpha:
+                best_move, alpha = col, value
+                self._root_best = (best_move, alpha)
+        if timed_out:
+            raise SearchTimeout
+        self.store(position, depth, alpha, EXACT, best_move)
+        return best_move, alpha
+
+    def _tt_move(self, position):
+        """Best move stored in the transposition table for a position, if any"""
+        entry = self.probe(position)
+        return entry[3] if entry else None
+
+    def probe(self, position):
+        """
+        Look a position up in the transposition table.
+
+        Entries are stored under the canonical hash with moves in canonical
+        orientation; moves are mirrored back when the position is the
+        mirror image of its canonical form.
+        """
+        hashes = position.hashes
+        key, mirror_key = hashes & HASH_MASK, hashes >> HASH_BITS
+        if mirror_key < key:
+            entry = self.table.probe(mirror_key)
+            if entry is not None and entry[3] is not None:
+                depth, value, flag, move = entry
+                return depth, value, flag, mirror_column(move)
+            return entry
+        return self.table.probe(key)
+
+    def store(self, position, depth, value, flag, move):
+        """Store a search result for a position in the transposition table"""
+        hashes = position.hashes
+        key, mirror_key = hashes & HASH_MASK, hashes >> HASH_BITS
+        if mirror_key < key:
+            if move is not None:
+                move = mirror_column(move)
+            self.table.store(mirror_key, depth, value, flag, move)
+        else:
+            self.table.store(key, depth, value, flag, move)
+
+    def _ordered_moves(self, position, first=None):
+        """
+        Return the columns worth searching, best candidates first.
+
+        Moves that would let the opponent win at once (by not blocking one of
+        their threats, or by playing right below one) are left out.
+        """
+        mask = position.mask
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        opponent_wins = winning_cells(position.bitboards[(position.moves & 1) ^ 1], mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                return []
+            possible = forced
+        candidates = possible & ~(opponent_wins >> 1)
+        moves = [col for col in MOVE_ORDER if candidates & column_mask(col)]
+        if first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def negamax(self, position, depth, alpha, beta, pv=()):
+        """
+        Alpha-beta negamax search returning a value for the player to move.
+
+        ``pv`` is the expected line of play from this position; its first move
+        is searched first.
+        """
+        self.nodes += 1
+        if (self.deadline is not None and not self.nodes & (self.CLOCK_INTERVAL - 1)
+                and time.perf_counter() > self.deadline):
+            raise SearchTimeout
+        moves = position.moves
+        if moves == CELLS:
+            return 0
+
+        mask = position.mask
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        if winning_cells(position.bitboards[moves & 1], mask) & possible:
+            return WIN_SCORE + (CELLS + 1 - moves) // 2
+        if depth <= 0:
+            return evaluate(position)
+
+        # We cannot win on this move, so the best possible result is a win
+        # with our next stone
+        best_possible = WIN_SCORE + (CELLS - 1 - moves) // 2
+        if beta > best_possible:
+            beta = best_possible
+            if alpha >= beta:
+                return beta
+
+        alpha_orig = alpha
+        entry = self.probe(position)
+        tt_move = None
+        if entry is not None:
+            entry_depth, value, flag, tt_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value > alpha:
+                    alpha = value
+                elif flag == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    return value
+
+        ordered = self._ordered_moves(position, pv[0] if pv else tt_move)
+        if not ordered:
+            # The opponent wins with their next stone whatever we play
+            return -(WIN_SCORE + (CELLS - moves) // 2)
+
+        best = -INFINITY
+        best_move = None
+        for col in ordered:
+            position.play(col)
+            value = -self.negamax(position, depth - 1, -beta, -alpha,
+                                  pv[1:] if pv and col == pv[0] else ())
+            position.undo(col)
+            if value > best:
+                best = value
+                best_move = col
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(position, depth, best, flag, best_move)
+        return best
+
+
+# Solver used by each worker process of a parallel search
+_worker_solver = None
+
+
+def _init_worker(array, size):
+    global _worker_solver
+    _worker_solver = Solver(table=SharedTranspositionTable(size, array))
+
+
+def _search_root_move(position, col, depth, alpha, pv, time_left):
+    """
+    Search one root move in a worker process.
+
+    Returns (col, value, nodes) where value is None if the time ran out.
+    """
+    solver = _worker_solver
+    solver.nodes = 0
+    solver.deadline = None if time_left is None else time.perf_counter() + time_left
+    position.play(col)
+    try:
+        value = -solver.negamax(position, depth - 1, -INFINITY, -alpha, pv)
+    except SearchTimeout:
+        value = None
+    return col, value, solver.nodes
+
+
+# Shared solvers by number of workers, using the default opening book if
+# it has been built
+_default_solvers = {}
+
+
+def _get_default_solver(workers=1):
+    solver = _default_solvers.get(workers)
+    if solver is None:
+        solver = _default_solvers[workers] = Solver(workers=workers, book=OpeningBook.load_default())
+    return solver
+
+
+def solve(position):
+    """Return the exact score of a position using a shared solver"""
+    return _get_default_solver().solve(position)
+
+
+def best_move(position, depth=None, time_budget=None, workers=1):
+    """Return the best column for the player to move using a shared solver"""
+    return _get_default_solver(workers).best_move(position, depth, time_budget)
+
+
+def search(position, depth=None, time_budget=None, workers=1):
+    """Search a position with a shared solver and return a SearchResult"""
+    return _get_default_solver(workers).search(position, depth, time_budget)
@@ -0,0 +1,94 @@
+"""
+Opening book for Connect Four stored as a compact, sorted binary file.
+
+File layout (little-endian):
+    header   magic b"C4OB", version, max ply, search depth, record count
+    records  (canonical hash: uint64, score: int16, move: uint8), sorted by hash
+
+A position and its mirror image share one record; moves are stored for the
+canonical orientation and mirrored back on lookup.
+
+The file is memory-mapped when loaded and looked up with a binary search,
+so opening the book is instant and lookups take microseconds.
+
+Build a book with ``build_opening_book.py``.
+"""
+
+import mmap
+import os
+import struct
+
+from connect_four_engine import mirror_column
+
+MAGIC = b"C4OB"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHHHI")
+RECORD = struct.Struct("<QhB")
+KEY = struct.Struct("<Q")
+
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "connect_four_book.bin")
+
+
+def write_book(path, entries, max_ply, depth):
+    """
+    Write a book file from an iterable of (canonical hash, score, move) entries.
+
+    The file is written to a temporary name first and then moved into
+    place, so a running game never sees a half-written book.
+    """
+    entries = sorted(entries)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_ply, depth, len(entries)))
+        for key, score, move in entries:
+            f.write(RECORD.pack(key, score, move))
+    os.replace(temp_path, path)
+
+
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_ply, self.depth, self.count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError(f"{path} is not a Connect Four opening book")
+
+    @classmethod
+    def load_default(cls):
+        """Load the book next to this module, or return None if it has not been built"""
+        if not os.path.exists(DEFAULT_BOOK_PATH):
+            return None
+        return cls(DEFAULT_BOOK_PATH)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Unmap the book file"""
+        self._data.close()
+
+    def lookup(self, position):
+        """Return (move, score) for a position, or None if it is not in the book"""
+        if position.moves > self.max_ply:
+            return None
+        mirrored = position.is_mirrored()
+        key = position.canonical_hash()
+        data = self._data
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD.size
+            mid_key = KEY.unpack_from(data, offset)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, score, move = RECORD.unpack_from(data, offset)
+                if mirrored:
+                    move = mirror_column(move)
+                return move, score
+        return None
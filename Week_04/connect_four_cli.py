@@ -1,9 +1,24 @@
+import argparse
+
+from connect_four_ai import search
+from connect_four_engine import Position, ROWS, COLS
+
+
 class ConnectFourCLI:
-    def __init__(self):
-        self.rows = 6
-        self.cols = 7
-        self.board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+    def __init__(self, ai_player=None, ai_depth=None, ai_time=None):
+        self.rows = ROWS
+        self.cols = COLS
+        self.position = Position()
         self.current_player = 1
+        self.ai_player = ai_player  # None, 1 or 2
+        self.ai_depth = ai_depth
+        self.ai_time = ai_time  # Seconds per move, or None for a fixed depth
+        self.last_search = None
+        
+    @property
+    def board(self):
+        """Read-only rows x cols view of the board (' ' = empty)"""
+        return self.position.to_rows(' ')
         
     def display_board(self):
         """Display the current state of the board"""
@@ -25,20 +40,18 @@ class ConnectFourCLI:
             
     def is_valid_move(self, col):
         """Check if a move is valid"""
-        if col < 0 or col >= self.cols:
-            return False
-        return self.board[self.rows - 1][col] == ' '
+        return self.position.is_valid_location(col)
+        
+    def get_next_open_row(self, col):
+        """Get the next available row in a column"""
+        return self.position.get_next_open_row(col)
         
     def make_move(self, col, player):
         """Make a move in the specified column"""
-        for row in range(self.rows):
-            if self.board[row][col] == ' ':
-                self.board[row][col] = player
-                return True
-        return False
+        return self.position.make_move(col, player)
         
     def check_winner(self, player):
-        """Check if the current player has won"""
+        """Check if the current player has won (full-board scan)"""
         # Check horizontal
         for row in range(self.rows):
             for col in range(self.cols - 3):
@@ -65,9 +78,23 @@ class ConnectFourCLI:
                     
         return False
         
+    def winning_move_at(self, row, col):
+        """Check if the piece just dropped at (row, col) wins the game"""
+        return self.position.winning_move_at(row, col)
+        
     def is_board_full(self):
         """Check if the board is full"""
-        return all(self.board[self.rows - 1][col] != ' ' for col in range(self.cols))
+        return self.position.is_board_full()
+        
+    def get_ai_move(self):
+        """Choose a column for the computer player"""
+        self.last_search = search(self.position, self.ai_depth, self.ai_time)
+        return self.last_search.move
+        
+    def reset_game(self):
+        """Reset the game to initial state"""
+        self.position.reset()
+        self.current_player = 1
         
     def get_player_symbol(self, player):
         """Get the symbol for the current player"""
@@ -90,30 +117,37 @@ class ConnectFourCLI:
             # Get player input
             current_player_name = self.get_player_name(self.current_player)
             try:
-                move = input(f"\n{current_player_name}, enter your move (1-7): ").strip()
-                
-                if move.lower() == 'quit':
-                    print("Thanks for playing!")
-                    break
+                if self.current_player == self.ai_player:
+                    col = self.get_ai_move()
+                    result = self.last_search
+                    print(f"\n{current_player_name} plays column {col + 1} "
+                          f"(depth {result.depth}, {result.nodes:,} nodes in {result.elapsed:.2f}s)")
+                else:
+                    move = input(f"\n{current_player_name}, enter your move (1-7): ").strip()
                     
-                col = int(move) - 1  # Convert to 0-based index
+                    if move.lower() == 'quit':
+                        print("Thanks for playing!")
+                        break
+                        
+                    col = int(move) - 1  # Convert to 0-based index
                 
                 if not self.is_valid_move(col):
                     print("Invalid move! Column is full or doesn't exist. Try again.")
                     continue
                     
                 # Make the move
+                row = self.get_next_open_row(col)
                 self.make_move(col, self.current_player)
                 
                 # Check for winner
-                if self.check_winner(self.current_player):
+                if self.winning_move_at(row, col):
                     self.display_board()
                     print(f"\n🎉 {current_player_name} wins! 🎉")
                     
                     # Ask if they want to play again
                     play_again = input("\nWould you like to play again? (y/n): ").strip().lower()
                     if play_again == 'y':
-                        self.__init__()  # Reset the game
+                        self.reset_game()
                         continue
                     else:
                         print("Thanks for playing!")
@@ -127,7 +161,7 @@ class ConnectFourCLI:
                     # Ask if they want to play again
                     play_again = input("\nWould you like to play again? (y/n): ").strip().lower()
                     if play_again == 'y':
-                        self.__init__()  # Reset the game
+                        self.reset_game()
                         continue
                     else:
                         print("Thanks for playing!")
@@ -143,5 +177,13 @@ class ConnectFourCLI:
                 break
 
 if __name__ == "__main__":
-    game = ConnectFourCLI()
+    parser = argparse.ArgumentParser(description="Play Connect Four in the terminal")
+    parser.add_argument("--ai", type=int, choices=(1, 2),
+                        help="let the computer play as Player 1 or Player 2")
+    parser.add_argument("--depth", type=int,
+                        help="maximum search depth of the computer player")
+    parser.add_argument("--time", type=float,
+                        help="seconds the computer player may think per move")
+    args = parser.parse_args()
+    game = ConnectFourCLI(ai_player=args.ai, ai_depth=args.depth, ai_time=args.time)
     game.play()
@@ -0,0 +1,308 @@
+"""
+Bitboard game engine shared by the Connect Four front-ends.
+
+Each position is stored as two integer bitboards (one per player) plus a
+mask of occupied cells. Bit ``col * (ROWS + 1) + row`` holds the cell at
+``(row, col)``; the extra bit at the top of every column is a sentinel row
+that is never set, so shifted alignment checks cannot wrap between columns.
+
+Positions also carry an incrementally updated Zobrist hash, together with
+the hash of their left-right mirror image. The smaller of the two is a
+canonical hash shared by a position and its mirror, which halves the
+number of entries transposition tables and opening books need to store.
+Both hashes are packed into one integer (``hashes``), so play() and
+undo() update them with a single table lookup and XOR. drop_piece(), which
+the game UIs use, leaves the hashes out: it marks them stale and they are
+recomputed from the bitboards the next time they are read.
+"""
+
+import random
+
+ROWS = 6
+COLS = 7
+
+# Bits used per column (6 playable rows + 1 sentinel row)
+H1 = ROWS + 1
+
+CELLS = ROWS * COLS
+
+BOTTOM_MASK = sum(1 << (col * H1) for col in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+TOP_MASK = BOTTOM_MASK << (ROWS - 1)
+
+# Bit distance between neighbouring cells along each line direction:
+# vertical, horizontal, diagonal (negative slope), diagonal (positive slope)
+DIRECTIONS = (1, H1, H1 - 1, H1 + 1)
+
+
+# Zobrist keys for each (player, bit index). They are generated from a fixed
+# seed so that hashes stay the same between runs (opening books store them).
+# 62 bits keep hashes positive when stored in signed 64-bit slots.
+_zobrist_rng = random.Random(0xC4)
+ZOBRIST = [[_zobrist_rng.getrandbits(62) for _ in range(COLS * H1)] for _ in range(2)]
+# ZOBRIST_MIRROR[player][i] is the key of the cell that mirrors bit i
+ZOBRIST_MIRROR = [
+    [keys[(COLS - 1 - i // H1) * H1 + i % H1] for i in range(COLS * H1)]
+    for keys in ZOBRIST
+]
+# ZOBRIST_PAIRS[player][i] holds the key of bit i in the low HASH_BITS bits
+# and the key of its mirror cell above them, for Position.hashes
+HASH_BITS = 64
+HASH_MASK = (1 << HASH_BITS) - 1
+ZOBRIST_PAIRS = [
+    [key | mirror_key << HASH_BITS for key, mirror_key in zip(keys, mirror_keys)]
+    for keys, mirror_keys in zip(ZOBRIST, ZOBRIST_MIRROR)
+]
+
+
+def column_mask(col):
+    """Bitmask of all playable cells in a column"""
+    return ((1 << ROWS) - 1) << (col * H1)
+
+
+def mirror_column(col):
+    """Column that mirrors a column left-to-right"""
+    return COLS - 1 - col
+
+
+def cell_bit(row, col):
+    """Bit for the cell at (row, col)"""
+    return 1 << (col * H1 + row)
+
+
+def winning_cells(bitboard, mask):
+    """
+    Return the empty cells that would complete four in a row for a bitboard.
+
+    Every cell that has three of the player's stones next to it along some
+    line is a winning cell; cells that are occupied or off the board are
+    masked out.
+    """
+    # Vertical
+    r = (bitboard << 1) & (bitboard << 2) & (bitboard << 3)
+    # Horizontal and both diagonals
+    for step in (H1, H1 - 1, H1 + 1):
+        p = (bitboard << step) & (bitboard << (2 * step))
+        r |= p & (bitboard << (3 * step))
+        r |= p & (bitboard >> step)
+        p = (bitboard >> step) & (bitboard >> (2 * step))
+        r |= p & (bitboard << step)
+        r |= p & (bitboard >> (3 * step))
+    return r & (BOARD_MASK ^ mask)
+
+
+class Position:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reset to an empty board"""
+        self.bitboards = [0, 0]  # Stones of Player 1 and Player 2
+        self.mask = 0            # Every occupied cell
+        self.heights = [0] * COLS
+        self.moves = 0
+        self._hashes = 0         # hash | mirror_hash << HASH_BITS, None if stale
+        self._rows_cache = None
+
+    @classmethod
+    def from_moves(cls, moves):
+        """Build a position from a string of 1-based column numbers, e.g. '4453'"""
+        position = cls()
+        for char in moves:
+            col = int(char) - 1
+            if not position.can_play(col):
+                raise ValueError(f"Invalid move sequence: {moves!r}")
+            position.play(col)
+        return position
+
+    def copy(self):
+        """Return an independent copy of this position"""
+        other = Position.__new__(Position)
+        other.bitboards = list(self.bitboards)
+        other.mask = self.mask
+        other.heights = list(self.heights)
+        other.moves = self.moves
+        other._hashes = self._hashes
+        other._rows_cache = None
+        return other
+
+    @property
+    def hashes(self):
+        """Zobrist hash and mirror hash packed as hash | mirror_hash << HASH_BITS"""
+        hashes = self._hashes
+        if hashes is None:
+            hashes = 0
+            for player, bitboard in enumerate(self.bitboards):
+                pairs = ZOBRIST_PAIRS[player]
+                while bitboard:
+                    bit = bitboard & -bitboard
+                    hashes ^= pairs[bit.bit_length() - 1]
+                    bitboard ^= bit
+            self._hashes = hashes
+        return hashes
+
+    @property
+    def hash(self):
+        """Zobrist hash of the position"""
+        return self.hashes & HASH_MASK
+
+    @property
+    def mirror_hash(self):
+        """Zobrist hash of the position's left-right mirror image"""
+        return self.hashes >> HASH_BITS
+
+    @property
+    def current_player(self):
+        """Player to move, assuming Player 1 moved first"""
+        return 1 if self.moves % 2 == 0 else 2
+
+    def drop_piece(self, row, col, piece):
+        """Place a piece for a player at (row, col)"""
+        index = col * H1 + row
+        bit = 1 << index
+        self.bitboards[piece - 1] |= bit
+        self.mask |= bit
+        self._hashes = None
+        if row >= self.heights[col]:
+            self.heights[col] = row + 1
+        self.moves += 1
+        self._rows_cache = None
+
+    def can_play(self, col):
+        """Check if a column still has room, without a range check"""
+        return self.heights[col] < ROWS
+
+    def play(self, col):
+        """Drop a piece for the player to move into a column with room"""
+        row = self.heights[col]
+        index = col * H1 + row
+        bit = 1 << index
+        player = self.moves & 1
+        self.bitboards[player] |= bit
+        self.mask |= bit
+        if self._hashes is not None:
+            self._hashes ^= ZOBRIST_PAIRS[player][index]
+        self.heights[col] = row + 1
+        self.moves += 1
+        self._rows_cache = None
+
+    def undo(self, col):
+        """Take back the top piece of a column"""
+        row = self.heights[col] - 1
+        index = col * H1 + row
+        bit = 1 << index
+        player = 0 if self.bitboards[0] & bit else 1
+        self.bitboards[player] ^= bit
+        self.mask ^= bit
+        if self._hashes is not None:
+            self._hashes ^= ZOBRIST_PAIRS[player][index]
+        self.heights[col] = row
+        self.moves -= 1
+        self._rows_cache = None
+
+    def possible(self):
+        """Bitmask of the cells where a piece can be dropped right now"""
+        return (self.mask + BOTTOM_MASK) & BOARD_MASK
+
+    def is_winning_move(self, col):
+        """Check if the player to move wins by playing a column"""
+        return bool(winning_cells(self.bitboards[self.moves & 1], self.mask)
+                    & self.possible() & column_mask(col))
+
+    def canonical_hash(self):
+        """Hash shared by this position and its mirror image"""
+        hashes = self.hashes
+        return min(hashes & HASH_MASK, hashes >> HASH_BITS)
+
+    def is_mirrored(self):
+        """
+        Check if the canonical hash is the hash of the mirror image.
+
+        Moves stored under the canonical hash are then mirrored too, see
+        mirror_column().
+        """
+        hashes = self.hashes
+        return hashes >> HASH_BITS < hashes & HASH_MASK
+
+    def is_valid_location(self, col):
+        """Check if a column exists and still has room for a piece"""
+        return 0 <= col < COLS and self.heights[col] < ROWS
+
+    def get_next_open_row(self, col):
+        """Get the next available row in a column, or None if it is full"""
+        row = self.heights[col]
+        if row < ROWS:
+            return row
+        return None
+
+    def make_move(self, col, piece):
+        """Drop a piece into a column, returning False if it is full"""
+        row = self.heights[col]
+        if row >= ROWS:
+            return False
+        self.drop_piece(row, col, piece)
+        return True
+
+    def is_board_full(self):
+        """Check if every column is full"""
+        return self.mask & TOP_MASK == TOP_MASK
+
+    def winning_move_at(self, row, col):
+        """Check if the piece at (row, col) is part of four in a row"""
+        index = col * H1 + row
+        bit = 1 << index
+        if self.bitboards[0] & bit:
+            bitboard = self.bitboards[0]
+        elif self.bitboards[1] & bit:
+            bitboard = self.bitboards[1]
+        else:
+            return False
+        # Walk outwards along the four lines through the cell; the empty
+        # sentinel row stops every walk at the edge of the board.
+        for step in DIRECTIONS:
+            count = 1
+            i = index + step
+            while count < 4 and bitboard >> i & 1:
+                count += 1
+                i += step
+            i = index - step
+            while count < 4 and i >= 0 and bitboard >> i & 1:
+                count += 1
+                i -= step
+            if count >= 4:
+                return True
+        return False
+
+    def get_piece(self, row, col):
+        """Return the piece at (row, col): 0 for empty, otherwise 1 or 2"""
+        bit = cell_bit(row, col)
+        if self.bitboards[0] & bit:
+            return 1
+        if self.bitboards[1] & bit:
+            return 2
+        return 0
+
+    def to_rows(self, empty=0):
+        """
+        Return the board as a ROWS x COLS list of lists (row 0 at the bottom).
+
+        The result is cached until the next move and must be treated as
+        read-only.
+        """
+        if self._rows_cache is not None and self._rows_cache[0] == empty:
+            return self._rows_cache[1]
+        first, second = self.bitboards
+        rows = []
+        for r in range(ROWS):
+            row = []
+            for c in range(COLS):
+                bit = cell_bit(r, c)
+                if first & bit:
+                    row.append(1)
+                elif second & bit:
+                    row.append(2)
+                else:
+                    row.append(empty)
+            rows.append(row)
+        self._rows_cache = (empty, rows)
+        return rows
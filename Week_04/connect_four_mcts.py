@@ -0,0 +1,198 @@
+"""
+Monte Carlo Tree Search player for Connect Four.
+
+The tree is built on the bitboard Position, while random playouts run in
+batches with NumPy: every selected leaf is played out ``batch_size`` times
+at once, with each game's bitboards held in uint64 arrays. Requires numpy.
+"""
+
+import math
+import time
+
+import numpy as np
+
+from connect_four_engine import ROWS, COLS, CELLS, H1
+
+# Search columns from the center outwards
+MOVE_ORDER = (3, 2, 4, 1, 5, 0, 6)
+
+DEFAULT_PLAYOUTS = 20_000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_EXPLORATION = math.sqrt(2)
+
+_ONE = np.uint64(1)
+
+
+def _has_alignment(bitboards):
+    """Vectorized four-in-a-row check over an array of uint64 bitboards"""
+    found = np.zeros(bitboards.shape, dtype=bool)
+    for step in (1, H1, H1 - 1, H1 + 1):
+        m = bitboards & (bitboards >> np.uint64(step))
+        found |= (m & (m >> np.uint64(2 * step))) != 0
+    return found
+
+
+def batch_playouts(position, count, rng):
+    """
+    Play ``count`` uniformly random games from a position at once.
+
+    Returns (wins, draws, losses) from the point of view of the player to
+    move in ``position``.
+    """
+    player = position.moves & 1
+    current = np.full(count, position.bitboards[player], dtype=np.uint64)
+    opponent = np.full(count, position.bitboards[player ^ 1], dtype=np.uint64)
+    heights = np.tile(np.array(position.heights, dtype=np.int64), (count, 1))
+    active = np.ones(count, dtype=bool)
+    result = np.zeros(count, dtype=np.int8)
+    games = np.arange(count)
+    sign = 1
+
+    for _ in range(CELLS - position.moves):
+        # Pick a random open column in every game
+        choice = rng.random((count, COLS))
+        choice[heights >= ROWS] = -1.0
+        cols = choice.argmax(axis=1)
+        rows = heights[games, cols]
+        bits = np.where(active, _ONE << (cols * H1 + rows).astype(np.uint64), np.uint64(0))
+        current |= bits
+        heights[games, cols] += active
+
+        won = active & _has_alignment(current)
+        result[won] = sign
+        active &= ~won
+        if not active.any():
+            break
+        current, opponent = opponent, current
+        sign = -sign
+
+    wins = int(np.count_nonzero(result == 1))
+    losses = int(np.count_nonzero(result == -1))
+    return wins, count - wins - losses, losses
+
+
+class Node:
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'value', 'terminal', 'hash')
+
+    def __init__(self, position, move=None, parent=None, terminal=None):
+        self.move = move          # Column played to reach this node
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        # Sum of results for the player who played ``move``: 1 win, 0.5 draw
+        self.value = 0.0
+        # 1.0 if ``move`` won the game, 0.5 if it filled the board, else None
+        self.terminal = terminal
+        self.hash = position.hash
+        if terminal is None:
+            self.untried = [col for col in MOVE_ORDER if position.can_play(col)]
+        else:
+            self.untried = []
+
+    def select_child(self, exploration):
+        """Return the child with the highest UCT score"""
+        log_visits = math.log(self.visits)
+        best = None
+        best_score = -1.0
+        for child in self.children:
+            score = (child.value / child.visits
+                     + exploration * math.sqrt(log_visits / child.visits))
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+
+class MCTSPlayer:
+    """
+    MCTS player with UCT selection and batched NumPy playouts.
+
+    The search tree is kept between calls: when the next position is a
+    descendant of the previous root (for example after our move and the
+    opponent's reply), the matching subtree becomes the new root.
+    """
+
+    def __init__(self, playouts=DEFAULT_PLAYOUTS, batch_size=DEFAULT_BATCH_SIZE,
+                 exploration=DEFAULT_EXPLORATION, time_budget=None, seed=None):
+        self.playouts = playouts
+        self.batch_size = batch_size
+        self.exploration = exploration
+        self.time_budget = time_budget  # Optional seconds per move
+        self.rng = np.random.default_rng(seed)
+        self.root = None
+        self.last_playouts = 0
+
+    def reset(self):
+        """Forget the search tree"""
+        self.root = None
+
+    def best_move(self, position):
+        """Run playouts from a position and return the most visited column"""
+        for col in MOVE_ORDER:
+            if position.can_play(col) and position.is_winning_move(col):
+                return col
+
+        root = self._find_root(position)
+        start = time.perf_counter()
+        self.last_playouts = 0
+        while True:
+            self.last_playouts += self._iterate(root, position.copy())
+            if self.last_playouts >= self.playouts:
+                break
+            if self.time_budget is not None and time.perf_counter() - start > self.time_budget:
+                break
+
+        best = max(root.children, key=lambda child: child.visits)
+        return best.move
+
+    def _find_root(self, position):
+        """Reuse the subtree for a position if it is close below the old root"""
+        if self.root is not None:
+            frontier = [self.root]
+            # The previous root, our move, or our move and the reply
+            for _ in range(3):
+                for node in frontier:
+                    if node.hash == position.hash:
+                        node.parent = None
+                        self.root = node
+                        return node
+                frontier = [child for node in frontier for child in node.children]
+        self.root = Node(position)
+        return self.root
+
+    def _iterate(self, root, position):
+        """Run one selection/expansion/playout/backpropagation step, returning the playouts used"""
+        node = root
+        # Selection
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+            position.play(node.move)
+
+        # Expansion
+        if node.untried:
+            col = node.untried.pop(0)
+            terminal = None
+            if position.is_winning_move(col):
+                terminal = 1.0
+            elif position.moves + 1 == CELLS:
+                terminal = 0.5
+            position.play(col)
+            child = Node(position, col, node, terminal)
+            node.children.append(child)
+            node = child
+
+        # Simulation: results for the player who moved into ``node``
+        count = self.batch_size
+        if node.terminal is not None:
+            result = node.terminal * count
+        else:
+            wins, draws, losses = batch_playouts(position, count, self.rng)
+            result = losses + 0.5 * draws
+
+        # Backpropagation
+        while node is not None:
+            node.visits += count
+            node.value += result
+            result = count - result
+            node = node.parent
+        return count
@@ -0,0 +1,109 @@
+"""
+Vectorized Connect Four environment for training agents.
+
+``ConnectFourVecEnv`` holds N games in one (N, ROWS, COLS) int8 array, with
+row 0 at the bottom as in ``Position.to_rows``: 0 is empty, 1 and 2 are the
+players' pieces. ``step`` plays one column in every game at once and checks
+for wins with shifted slices over the whole batch. Requires numpy.
+
+The rules are those of the ConnectFour game: pieces fall to the lowest open
+row, a full column cannot be played and a full board without a line of
+four is a tie. Playing a full or out-of-range column ends that game as a
+loss for the player who tried it.
+"""
+
+import numpy as np
+
+from connect_four_engine import ROWS, COLS, CELLS
+
+WIN_REWARD = 1.0
+TIE_REWARD = 0.0
+INVALID_REWARD = -1.0
+
+
+def has_four(pieces):
+    """Return an (N,) bool array telling which of the (N, ROWS, COLS) bool boards contain four in a row"""
+    found = (pieces[:, :, :-3] & pieces[:, :, 1:-2] & pieces[:, :, 2:-1] & pieces[:, :, 3:]).any(axis=(1, 2))
+    found |= (pieces[:, :-3] & pieces[:, 1:-2] & pieces[:, 2:-1] & pieces[:, 3:]).any(axis=(1, 2))
+    found |= (pieces[:, :-3, :-3] & pieces[:, 1:-2, 1:-2]
+              & pieces[:, 2:-1, 2:-1] & pieces[:, 3:, 3:]).any(axis=(1, 2))
+    found |= (pieces[:, 3:, :-3] & pieces[:, 2:-1, 1:-2]
+              & pieces[:, 1:-2, 2:-1] & pieces[:, :-3, 3:]).any(axis=(1, 2))
+    return found
+
+
+class ConnectFourVecEnv:
+    """
+    N Connect Four games stepped together.
+
+    ``step(actions)`` takes one 0-based column per game for the player to
+    move and returns (boards, rewards, dones, info). Rewards are for the
+    player who just moved: WIN_REWARD for a win, TIE_REWARD for a tie,
+    INVALID_REWARD for an invalid column and 0 otherwise.
+
+    Finished games are reset automatically, so the returned boards already
+    show the new games. ``info['winners']`` gives the winner of every game
+    (0 for a tie or a game still running) and ``info['final_boards']`` the
+    last board of each finished game, in game order.
+    The returned boards array is the environment's own buffer and is
+    overwritten by the next step.
+    """
+
+    def __init__(self, num_envs):
+        self.num_envs = num_envs
+        self.boards = np.zeros((num_envs, ROWS, COLS), dtype=np.int8)
+        self.heights = np.zeros((num_envs, COLS), dtype=np.int8)
+        self.moves = np.zeros(num_envs, dtype=np.int8)
+        self._games = np.arange(num_envs)
+
+    @property
+    def current_player(self):
+        """(N,) array of the player to move in each game (1 or 2)"""
+        return (self.moves & 1) + 1
+
+    def reset(self, mask=None):
+        """Start new games (all of them, or those selected by a bool mask) and return the boards"""
+        if mask is None:
+            mask = slice(None)
+        self.boards[mask] = 0
+        self.heights[mask] = 0
+        self.moves[mask] = 0
+        return self.boards
+
+    def valid_actions(self):
+        """(N, COLS) bool array of the columns that can be played"""
+        return self.heights < ROWS
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        games = self._games
+        player = self.current_player
+
+        in_range = (actions >= 0) & (actions < COLS)
+        cols = np.where(in_range, actions, 0)
+        rows = self.heights[games, cols].astype(np.int64)
+        valid = in_range & (rows < ROWS)
+
+        # Drop the pieces of the valid moves
+        played = games[valid]
+        self.boards[played, rows[valid], cols[valid]] = player[valid]
+        self.heights[played, cols[valid]] += 1
+        self.moves[valid] += 1
+
+        won = valid & has_four(self.boards == player[:, None, None])
+        tied = valid & ~won & (self.moves == CELLS)
+        dones = won | tied | ~valid
+
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        rewards[won] = WIN_REWARD
+        rewards[tied] = TIE_REWARD
+        rewards[~valid] = INVALID_REWARD
+
+        winners = np.zeros(self.num_envs, dtype=np.int8)
+        winners[won] = player[won]
+        winners[~valid] = 3 - player[~valid]
+
+        info = {'winners': winners, 'final_boards': self.boards[dones].copy()}
+        if dones.any():
+            self.reset(dones)
+        return self.boards, rewards, dones, info
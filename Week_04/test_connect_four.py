@@ -111,12 +111,445 @@ def test_gui_game():
         print(f"❌ GUI game test failed: {e}")
         return False
 
+def test_engine():
+    """Test the bitboard engine against the list-of-lists rules"""
+    print("\nTesting bitboard engine...")
+    
+    from connect_four_engine import Position, ROWS, COLS
+    from benchmark_connect_four import ListBoard, random_columns
+    
+    position = Position()
+    reference = ListBoard()
+    piece = 1
+    for col in random_columns(500, seed=1):
+        assert position.is_valid_location(col) == reference.is_valid_location(col)
+        if not reference.is_valid_location(col):
+            assert position.get_next_open_row(col) is None
+            continue
+        row = reference.get_next_open_row(col)
+        assert position.get_next_open_row(col) == row
+        position.drop_piece(row, col, piece)
+        reference.drop_piece(row, col, piece)
+        assert position.to_rows(0) == reference.board
+        assert position.is_board_full() == reference.is_board_full()
+        if reference.is_board_full():
+            position.reset()
+            reference = ListBoard()
+            piece = 1
+        else:
+            piece = 3 - piece
+    print("✓ Engine matches list-of-lists board")
+    
+    assert position.is_valid_location(-1) == False
+    assert position.is_valid_location(COLS) == False
+    position.reset()
+    for _ in range(ROWS):
+        assert position.make_move(0, 1) == True
+    assert position.make_move(0, 1) == False
+    print("✓ Full columns are rejected")
+    
+    print("✅ Engine test passed!")
+    return True
+
+def test_winning_move_at():
+    """Test last-move win detection against the full-board scan"""
+    print("\nTesting last-move win detection...")
+    
+    from connect_four_cli import ConnectFourCLI
+    from benchmark_connect_four import random_games
+    
+    for moves in random_games(300, seed=2):
+        game = ConnectFourCLI()
+        player = 1
+        for col in moves:
+            row = game.get_next_open_row(col)
+            game.make_move(col, player)
+            assert game.winning_move_at(row, col) == game.check_winner(player)
+            player = 3 - player
+    print("✓ winning_move_at agrees with check_winner")
+    
+    game = ConnectFourCLI()
+    for col in (0, 1, 2):
+        game.make_move(col, 1)
+    assert game.winning_move_at(0, 2) == False
+    game.make_move(3, 1)
+    assert game.winning_move_at(0, 3) == True
+    assert game.winning_move_at(5, 6) == False
+    print("✓ Horizontal win and empty cells detected")
+    
+    print("✅ Last-move win detection test passed!")
+    return True
+
+def test_position_hash():
+    """Test incremental Zobrist hashing and mirror canonicalization"""
+    print("\nTesting position hashing...")
+    
+    import random
+    from connect_four_engine import Position, COLS, mirror_column
+    from connect_four_ai import Solver
+    
+    rng = random.Random(4)
+    for _ in range(50):
+        position = Position()
+        mirror = Position()
+        played = []
+        while not position.is_board_full() and len(played) < 30:
+            col = rng.choice([c for c in range(COLS) if position.can_play(c)])
+            position.play(col)
+            mirror.play(mirror_column(col))
+            played.append(col)
+        assert position.hash == mirror.mirror_hash
+        assert position.mirror_hash == mirror.hash
+        assert position.canonical_hash() == mirror.canonical_hash()
+        for col in reversed(played[10:]):
+            position.undo(col)
+        assert position.hash == Position.from_moves("".join(str(c + 1) for c in played[:10])).hash
+    print("✓ Hashes update incrementally and fold mirror images")
+    
+    game = Position()
+    game.drop_piece(0, 2, 1)
+    assert game.hash == Position.from_moves("3").hash
+    game.drop_piece(0, 3, 2)
+    copy = game.copy()
+    copy.play(3)
+    copy.play(4)
+    copy.undo(4)
+    assert copy.hashes == Position.from_moves("344").hashes
+    assert game.hashes == Position.from_moves("34").hashes
+    print("✓ Hashes after drop_piece are recomputed and then kept up to date")
+    
+    solver = Solver(table_size=10007)
+    left = solver.best_move(Position.from_moves("11223"), depth=4)
+    right = solver.best_move(Position.from_moves("77665"), depth=4)
+    assert (left, right) == (3, 3)
+    position = Position.from_moves("1122")
+    solver.search(position, depth=4)
+    depth, value, flag, move = solver.probe(position)
+    assert solver.probe(Position.from_moves("7766")) == (depth, value, flag, mirror_column(move))
+    print("✓ Transposition table moves are mirrored back")
+    
+    print("✅ Position hashing test passed!")
+    return True
+
+def test_solver():
+    """Test the negamax solver against plain minimax and known scores"""
+    print("\nTesting solver...")
+    
+    import random
+    from connect_four_engine import Position, COLS, CELLS
+    from connect_four_ai import Solver
+    from benchmark_connect_four import TEST_POSITIONS
+    
+    def minimax(position):
+        if position.moves == CELLS:
+            return 0
+        for col in range(COLS):
+            if position.can_play(col) and position.is_winning_move(col):
+                return (CELLS + 1 - position.moves) // 2
+        best = -CELLS
+        for col in range(COLS):
+            if position.can_play(col):
+                position.play(col)
+                best = max(best, -minimax(position))
+                position.undo(col)
+        return best
+    
+    rng = random.Random(3)
+    solver = Solver(table_size=10007)
+    checked = 0
+    while checked < 20:
+        position = Position()
+        while position.moves < 32:
+            col = rng.choice([c for c in range(COLS) if position.can_play(c)])
+            if position.is_winning_move(col):
+                break
+            position.play(col)
+        if position.moves < 32:
+            continue
+        assert solver.solve(position) == minimax(position.copy())
+        checked += 1
+    print("✓ Scores match plain minimax on end-game positions")
+    
+    for moves, expected in TEST_POSITIONS[:6]:
+        assert solver.solve(Position.from_moves(moves)) == expected
+    print("✓ Known test positions solved")
+    
+    # Take a win, or block the opponent's
+    assert solver.best_move(Position.from_moves("445566"), depth=4) in (2, 6)
+    assert solver.best_move(Position.from_moves("11223"), depth=4) == 3
+    assert solver.best_move(Position.from_moves("12131"), depth=4) == 0
+    print("✓ Immediate wins and threats handled")
+    
+    print("✅ Solver test passed!")
+    return True
+
+def test_time_budget():
+    """Test iterative deepening with a time budget"""
+    print("\nTesting time-budgeted search...")
+    
+    import time
+    from connect_four_engine import Position
+    from connect_four_ai import Solver
+    
+    solver = Solver(table_size=10007)
+    result = solver.search(Position(), depth=5)
+    assert result.depth == 5
+    assert result.pv[0] == result.move
+    print("✓ Depth-limited search completes every iteration")
+    
+    start = time.perf_counter()
+    result = solver.search(Position.from_moves("4453"), time_budget=0.2)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.5
+    assert Position.from_moves("4453").can_play(result.move)
+    assert result.depth >= 1 and result.nodes > 0
+    print("✓ Search stops at the deadline with a legal move")
+    
+    result = solver.search(Position.from_moves("11223"), time_budget=0.001)
+    assert result.move == 3
+    print("✓ Tiny budgets still block an immediate threat")
+    
+    print("✅ Time-budgeted search test passed!")
+    return True
+
+def test_parallel_search():
+    """Test the shared transposition table and root-split parallel search"""
+    print("\nTesting parallel search...")
+    
+    from connect_four_engine import Position
+    from connect_four_ai import Solver, SharedTranspositionTable, EXACT, UPPER
+    
+    table = SharedTranspositionTable(101)
+    table.store(0, 5, -1017, EXACT, 3)
+    table.store(12345, 2, 7, UPPER, None)
+    assert table.probe(0) == (5, -1017, EXACT, 3)
+    assert table.probe(12345) == (2, 7, UPPER, None)
+    assert table.probe(12345 + 101) is None
+    table.store(12345 + 101, 1, 0, EXACT, 1)
+    assert table.probe(12345) == (2, 7, UPPER, None)
+    print("✓ Shared table stores entries with depth-preferred replacement")
+    
+    with Solver(table_size=10007, workers=2) as solver:
+        result = solver.search(Position.from_moves("4453"), depth=5)
+        assert result.depth == 5
+        assert Position.from_moves("4453").can_play(result.move)
+        assert solver.best_move(Position.from_moves("11223"), depth=4) == 3
+        assert solver.best_move(Position.from_moves("445566"), depth=4) in (2, 6)
+    print("✓ Parallel search finds legal and forced moves")
+    
+    print("✅ Parallel search test passed!")
+    return True
+
+def test_opening_book():
+    """Test building, writing and looking up the opening book"""
+    print("\nTesting opening book...")
+    
+    import os
+    import tempfile
+    from connect_four_engine import Position
+    from connect_four_ai import Solver
+    from connect_four_book import OpeningBook, write_book
+    from build_opening_book import book_positions, build_book
+    
+    assert [len(book_positions(ply)) for ply in range(4)] == [1, 5, 30, 151]
+    print("✓ Book positions enumerated")
+    
+    entries = build_book(2, 3, verbose=False)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        write_book(path, entries, 2, 3)
+        book = OpeningBook(path)
+        assert len(book) == 30
+        for position in book_positions(2):
+            assert book.lookup(position) is not None
+        solver = Solver(table_size=1009)
+        for moves in ("", "4", "17", "71"):
+            position = Position.from_moves(moves)
+            result = solver.search(position, depth=3)
+            assert book.lookup(position) == (result.move, result.score)
+        assert book.lookup(Position.from_moves("444")) is None
+        print("✓ Lookups match direct searches")
+        
+        result = Solver(table_size=1009, book=book).search(Position.from_moves("4"))
+        assert result.nodes == 0 and result.depth == 3
+        for kwargs in ({"depth": 2}, {"time_budget": 0.05}, {"depth": 3, "time_budget": 0.05}):
+            result = Solver(table_size=1009, book=book).search(Position.from_moves("4"), **kwargs)
+            assert result.nodes == 0
+        print("✓ Solver answers book positions without searching, with or without a time budget")
+        
+        for kwargs in ({"depth": 5}, {"depth": 5, "time_budget": 0.05}):
+            result = Solver(table_size=1009, book=book).search(Position.from_moves("4"), **kwargs)
+            assert result.nodes > 0
+        print("✓ Searches deeper than the book are not cut short by it")
+        book.close()
+    
+    print("✅ Opening book test passed!")
+    return True
+
+def test_mcts():
+    """Test batched playouts and the MCTS player"""
+    print("\nTesting MCTS player...")
+    
+    try:
+        import numpy as np
+        from connect_four_mcts import MCTSPlayer, batch_playouts
+    except ImportError:
+        print("⚠ numpy not installed, skipping MCTS test")
+        return True
+    from connect_four_engine import Position
+    
+    rng = np.random.default_rng(0)
+    wins, draws, losses = batch_playouts(Position(), 500, rng)
+    assert wins + draws + losses == 500
+    assert wins > losses
+    # With a single empty cell left every playout ends the same way
+    import random
+    from connect_four_engine import COLS, CELLS
+    seeded = random.Random(5)
+    while True:
+        position = Position()
+        while position.moves < CELLS - 1:
+            col = seeded.choice([c for c in range(COLS) if position.can_play(c)])
+            if position.is_winning_move(col):
+                break
+            position.play(col)
+        if position.moves == CELLS - 1:
+            break
+    last = next(c for c in range(COLS) if position.can_play(c))
+    expected = (100, 0, 0) if position.is_winning_move(last) else (0, 100, 0)
+    assert batch_playouts(position, 100, rng) == expected
+    print("✓ Batched playouts count wins, draws and losses")
+    
+    player = MCTSPlayer(playouts=2000, batch_size=64, seed=1)
+    assert player.best_move(Position.from_moves("11223")) == 3
+    assert player.best_move(Position.from_moves("445566")) in (2, 6)
+    print("✓ Immediate wins and threats handled")
+    
+    player.reset()
+    position = Position.from_moves("44")
+    move = player.best_move(position)
+    position.play(move)
+    position.play(3)
+    old_root = player.root
+    player.best_move(position)
+    assert player.root in [grandchild for child in old_root.children
+                           for grandchild in child.children]
+    print("✓ Search tree reused between moves")
+    
+    print("✅ MCTS test passed!")
+    return True
+
+def test_tournament():
+    """Test the headless tournament runner"""
+    print("\nTesting tournament runner...")
+    
+    import csv
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    from tournament import make_player, play_game, run_tournament, estimate_elo
+    from connect_four_engine import Position
+    
+    first = make_player("negamax:depth=2")
+    assert first(Position.from_moves("11223")) == 3
+    result, moves = play_game(make_player("random", seed=1), make_player("random", seed=2))
+    assert result in (0, 1, 2) and len(moves) >= 7
+    print("✓ Players created from specs")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.csv")
+        results = run_tournament(["random", "negamax:depth=2"], 6, workers=2,
+                                 output=path, chunk_size=2, verbose=False)
+        assert sorted(row['game'] for row in results) == list(range(6))
+        with open(path) as f:
+            assert len(list(csv.DictReader(f))) == 6
+    ratings = estimate_elo(["random", "negamax:depth=2"], results)
+    assert ratings["negamax:depth=2"] > ratings["random"]
+    print("✓ Games played in parallel and streamed to CSV")
+    
+    # Random players in different shards must not replay the same stream
+    from tournament import run_games
+    shard = [(0, "random", "negamax:depth=1")]
+    assert run_games(shard, 0, 5)[0]['moves'] == run_games(shard, 0, 5)[0]['moves']
+    streams = {run_games([(game_id, "random", "negamax:depth=1")], 0, 5)[0]['moves']
+               for game_id in range(0, 40, 2)}
+    assert len(streams) > 1
+    print("✓ Player seeds derived from the shard")
+    
+    # Nor may a search player's transposition table carry over from another shard
+    runs = [{row['game']: row['moves'] for row in run_tournament(
+                ["negamax:depth=3", "random"], 60, workers=workers, chunk_size=5, verbose=False)}
+            for workers in (1, 3)]
+    assert runs[0] == runs[1]
+    print("✓ Results do not depend on the number of workers")
+    
+    # The runner must not pull in pygame
+    code = "import sys, tournament; tournament.run_tournament(['random', 'negamax:depth=1'], 1, verbose=False); print('pygame' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    assert output.strip() == "False"
+    print("✓ Pygame never imported")
+    
+    print("✅ Tournament test passed!")
+    return True
+
+def test_vec_env():
+    """Test the vectorized environment against the Position rules"""
+    print("\nTesting vectorized environment...")
+    
+    try:
+        import numpy as np
+        from connect_four_vec_env import ConnectFourVecEnv
+    except ImportError:
+        print("⚠ numpy not installed, skipping vectorized environment test")
+        return True
+    from connect_four_engine import Position, ROWS, COLS
+    
+    env = ConnectFourVecEnv(64)
+    rng = np.random.default_rng(3)
+    positions = [Position() for _ in range(64)]
+    finished = 0
+    for _ in range(300):
+        choice = rng.random((64, COLS))
+        choice[~env.valid_actions()] = -1.0
+        actions = choice.argmax(axis=1)
+        expected = []
+        for position, col in zip(positions, actions):
+            player = position.current_player
+            won = position.is_winning_move(col)
+            position.play(col)
+            tied = not won and position.is_board_full()
+            expected.append((player if won else 0, won or tied))
+        boards, rewards, dones, info = env.step(actions)
+        assert [(int(w), bool(d)) for w, d in zip(info['winners'], dones)] == expected
+        assert all(rewards[dones & (info['winners'] > 0)] == 1.0)
+        for i in np.flatnonzero(dones):
+            positions[i].reset()
+            finished += 1
+        for i, position in enumerate(positions):
+            assert boards[i].tolist() == position.to_rows(0)
+    assert finished > 0
+    print(f"✓ {finished} random games match Position wins, ties and resets")
+    
+    env.reset()
+    for col in (0, 0, 0, 0, 0, 0):
+        env.step(np.full(64, col))
+    boards, rewards, dones, info = env.step(np.full(64, 0))
+    assert dones.all() and (rewards == -1.0).all() and (info['winners'] == 2).all()
+    assert not boards.any()
+    assert (env.step(np.full(64, COLS))[1] == -1.0).all()
+    print("✓ Full and out-of-range columns end the game")
+    
+    print("✅ Vectorized environment test passed!")
+    return True
+
 def main():
     """Run all tests"""
     print("🧪 Running Connect Four Game Tests\n")
     
     tests_passed = 0
-    total_tests = 3
+    total_tests = 13
     
     if test_imports():
         tests_passed += 1
@@ -126,6 +559,36 @@ def main():
         
     if test_gui_game():
         tests_passed += 1
+        
+    if test_engine():
+        tests_passed += 1
+        
+    if test_winning_move_at():
+        tests_passed += 1
+        
+    if test_position_hash():
+        tests_passed += 1
+        
+    if test_solver():
+        tests_passed += 1
+        
+    if test_time_budget():
+        tests_passed += 1
+        
+    if test_parallel_search():
+        tests_passed += 1
+        
+    if test_opening_book():
+        tests_passed += 1
+        
+    if test_mcts():
+        tests_passed += 1
+        
+    if test_tournament():
+        tests_passed += 1
+        
+    if test_vec_env():
+        tests_passed += 1
     
     print(f"\n📊 Test Results: {tests_passed}/{total_tests} tests passed")
     
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Headless Connect Four tournament runner
+
+Plays every pair of players against each other (alternating who goes
+first), spreads the games over a pool of processes, streams each result to
+a CSV or JSONL file as soon as it finishes, and prints games per second and
+Elo estimates. Pygame is never imported.
+
+Players are given as specs: a built-in name with optional arguments, or an
+importable factory that returns a player callable:
+    random
+    negamax:depth=6
+    mcts:playouts=5000,exploration=1.0
+    my_bots:make_player:depth=4
+
+A player callable takes a Position and returns a 0-based column.
+
+Example:
+    python tournament.py random negamax:depth=4 mcts:playouts=2000 --games 100 --output results.csv
+"""
+
+import argparse
+import csv
+import importlib
+import inspect
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from connect_four_engine import Position, COLS
+
+RESULT_FIELDS = ['game', 'first', 'second', 'result', 'plies', 'moves', 'seconds']
+
+
+class RandomPlayer:
+    """Plays a uniformly random valid column"""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, position):
+        return self.rng.choice([col for col in range(COLS) if position.can_play(col)])
+
+
+def _negamax_player(depth=None, time_budget=None, table_size=None):
+    from connect_four_ai import Solver, DEFAULT_TABLE_SIZE
+    solver = Solver(table_size=table_size or DEFAULT_TABLE_SIZE)
+    return lambda position: solver.best_move(position, depth, time_budget)
+
+
+def _mcts_player(seed=None, **options):
+    from connect_four_mcts import MCTSPlayer
+    return MCTSPlayer(seed=seed, **options).best_move
+
+
+# Built-in player factories; each is called with the spec's arguments, and
+# a seed if it takes one
+PLAYERS = {
+    'random': RandomPlayer,
+    'negamax': _negamax_player,
+    'mcts': _mcts_player,
+}
+
+
+def _parse_value(text):
+    """Convert an argument value to int or float when possible"""
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_spec(spec):
+    """
+    Split a player spec into (factory, keyword arguments).
+
+    ``name[:key=value,...]`` selects a built-in player;
+    ``module:function[:key=value,...]`` imports a factory.
+    """
+    parts = spec.split(':')
+    if parts[0] in PLAYERS:
+        factory = PLAYERS[parts[0]]
+        options = parts[1:]
+    elif len(parts) >= 2:
+        factory = getattr(importlib.import_module(parts[0]), parts[1])
+        options = parts[2:]
+    else:
+        raise ValueError(f"Unknown player {spec!r}")
+    kwargs = {}
+    for option in options:
+        for item in filter(None, option.split(',')):
+            key, _, value = item.partition('=')
+            kwargs[key] = _parse_value(value)
+    return factory, kwargs
+
+
+def _takes_seed(factory):
+    parameters = inspect.signature(factory).parameters.values()
+    return any(p.name == 'seed' or p.kind == p.VAR_KEYWORD for p in parameters)
+
+
+def make_player(spec, seed=None):
+    """Create a player callable from a spec, passing ``seed`` if the factory takes one"""
+    factory, kwargs = parse_spec(spec)
+    if _takes_seed(factory):
+        kwargs['seed'] = seed
+    return factory(**kwargs)
+
+
+def play_game(first, second, opening_plies=0, rng=None):
+    """
+    Play one game between two player callables.
+
+    The first ``opening_plies`` moves are random so that deterministic
+    players do not repeat the same game. Returns (result, moves) where
+    result is 1 if the first player won, 2 if the second player won and 0
+    for a draw, and moves is the 1-based column string.
+    """
+    rng = rng or random.Random()
+    position = Position()
+    players = (first, second)
+    moves = []
+    while True:
+        if position.moves < opening_plies:
+            col = rng.choice([c for c in range(COLS)
+                              if position.can_play(c) and not position.is_winning_move(c)]
+                             or [c for c in range(COLS) if position.can_play(c)])
+        else:
+            col = players[position.moves & 1](position)
+            if not position.is_valid_location(col):
+                raise ValueError(f"Player {position.current_player} played invalid column {col}")
+        player = position.current_player
+        row = position.get_next_open_row(col)
+        position.drop_piece(row, col, player)
+        moves.append(str(col + 1))
+        if position.winning_move_at(row, col):
+            return player, ''.join(moves)
+        if position.is_board_full():
+            return 0, ''.join(moves)
+
+
+def _get_player(spec, seed, game_id, shard_players):
+    """
+    Return the player for a spec within one shard.
+
+    Every player is created afresh for each shard, so no search tree or
+    transposition table carries over from games another shard played.
+    Players that take a seed are seeded from the tournament seed, the
+    shard's first game id and the spec, so no two shards replay the same
+    random stream. Results therefore do not depend on which worker ran
+    the shard.
+    """
+    player = shard_players.get(spec)
+    if player is None:
+        player_seed = random.Random(f"{seed}:{game_id}:{spec}").getrandbits(32)
+        player = shard_players[spec] = make_player(spec, player_seed)
+    return player
+
+
+def run_games(games, opening_plies, seed):
+    """Play a shard of (game id, first spec, second spec) games and return their results"""
+    results = []
+    shard_players = {}
+    for game_id, first, second in games:
+        rng = random.Random(seed * 1_000_003 + game_id)
+        first_player = _get_player(first, seed, game_id, shard_players)
+        second_player = _get_player(second, seed, game_id, shard_players)
+        start = time.perf_counter()
+        winner, moves = play_game(first_player, second_player, opening_plies, rng)
+        results.append({
+            'game': game_id,
+            'first': first,
+            'second': second,
+            'result': {1: '1-0', 2: '0-1', 0: '1/2-1/2'}[winner],
+            'plies': len(moves),
+            'moves': moves,
+            'seconds': round(time.perf_counter() - start, 4),
+        })
+    return results
+
+
+def schedule(specs, games_per_pair):
+    """Return (game id, first, second) for a round robin with alternating colors"""
+    games = []
+    for i, a in enumerate(specs):
+        for b in specs[i + 1:]:
+            for n in range(games_per_pair):
+                first, second = (a, b) if n % 2 == 0 else (b, a)
+                games.append((len(games), first, second))
+    return games
+
+
+def estimate_elo(specs, results, iterations=2000):
+    """
+    Estimate Elo ratings (mean 1500) from game results.
+
+    Each pair of players is also given one virtual draw, which keeps the
+    estimates finite when one player wins every game.
+    """
+    score = {(a, b): 0.0 for a in specs for b in specs}
+    games = {(a, b): 0 for a in specs for b in specs}
+    for a in specs:
+        for b in specs:
+            if a != b:
+                score[a, b] += 0.5
+                games[a, b] += 1
+    for row in results:
+        first, second = row['first'], row['second']
+        points = {'1-0': 1.0, '0-1': 0.0}.get(row['result'], 0.5)
+        score[first, second] += points
+        score[second, first] += 1 - points
+        games[first, second] += 1
+        games[second, first] += 1
+
+    ratings = {spec: 0.0 for spec in specs}
+    for _ in range(iterations):
+        for a in specs:
+            expected = actual = played = 0.0
+            for b in specs:
+                if a == b or not games[a, b]:
+                    continue
+                expected += games[a, b] / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+                actual += score[a, b]
+                played += games[a, b]
+            if played:
+                ratings[a] += 32 * (actual - expected) / math.sqrt(played)
+        mean = sum(ratings.values()) / len(ratings)
+        ratings = {spec: rating - mean for spec, rating in ratings.items()}
+    return {spec: 1500 + rating for spec, rating in ratings.items()}
+
+
+class ResultWriter:
+    """Append results to a CSV or JSONL file (chosen by extension) as they arrive"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.jsonl = path.endswith(('.jsonl', '.json'))
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row) + '\n')
+        else:
+            self.csv.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_tournament(specs, games_per_pair, workers=1, output=None, opening_plies=2,
+                   chunk_size=10, seed=0, verbose=True):
+    """Run a round-robin tournament and return the list of game results"""
+    games = schedule(specs, games_per_pair)
+    shards = [games[i:i + chunk_size] for i in range(0, len(games), chunk_size)]
+    writer = ResultWriter(output) if output else None
+    results = []
+    start = time.perf_counter()
+
+    def collect(shard_results):
+        for row in shard_results:
+            results.append(row)
+            if writer:
+                writer.write(row)
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"  {len(results):,}/{len(games):,} games, {len(results) / elapsed:,.1f} games/s")
+
+    try:
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as executor:
+                futures = [executor.submit(run_games, shard, opening_plies, seed) for shard in shards]
+                for future in as_completed(futures):
+                    collect(future.result())
+        else:
+            for shard in shards:
+                collect(run_games(shard, opening_plies, seed))
+    finally:
+        if writer:
+            writer.close()
+    return results
+
+
+def print_standings(specs, results, elapsed):
+    """Print games per second and a standings table with Elo estimates"""
+    print(f"\n{len(results):,} games in {elapsed:.1f}s ({len(results) / elapsed:,.1f} games/s)")
+    ratings = estimate_elo(specs, results)
+    width = max(len(spec) for spec in specs) + 2
+    print(f"\n{'player':<{width}}{'games':>7}{'wins':>7}{'draws':>7}{'losses':>8}{'score':>8}{'elo':>8}")
+    for spec in sorted(specs, key=ratings.get, reverse=True):
+        wins = draws = losses = 0
+        for row in results:
+            if spec not in (row['first'], row['second']):
+                continue
+            if row['result'] == '1/2-1/2':
+                draws += 1
+            elif (row['result'] == '1-0') == (row['first'] == spec):
+                wins += 1
+            else:
+                losses += 1
+        games = wins + draws + losses
+        score = (wins + 0.5 * draws) / games if games else 0.0
+        print(f"{spec:<{width}}{games:>7}{wins:>7}{draws:>7}{losses:>8}{score:>7.1%}{ratings[spec]:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a headless Connect Four tournament")
+    parser.add_argument("players", nargs="+",
+                        help="player specs, e.g. random, negamax:depth=6, mcts:playouts=2000")
+    parser.add_argument("--games", type=int, default=100,
+                        help="games per pair of players")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of processes playing games")
+    parser.add_argument("--output",
+                        help="stream results to this .csv or .jsonl file")
+    parser.add_argument("--opening-plies", type=int, default=2,
+                        help="random moves at the start of every game")
+    parser.add_argument("--chunk-size", type=int, default=10,
+                        help="games sent to a worker at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if len(set(args.players)) < 2:
+        parser.error("at least two different players are needed")
+    specs = list(dict.fromkeys(args.players))
+    print(f"Tournament: {len(specs)} players, {args.games} games per pair, {args.workers} workers")
+    start = time.perf_counter()
+    results = run_tournament(specs, args.games, args.workers, args.output,
+                             args.opening_plies, args.chunk_size, args.seed)
+    print_standings(specs, results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()